@@ -0,0 +1,92 @@
+"""Verificações de corretude das otimizações, rodadas pelo CI junto dos benchmarks.
+
+Cada verificação compara o resultado rápido com uma referência direta (ou
+com a propriedade que a otimização não pode perder) em dados sintéticos.
+
+Uso::
+
+    python -m benchmarks.checks            # todas
+    python -m benchmarks.checks lttb_nan   # só as escolhidas
+
+Sai com código 1 se alguma verificação falhar.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from crypto_dash.downsample import lttb_indices
+from crypto_dash.rolling import rolling_max_drawdown
+
+CHECKS = {}
+
+
+def check(name):
+    """Registra a função como a verificação ``name`` (deve levantar ``AssertionError`` ao falhar)."""
+
+    def register(fn):
+        CHECKS[name] = fn
+        return fn
+
+    return register
+
+
+@check("lttb_nan")
+def _lttb_nan():
+    """O LTTB preserva os picos de uma série que começa com NaN (início de uma janela móvel)."""
+    y = np.cumsum(np.random.default_rng(0).normal(size=3000))
+    y[:364] = np.nan
+    spikes = [800, 1500, 2200, 2900]
+    y[spikes] += 500
+    idx = lttb_indices(np.arange(len(y)), y, 300)
+    assert set(spikes) <= set(idx.tolist()), f"picos perdidos na redução: {sorted(set(spikes) - set(idx.tolist()))}"
+    assert idx[0] == 0 and idx[-1] == len(y) - 1, "primeiro ou último ponto fora da redução"
+
+
+@check("rolling_max_drawdown")
+def _rolling_max_drawdown():
+    """``MaxDD_<w>`` igual à pior queda de pico a vale de cada janela, calculada por força bruta no pandas."""
+    rng = np.random.default_rng(0)
+    for n, window in ((1000, 30), (2000, 90), (2000, 365), (365, 365), (100, 365)):
+        cumulative = np.cumprod(1 + rng.normal(0, 0.04, n))
+        expected = (
+            pd.Series(cumulative)
+            .rolling(window)
+            .apply(lambda x: (x / np.maximum.accumulate(x) - 1).min() * 100, raw=True)
+            .to_numpy()
+        )
+        got = rolling_max_drawdown(cumulative, window)
+        assert np.array_equal(np.isnan(got), np.isnan(expected)), f"janelas incompletas diferentes (n={n}, w={window})"
+        assert np.allclose(got, expected, equal_nan=True), f"drawdown diferente da referência (n={n}, w={window})"
+
+
+def run(names=None):
+    """Roda as verificações (todas ou as de ``names``); retorna os nomes das que falharam."""
+    failed = []
+    for name, fn in CHECKS.items():
+        if names and name not in names:
+            continue
+        try:
+            fn()
+        except AssertionError as error:
+            failed.append(name)
+            print(f"{name:<20} FALHOU: {error}")
+        else:
+            print(f"{name:<20} OK")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verificações de corretude das otimizações do dashboard")
+    parser.add_argument("checks", nargs="*", help=f"verificações (padrão: todas): {', '.join(CHECKS)}")
+    args = parser.parse_args()
+    unknown = sorted(set(args.checks) - set(CHECKS))
+    if unknown:
+        parser.error(f"verificações desconhecidas: {', '.join(unknown)}")
+    sys.exit(1 if run(args.checks) else 0)
+
+
+if __name__ == "__main__":
+    main()
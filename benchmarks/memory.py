@@ -0,0 +1,190 @@
+"""Memória do grafo de dados do dashboard sobre datasets sintéticos com muitas moedas.
+
+Cada escala roda em um processo novo, que importa os módulos, carrega o
+snapshot do CSV sintético e calcula os nós da página principal
+(``MAIN_NODES``). O resultado traz o pico de RSS do processo, o RSS só dos
+imports, a diferença entre os dois (a memória de trabalho dos dados) e os
+bytes que cada nó deixa retidos (``Pipeline.memory``).
+
+Uso::
+
+    python -m benchmarks.memory                          # escalas 10 e 100
+    python -m benchmarks.memory --scales 100 --output memoria.json
+    python -m benchmarks.memory --compare base.json atual.json   # código 1 se a meta não for atingida
+
+``--compare`` mostra quantas vezes cada medida diminuiu entre dois arquivos
+e se a memória de trabalho caiu pelo fator de ``--target``. A redução dos
+bytes retidos pelos nós não substitui essa meta: o pico inclui as cópias
+temporárias da leitura e dos cálculos, que não ficam retidas.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from benchmarks.run import DATA_DIR, _git_commit
+from benchmarks.synthetic import symbol_count, write_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SCALES = (10, 100)
+# Medidas comparadas por ``--compare``; a meta vale para a primeira
+MEASURES = ("working_set", "peak_rss", "retained")
+
+# Nós que a página principal calcula e mantém em memória (os demais são mapeados do disco ou não são usados nela)
+MAIN_NODES = (
+    "metrics",
+    "symbol_store",
+    "price_stats",
+    "risk_return",
+    "drawdown_stats",
+    "trend_stats",
+    "recovery_stats",
+    "volume_stats",
+    "rolling",
+    "peak_markers",
+)
+
+# Roda no processo filho: pico de RSS antes e depois dos nós. No Linux vem de VmHWM, que começa do zero
+# no exec (o ru_maxrss herdaria o pico do processo pai); nos demais sistemas, de ru_maxrss
+CHILD = """
+import importlib, json, resource, sys
+from crypto_dash.loader import dataset_fingerprint
+from crypto_dash.pipeline import base_pipeline, dataset_pipeline
+
+# Bibliotecas que os nós importam sob demanda (leitura do Parquet, picos) contam como imports, não como dados
+for module in ("pyarrow.parquet", "scipy.signal"):
+    try:
+        importlib.import_module(module)
+    except ImportError:
+        pass
+
+def peak_rss():
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmHWM:"))
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+path, nodes = sys.argv[1], sys.argv[2:]
+imports = peak_rss()
+pipeline = dataset_pipeline(base_pipeline(dataset_fingerprint(path), path), "base")
+for name in nodes:
+    pipeline[name]
+peak = peak_rss()
+table = pipeline["metrics"]
+print("MEMORY " + json.dumps({
+    "rows": len(table),
+    "imports_rss": imports,
+    "peak_rss": peak,
+    "nodes": pipeline.memory(),
+    "dtypes": {column: str(dtype) for column, dtype in table.dtypes.items()},
+}))
+"""
+
+
+def measure(csv, nodes=MAIN_NODES):
+    """Memória de um processo novo que calcula ``nodes`` sobre ``csv``; bytes."""
+    out = subprocess.run([sys.executable, "-c", CHILD, csv, *nodes], cwd=ROOT, capture_output=True, text=True)
+    marker = [line for line in out.stdout.splitlines() if line.startswith("MEMORY ")]
+    if out.returncode != 0 or not marker:
+        tail = "\n".join(out.stderr.splitlines()[-5:])
+        raise RuntimeError(f"Falha ao medir {csv!r}:\n{tail}")
+    result = json.loads(marker[-1][len("MEMORY "):])
+    result["working_set"] = result["peak_rss"] - result["imports_rss"]
+    result["retained"] = sum(result["nodes"].values())
+    return result
+
+
+def run(scales=DEFAULT_SCALES, data_dir=DATA_DIR, seed=0, nodes=MAIN_NODES):
+    from crypto_dash.loader import load_dataset
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "scales": {},
+    }
+    for scale in scales:
+        csv = write_csv(data_dir, scale, seed)
+        # Snapshot gravado antes: a medição é a de uma partida com o cache em disco, como no servidor
+        load_dataset(csv)
+        result = measure(csv, nodes)
+        result["symbols"] = symbol_count(scale)
+        report["scales"][f"{scale}x"] = result
+        print(_format_scale(f"{scale}x", result), file=sys.stderr)
+    return report
+
+
+def _format_scale(label, result):
+    mb = 2**20
+    lines = [
+        f"{label}: {result['rows']:,} linhas, {result['symbols']} moedas",
+        f"  pico de RSS            {result['peak_rss'] / mb:>10.1f} MB",
+        f"  RSS dos imports        {result['imports_rss'] / mb:>10.1f} MB",
+        f"  memória de trabalho    {result['working_set'] / mb:>10.1f} MB",
+        f"  retido pelos nós       {result['retained'] / mb:>10.1f} MB",
+    ]
+    lines += [f"    {name:<20} {size / mb:>10.1f} MB" for name, size in result["nodes"].items() if size]
+    return "\n".join(lines)
+
+
+def compare(base, current, target=3.0):
+    """Linhas ``(escala, medida, base, atual, redução)`` e se a memória de trabalho caiu ``target`` vezes em todas."""
+    rows, met = [], True
+    for label, result in current["scales"].items():
+        before = base["scales"].get(label)
+        if before is None:
+            continue
+        for measure in MEASURES:
+            reduction = before[measure] / result[measure] if result[measure] else float("inf")
+            rows.append((label, measure, before[measure], result[measure], reduction))
+        met &= rows[-len(MEASURES)][4] >= target
+    return rows, met and bool(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pico de RSS e memória retida pelo grafo de dados do dashboard")
+    parser.add_argument("--scales", nargs="+", type=int, default=list(DEFAULT_SCALES), help="múltiplos do CSV real")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--nodes", nargs="+", default=list(MAIN_NODES), help="nós calculados (padrão: os da página principal)")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="onde guardar os CSVs sintéticos")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "ATUAL"), help="compara dois resultados JSON")
+    parser.add_argument("--target", type=float, default=3.0, help="redução esperada da memória de trabalho")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        rows, met = compare(base, current, args.target)
+        mb = 2**20
+        for label, measure, before, after, reduction in rows:
+            print(f"{label:>5} {measure:<12} {before / mb:>8.1f} MB -> {after / mb:>8.1f} MB  {reduction:.2f}x menor")
+        status = "atingida" if met else "NÃO atingida"
+        print(f"meta de {args.target:.1f}x menos memória de trabalho: {status}")
+        for label, measure, before, after, reduction in rows:
+            if measure == MEASURES[0] and reduction < args.target:
+                goal = before / args.target
+                print(f"{label:>5} faltam {(after - goal) / mb:.1f} MB (meta: {goal / mb:.1f} MB de memória de trabalho)")
+        sys.exit(0 if met else 1)
+
+    report = run(args.scales, args.data_dir, args.seed, args.nodes)
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
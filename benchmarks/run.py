@@ -0,0 +1,280 @@
+"""Benchmarks de cada etapa do dashboard sobre datasets sintéticos em escala.
+
+Uso::
+
+    python -m benchmarks.run                              # escalas 1, 10 e 100
+    python -m benchmarks.run --scales 1 10 --output atual.json
+    python -m benchmarks.run --compare base.json atual.json
+
+Cada etapa roda ``repeat`` vezes e o resultado guarda o menor tempo e a
+mediana (segundos). ``--compare`` mostra a razão entre dois arquivos e sai
+com código 1 se alguma etapa ficar mais lenta que o limite (``--threshold``).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from benchmarks.synthetic import symbol_count, write_csv
+from crypto_dash import engine
+from crypto_dash.backtest import walk_forward
+from crypto_dash.correlation import correlation_matrix, return_matrix, rolling_correlation
+from crypto_dash.downsample import downsample_bars, downsample_line
+from crypto_dash.figures import gauge_figure, line_trace
+from crypto_dash.loader import CACHE_DIR, read_csv_typed
+from crypto_dash.metrics import classify_returns, compute_metrics, filter_common_period
+from crypto_dash.outliers import analyze_volume_outliers
+from crypto_dash.peaks import PeakMarkers, peak_table
+from crypto_dash.rolling import rolling_metrics
+from crypto_dash.rollups import build_rollups
+from crypto_dash.store import SymbolStore
+from crypto_dash.wide import WideStore
+
+DATA_DIR = os.path.join(CACHE_DIR, "bench")
+DEFAULT_SCALES = (1, 10, 100)
+
+STAGES = {}
+
+
+def stage(name):
+    """Registra ``fn(ctx)`` como etapa medida; o retorno (se houver) é guardado em ``ctx[name]``."""
+
+    def register(fn):
+        STAGES[name] = fn
+        return fn
+
+    return register
+
+
+@stage("load_csv")
+def _load_csv(ctx):
+    return read_csv_typed(ctx["csv"])
+
+
+@stage("load_snapshot")
+def _load_snapshot(ctx):
+    if ctx["snapshot"] is None:
+        return None
+    return pd.read_parquet(ctx["snapshot"])
+
+
+@stage("common_period")
+def _common_period(ctx):
+    return filter_common_period(ctx["load_csv"])
+
+
+@stage("wide_store")
+def _wide_store(ctx):
+    return WideStore.from_long(ctx["load_csv"])
+
+
+@stage("wide_common_period")
+def _wide_common_period(ctx):
+    wide = ctx["wide_store"]
+    return wide.common_period(wide.symbols)
+
+
+@stage("metrics")
+def _metrics(ctx):
+    return compute_metrics(ctx["common_period"])
+
+
+@stage("classify_returns")
+def _classify_returns(ctx):
+    return classify_returns(ctx["metrics"]["Return"])
+
+
+@stage("symbol_store")
+def _symbol_store(ctx):
+    return SymbolStore(ctx["metrics"])
+
+
+@stage("drawdown_stats")
+def _drawdown_stats(ctx):
+    return engine.drawdown_stats(ctx["metrics"])
+
+
+@stage("recovery")
+def _recovery(ctx):
+    return engine.recovery_stats(ctx["metrics"])
+
+
+@stage("find_peaks")
+def _find_peaks(ctx):
+    return PeakMarkers(peak_table(ctx["symbol_store"]))
+
+
+@stage("outliers_iqr")
+def _outliers_iqr(ctx):
+    return analyze_volume_outliers(ctx["metrics"], "Volume").summary
+
+
+@stage("outliers_rolling")
+def _outliers_rolling(ctx):
+    return analyze_volume_outliers(ctx["metrics"], "Volume", method="rolling_iqr", window=30).summary
+
+
+@stage("rolling_metrics")
+def _rolling_metrics(ctx):
+    return rolling_metrics(ctx["metrics"])
+
+
+@stage("rollups")
+def _rollups(ctx):
+    return build_rollups(ctx["metrics"])
+
+
+@stage("correlation")
+def _correlation(ctx):
+    """Matriz completa e correlação móvel (90 dias) de cada moeda contra a primeira."""
+    _, symbols, matrix = return_matrix(ctx["metrics"])
+    others = range(1, len(symbols))
+    return correlation_matrix(matrix), rolling_correlation(matrix, 90, ([0] * len(others), list(others)))
+
+
+@stage("backtest")
+def _backtest(ctx):
+    """Walk-forward do cruzamento de médias em todas as moedas, sem cache e no próprio processo."""
+    return walk_forward(ctx["symbol_store"], "ma_crossover", cache_dir=None, max_workers=0)
+
+
+@stage("summary")
+def _summary(ctx):
+    return engine.summarize(ctx["metrics"])
+
+
+@stage("figures")
+def _figures(ctx):
+    """Gráfico de preço, de volume e um velocímetro de uma moeda, como o dashboard monta."""
+    data = ctx["symbol_store"][ctx["symbol_store"].symbols[0]]
+    dates = data["Date"].to_numpy()
+    line_x, line_y = downsample_line(dates, data["Close"].to_numpy())
+    bar_x, bar_y = downsample_bars(dates, data["Volume"].to_numpy())
+    price = go.Figure(line_trace(x=line_x, y=line_y, mode="lines"))
+    volume = go.Figure(go.Bar(x=bar_x, y=bar_y))
+    gauge = gauge_figure(float(line_y.mean()), "S", "", (0, float(line_y.max())), "#1f77b4", [], "red")
+    return price.to_dict(), volume.to_dict(), gauge.to_dict()
+
+
+def _time(fn, ctx, repeat):
+    # Uma chamada de aquecimento fora da medição (imports tardios, caches do pandas)
+    result = fn(ctx)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(ctx)
+        times.append(time.perf_counter() - start)
+    return result, {"min": min(times), "median": statistics.median(times), "repeat": repeat}
+
+
+def run_scale(scale, repeat=3, data_dir=DATA_DIR, seed=0, only=None):
+    """Mede todas as etapas (ou as de ``only``) em uma escala; etapas dependentes rodam na ordem."""
+    csv = write_csv(data_dir, scale, seed)
+    snapshot = f"{os.path.splitext(csv)[0]}.parquet"
+    try:
+        if not os.path.exists(snapshot):
+            read_csv_typed(csv).to_parquet(snapshot, index=False)
+    except ImportError:
+        snapshot = None
+
+    ctx = {"csv": csv, "snapshot": snapshot}
+    results = {}
+    for name, fn in STAGES.items():
+        result, timing = _time(fn, ctx, repeat)
+        ctx[name] = result
+        if only is None or name in only:
+            results[name] = timing
+    return {"rows": len(ctx["load_csv"]), "symbols": symbol_count(scale), "stages": results}
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scales=DEFAULT_SCALES, repeat=3, data_dir=DATA_DIR, seed=0, only=None):
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+        },
+        "scales": {},
+    }
+    for scale in scales:
+        report["scales"][f"{scale}x"] = run_scale(scale, repeat, data_dir, seed, only)
+        print(_format_scale(f"{scale}x", report["scales"][f"{scale}x"]), file=sys.stderr)
+    return report
+
+
+def _format_scale(label, result):
+    lines = [f"{label}: {result['rows']:,} linhas, {result['symbols']} moedas"]
+    for name, timing in result["stages"].items():
+        lines.append(f"  {name:<18} {timing['min'] * 1000:>10.2f} ms (mediana {timing['median'] * 1000:.2f} ms)")
+    return "\n".join(lines)
+
+
+def compare(base, current, threshold=1.25):
+    """Linhas ``(escala, etapa, base, atual, razão)`` e se alguma razão passou do limite."""
+    rows, regressed = [], False
+    for label, result in current["scales"].items():
+        base_stages = base["scales"].get(label, {}).get("stages", {})
+        for name, timing in result["stages"].items():
+            if name not in base_stages:
+                continue
+            ratio = timing["min"] / base_stages[name]["min"] if base_stages[name]["min"] else float("inf")
+            rows.append((label, name, base_stages[name]["min"], timing["min"], ratio))
+            regressed |= ratio > threshold
+    return rows, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks das etapas do dashboard em dados sintéticos")
+    parser.add_argument("--scales", nargs="+", type=int, default=list(DEFAULT_SCALES), help="múltiplos do CSV real")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), help="reportar apenas estas etapas")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="onde guardar os CSVs sintéticos")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "ATUAL"), help="compara dois resultados JSON")
+    parser.add_argument("--threshold", type=float, default=1.25, help="razão atual/base considerada regressão")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        rows, regressed = compare(base, current, args.threshold)
+        for label, name, before, after, ratio in rows:
+            flag = "  <-- regressão" if ratio > args.threshold else ""
+            print(f"{label:>5} {name:<18} {before * 1000:>10.2f} ms -> {after * 1000:>10.2f} ms  x{ratio:.2f}{flag}")
+        sys.exit(1 if regressed else 0)
+
+    report = run(args.scales, args.repeat, args.data_dir, args.seed, args.stages)
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
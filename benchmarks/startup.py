@@ -0,0 +1,138 @@
+"""Partida a frio do dashboard: tempo de import e até a primeira renderização.
+
+Cada medição roda em um processo novo com ``python -X importtime``, que
+carrega o ``dashboard.py`` pelo ``AppTest`` do Streamlit e renderiza uma
+página uma vez. O resultado traz o tempo total do processo, o tempo até a
+primeira renderização, o tempo somado dos imports e os módulos de topo mais
+caros. Os snapshots em ``data/.cache`` são mantidos (como um contêiner que
+reinicia com o mesmo volume); os caches em memória do Streamlit não.
+
+Uso::
+
+    python -m benchmarks.startup                            # 3 partidas, página principal
+    python -m benchmarks.startup --page "Análise BTC 2021" --runs 5 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ("Dashboard Principal", "Correlação entre Moedas", "Previsão de Preços", "Análise BTC 2021")
+
+# Roda no processo filho: abre a página pedida já no primeiro run e mede até ele terminar
+CHILD = """
+import sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+loaded = time.perf_counter()
+app = AppTest.from_file("dashboard.py", default_timeout=600)
+app.session_state["menu"] = sys.argv[1]
+app.run()
+done = time.perf_counter()
+if app.exception:
+    raise SystemExit(str(app.exception))
+print(f"STARTUP {loaded - start:.6f} {done - start:.6f}")
+"""
+
+
+def parse_importtime(stderr):
+    """``{módulo de topo: segundos}`` a partir da saída de ``-X importtime`` (tempo cumulativo)."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith(" ") and not name.startswith("  "):
+            try:
+                modules[name.strip()] = modules.get(name.strip(), 0.0) + int(cumulative) / 1e6
+            except ValueError:
+                continue
+    return modules
+
+
+def measure(page=PAGES[0]):
+    """Uma partida a frio; segundos de processo, até a primeira renderização e de imports."""
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, page], cwd=ROOT, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    marker = [line for line in out.stdout.splitlines() if line.startswith("STARTUP ")]
+    if out.returncode != 0 or not marker:
+        tail = "\n".join(out.stderr.splitlines()[-5:])
+        raise RuntimeError(f"Falha ao renderizar {page!r}:\n{tail}")
+    _, harness, first_render = marker[-1].split()
+    imports = parse_importtime(out.stderr)
+    return {
+        "wall": wall,
+        "first_render": float(first_render),
+        # O AppTest importa o próprio Streamlit antes do dashboard; descontado da renderização
+        "render": float(first_render) - float(harness),
+        "imports": sum(imports.values()),
+        "modules": imports,
+    }
+
+
+def run(page=PAGES[0], runs=3, top=15):
+    from benchmarks.run import _git_commit
+
+    samples = [measure(page) for _ in range(runs)]
+    median = {key: statistics.median(s[key] for s in samples) for key in ("wall", "first_render", "render", "imports")}
+    # Módulos de topo da partida mais próxima da mediana
+    typical = min(samples, key=lambda s: abs(s["first_render"] - median["first_render"]))
+    heaviest = sorted(typical["modules"].items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "page": page,
+        "runs": [{key: s[key] for key in ("wall", "first_render", "render", "imports")} for s in samples],
+        "median": median,
+        "top_imports": [{"module": name, "seconds": seconds} for name, seconds in heaviest],
+    }
+
+
+def _format(report):
+    median = report["median"]
+    lines = [
+        f"{report['page']}: {len(report['runs'])} partidas (mediana)",
+        f"  processo               {median['wall'] * 1000:>10.1f} ms",
+        f"  até a 1ª renderização  {median['first_render'] * 1000:>10.1f} ms",
+        f"  renderização           {median['render'] * 1000:>10.1f} ms",
+        f"  imports                {median['imports'] * 1000:>10.1f} ms",
+        "  imports mais caros:",
+    ]
+    lines += [f"    {item['module']:<32} {item['seconds'] * 1000:>8.1f} ms" for item in report["top_imports"]]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partida a frio do dashboard (python -X importtime)")
+    parser.add_argument("--page", default=PAGES[0], choices=PAGES, help="página renderizada na partida")
+    parser.add_argument("--runs", type=int, default=3, help="partidas medidas (cada uma em um processo novo)")
+    parser.add_argument("--top", type=int, default=15, help="quantos módulos de topo listar")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    report = run(args.page, args.runs, args.top)
+    print(_format(report), file=sys.stderr)
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
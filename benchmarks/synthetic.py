@@ -0,0 +1,75 @@
+"""Datasets OHLCV sintéticos no mesmo formato de ``cryptocurrency.csv``.
+
+O tamanho é medido em múltiplos do dataset real (5151 linhas): a escala 1
+gera ~5 mil linhas, 10 gera ~50 mil e 100 gera ~500 mil. Cada moeda tem
+``DAYS_PER_SYMBOL`` dias com início escalonado, para que o filtro de
+período comum tenha o que cortar; a quantidade de moedas cresce com a escala.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from crypto_dash.loader import DATE_FORMAT
+
+BASE_ROWS = 5151
+DAYS_PER_SYMBOL = 2500
+FIRST_DATE = "2013-04-29 23:59:59"
+
+
+def symbol_count(scale):
+    return max(2, round(scale * BASE_ROWS / DAYS_PER_SYMBOL))
+
+
+def make_ohlcv(scale=1, seed=0, freq="D"):
+    """DataFrame OHLCV com ``symbol_count(scale)`` moedas (passeio aleatório geométrico).
+
+    ``freq`` muda a resolução dos candles (``"h"``, ``"min"``), mantendo
+    ``DAYS_PER_SYMBOL`` candles por moeda.
+    """
+    rng = np.random.default_rng(seed)
+    n_symbols = symbol_count(scale)
+    frames = []
+    for i in range(n_symbols):
+        # Início escalonado em até 10% do histórico
+        offset = int(rng.integers(0, DAYS_PER_SYMBOL // 10))
+        dates = pd.date_range(FIRST_DATE, periods=DAYS_PER_SYMBOL + offset, freq=freq)[offset:]
+        log_returns = rng.normal(0.001, 0.04, DAYS_PER_SYMBOL)
+        close = rng.uniform(1, 1000) * np.exp(np.cumsum(log_returns))
+        open_ = np.concatenate(([close[0]], close[:-1]))
+        spread = np.abs(rng.normal(0, 0.02, DAYS_PER_SYMBOL))
+        volume = rng.lognormal(20, 1.5, DAYS_PER_SYMBOL)
+        # Alguns picos de volume para a análise de outliers
+        spikes = rng.random(DAYS_PER_SYMBOL) < 0.02
+        volume[spikes] *= rng.uniform(5, 20, spikes.sum())
+        symbol = f"S{i:03d}"
+        frames.append(
+            pd.DataFrame(
+                {
+                    "Name": f"Synthetic {symbol}",
+                    "Symbol": symbol,
+                    "Date": dates.strftime(DATE_FORMAT),
+                    "High": np.maximum(open_, close) * (1 + spread),
+                    "Low": np.minimum(open_, close) * (1 - spread),
+                    "Open": open_,
+                    "Close": close,
+                    "Volume": volume,
+                    "Marketcap": close * rng.uniform(1e6, 1e8),
+                }
+            )
+        )
+    df = pd.concat(frames, ignore_index=True)
+    df.insert(0, "SNo", np.arange(1, len(df) + 1))
+    return df
+
+
+def write_csv(directory, scale=1, seed=0, freq="D"):
+    """Grava (ou reaproveita) o CSV sintético da escala e retorna o caminho."""
+    os.makedirs(directory, exist_ok=True)
+    suffix = "" if freq == "D" else f"-{freq}"
+    path = os.path.join(directory, f"synthetic-x{scale}-seed{seed}{suffix}.csv")
+    if not os.path.exists(path):
+        make_ohlcv(scale, seed, freq).to_csv(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+    return path
@@ -0,0 +1 @@
+"""Camada de dados e análise do Crypto Dash (independente do Streamlit)."""
@@ -0,0 +1,279 @@
+"""Backtest walk-forward de regras simples e das previsões, fold a fold.
+
+A série de cada moeda é dividida em folds consecutivos: ``train`` dias de
+histórico (janela crescente, ``"expanding"``, ou deslizante, ``"rolling"``)
+seguidos de ``test`` dias avaliados fora da amostra. Estratégias:
+
+- ``"ma_crossover"``: comprado enquanto a média móvel curta está acima da longa
+- ``"drawdown_reentry"``: sai quando o drawdown passa de ``entry`` e volta
+  quando recupera acima de ``exit`` (mesma histerese dos episódios)
+- ``"forecast"``: ajusta um modelo de ``crypto_dash.forecast`` no treino e
+  fica comprado no teste se a previsão para o fim do fold for de alta
+
+Os sinais são vetorizados e usam o ``Return`` da tabela de métricas com um
+dia de defasagem (a posição decidida no fechamento vale para o dia
+seguinte). Cada fold é gravado em ``data/.cache/backtest/`` com uma chave
+derivada da estratégia, dos parâmetros e dos dados do fold: mudar um
+parâmetro ou acrescentar dias só recalcula os folds afetados. Os folds que
+faltam rodam em um pool de processos.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from crypto_dash.episodes import episode_bounds
+from crypto_dash.loader import CACHE_DIR
+
+BACKTEST_DIR = os.path.join(CACHE_DIR, "backtest")
+
+STRATEGIES = {
+    "ma_crossover": "Cruzamento de médias móveis",
+    "drawdown_reentry": "Saída e reentrada por drawdown",
+    "forecast": "Previsão (comprado se prevê alta)",
+}
+
+DEFAULT_PARAMS = {
+    "ma_crossover": {"fast": 20, "slow": 50},
+    "drawdown_reentry": {"entry": -20.0, "exit": -5.0},
+    "forecast": {"model": "ets", "train_days": 730},
+}
+
+MODES = ("expanding", "rolling")
+
+FOLD_COLUMNS = [
+    "Symbol",
+    "fold",
+    "train_start",
+    "test_start",
+    "test_end",
+    "days",
+    "strategy_return",
+    "buy_hold_return",
+    "sharpe",
+    "max_drawdown",
+    "exposure",
+    "trades",
+    "forecast_error",
+    "direction_hit",
+]
+
+
+def walk_forward_folds(n, train, test, mode="expanding"):
+    """Posições ``(início do treino, início do teste, fim do teste)`` de cada fold; o último pode ser parcial."""
+    if mode not in MODES:
+        raise ValueError(f"Modo desconhecido: {mode!r} (use um de {MODES})")
+    if train < 1 or test < 1:
+        raise ValueError("As janelas de treino e de teste precisam ter ao menos 1 dia")
+    test_starts = np.arange(train, n, test)
+    train_starts = np.zeros_like(test_starts) if mode == "expanding" else test_starts - train
+    return np.column_stack((train_starts, test_starts, np.minimum(test_starts + test, n)))
+
+
+def moving_average(values, window):
+    """Média móvel simples por somas acumuladas; NaN até a janela completar."""
+    values = np.asarray(values, dtype="float64")
+    out = np.full(len(values), np.nan)
+    if 0 < window <= len(values):
+        sums = np.cumsum(np.r_[0.0, values])
+        out[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return out
+
+
+def ma_crossover_signal(close, fast, slow):
+    """1 nos dias em que a média curta fecha acima da longa, 0 nos demais."""
+    if fast >= slow:
+        raise ValueError("A média curta deve ter janela menor que a longa")
+    with np.errstate(invalid="ignore"):
+        return (moving_average(close, fast) > moving_average(close, slow)).astype(np.int8)
+
+
+def drawdown_reentry_signal(close, entry, exit):
+    """1 fora dos episódios de drawdown do preço (``episode_bounds``), 0 dentro deles."""
+    close = np.asarray(close, dtype="float64")
+    drawdown = (close / np.fmax.accumulate(close) - 1) * 100
+    starts, ends = episode_bounds(drawdown, entry, exit)
+    boundaries = np.zeros(len(close) + 1, dtype=np.int64)
+    np.add.at(boundaries, starts, 1)
+    np.add.at(boundaries, ends, -1)
+    return (np.cumsum(boundaries[:-1]) == 0).astype(np.int8)
+
+
+def _forecast_position(close, test_start, days, params):
+    from crypto_dash.forecast import DEFAULT_PARAMS as MODEL_PARAMS
+    from crypto_dash.forecast import fit, predict
+
+    model = params["model"]
+    model_params = {**MODEL_PARAMS[model], **{k: v for k, v in params.items() if k != "model"}}
+    train_close = close[:test_start]
+    dates = pd.date_range("2000-01-01", periods=len(train_close), freq="D")
+    forecast = predict(fit("", dates, train_close, model, model_params, version=""), days)["forecast"].to_numpy()
+
+    actual = close[test_start:test_start + days]
+    last = train_close[-1]
+    error = float(np.mean(np.abs(forecast - actual) / actual) * 100)
+    hit = float((forecast[-1] > last) == (actual[-1] > last))
+    return int(forecast[-1] > last), error, hit
+
+
+def _equity_drawdown(returns):
+    equity = np.cumprod(1 + returns)
+    return float((1 - (equity / np.maximum.accumulate(np.r_[1.0, equity])[1:])).max() * 100)
+
+
+def evaluate_fold(close, returns, test_start, strategy, params):
+    """Métricas do período de teste de um fold; ``close``/``returns`` vão do início do treino ao fim do teste.
+
+    ``returns`` está em % (coluna ``Return``). Retornos (%) compostos da
+    estratégia e do buy & hold, Sharpe diário, drawdown máximo (%),
+    exposição (% dos dias comprado) e número de trocas de posição.
+    """
+    close = np.asarray(close, dtype="float64")
+    daily = np.nan_to_num(np.asarray(returns, dtype="float64")[test_start:]) / 100
+    days = len(daily)
+    error = hit = np.nan
+
+    if strategy == "ma_crossover":
+        hold = ma_crossover_signal(close, params["fast"], params["slow"])[test_start - 1:-1]
+    elif strategy == "drawdown_reentry":
+        hold = drawdown_reentry_signal(close, params["entry"], params["exit"])[test_start - 1:-1]
+    elif strategy == "forecast":
+        position, error, hit = _forecast_position(close, test_start, days, params)
+        hold = np.full(days, position, dtype=np.int8)
+    else:
+        raise ValueError(f"Estratégia desconhecida: {strategy!r} (use uma de {tuple(STRATEGIES)})")
+
+    strat = hold * daily
+    std = strat.std(ddof=1) if days > 1 else 0.0
+    return {
+        "days": days,
+        "strategy_return": float((np.prod(1 + strat) - 1) * 100),
+        "buy_hold_return": float((np.prod(1 + daily) - 1) * 100),
+        "sharpe": float(strat.mean() / std) if std > 0 else 0.0,
+        "max_drawdown": _equity_drawdown(strat),
+        "exposure": float(hold.mean() * 100),
+        "trades": int(np.count_nonzero(np.diff(hold))),
+        "forecast_error": error,
+        "direction_hit": hit,
+    }
+
+
+def fold_key(strategy, params, close, returns, test_start):
+    """Chave do fold: estratégia, parâmetros e os dados (preços e retornos) que ele enxerga."""
+    digest = hashlib.sha1(json.dumps([strategy, params, int(test_start)], sort_keys=True).encode())
+    digest.update(np.ascontiguousarray(close, dtype="float64").tobytes())
+    digest.update(np.ascontiguousarray(returns, dtype="float64").tobytes())
+    return digest.hexdigest()
+
+
+def _cache_path(cache_dir, strategy, key):
+    return os.path.join(cache_dir, strategy, f"{key}.json")
+
+
+def _read_fold(cache_dir, strategy, key):
+    if cache_dir is None:
+        return None
+    try:
+        with open(_cache_path(cache_dir, strategy, key)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_fold(cache_dir, strategy, key, result):
+    if cache_dir is None:
+        return
+    path = _cache_path(cache_dir, strategy, key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp-{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _evaluate_task(task):
+    return evaluate_fold(*task)
+
+
+def _run_tasks(tasks, max_workers):
+    if max_workers == 0 or len(tasks) < 2:
+        return [_evaluate_task(task) for task in tasks]
+    # "spawn", como no ForecastService: processos limpos, sem herdar as threads do servidor
+    context = multiprocessing.get_context("spawn")
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        return list(pool.map(_evaluate_task, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+
+def walk_forward(
+    store,
+    strategy,
+    params=None,
+    train=365,
+    test=90,
+    mode="expanding",
+    symbols=None,
+    cache_dir=BACKTEST_DIR,
+    max_workers=None,
+):
+    """Folds de todas as moedas (ou das de ``symbols``) de um ``SymbolStore`` da tabela de métricas.
+
+    Uma linha por fold com as colunas de ``FOLD_COLUMNS``; ``forecast_error``
+    (erro percentual absoluto médio) e ``direction_hit`` só valem para
+    ``"forecast"``. Os folds já gravados em ``cache_dir`` são lidos do disco
+    (``cache_dir=None`` desliga o cache); os demais rodam no pool de
+    processos, ou no próprio processo com ``max_workers=0``.
+    ``attrs["computed"]`` guarda quantos folds foram calculados.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Estratégia desconhecida: {strategy!r} (use uma de {tuple(STRATEGIES)})")
+    params = {**DEFAULT_PARAMS[strategy], **(params or {})}
+
+    rows, results, missing = [], [], []
+    for symbol in store.symbols if symbols is None else symbols:
+        dates = store.column(symbol, "Date")
+        close = store.column(symbol, "Close")
+        returns = store.column(symbol, "Return")
+        for fold, (train_start, test_start, test_end) in enumerate(walk_forward_folds(len(close), train, test, mode)):
+            segment = slice(train_start, test_end)
+            key = fold_key(strategy, params, close[segment], returns[segment], test_start - train_start)
+            rows.append((symbol, fold, dates[train_start], dates[test_start], dates[test_end - 1]))
+            results.append(_read_fold(cache_dir, strategy, key))
+            if results[-1] is None:
+                task = (close[segment], returns[segment], test_start - train_start, strategy, params)
+                missing.append((len(results) - 1, key, task))
+
+    for (position, key, _), result in zip(missing, _run_tasks([task for _, _, task in missing], max_workers)):
+        results[position] = result
+        _write_fold(cache_dir, strategy, key, result)
+
+    folds = pd.DataFrame(rows, columns=FOLD_COLUMNS[:5])
+    folds = pd.concat([folds, pd.DataFrame(results, columns=FOLD_COLUMNS[5:], index=folds.index)], axis=1)
+    folds.attrs["computed"] = len(missing)
+    return folds
+
+
+def summarize_folds(folds):
+    """Resumo por moeda: retornos compostos dos folds, Sharpe médio, pior drawdown e % de folds acima do buy & hold."""
+    grouped = folds.groupby("Symbol", sort=False)
+    out = pd.DataFrame(
+        {
+            "folds": grouped.size(),
+            "strategy_return": grouped["strategy_return"].agg(lambda r: (np.prod(1 + r / 100) - 1) * 100),
+            "buy_hold_return": grouped["buy_hold_return"].agg(lambda r: (np.prod(1 + r / 100) - 1) * 100),
+            "mean_sharpe": grouped["sharpe"].mean(),
+            "worst_drawdown": grouped["max_drawdown"].max(),
+            "beat_pct": (folds["strategy_return"] > folds["buy_hold_return"]).groupby(folds["Symbol"], sort=False).mean()
+            * 100,
+        }
+    )
+    out.index.name = "Symbol"
+    return out
@@ -0,0 +1,132 @@
+"""Cache de resultados compartilhado entre sessões, limitado por bytes.
+
+O dataset e as tabelas derivadas ficam uma única vez por processo no grafo
+do ``crypto_dash.pipeline``; o que depende dos parâmetros escolhidos em cada
+sessão (moeda, janela, limiares, período) vai para um ``ResultCache``: LRU
+com orçamento de memória, validade opcional (TTL) e contadores de acertos,
+faltas e descartes. Os valores devolvidos são compartilhados e não devem ser
+alterados por quem os recebe.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from crypto_dash.profiling import count_hit, stage
+
+
+def sizeof(value):
+    """Bytes aproximados de um resultado: tabelas, arrays, figuras Plotly e contêineres deles."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+    if hasattr(value, "data") and hasattr(value, "layout"):
+        # Figura Plotly: os arrays de cada traço dominam; o layout é pequeno
+        return sum(sizeof(trace.to_plotly_json()) for trace in value.data) + sys.getsizeof(value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """Cache LRU com orçamento de ``max_bytes`` e validade de ``ttl`` segundos (``None`` = sem validade).
+
+    Um resultado maior que o orçamento inteiro é devolvido sem ser guardado.
+    ``name`` prefixa as etapas do cache no perfil da execução.
+    """
+
+    def __init__(self, max_bytes=256 * 2**20, ttl=None, max_entries=None, clock=time.monotonic, name="cache"):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.ttl is not None and self.clock() - entry[2] > self.ttl:
+            self._drop(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.nbytes -= size
+
+    def get_or_build(self, key, build):
+        """Valor guardado em ``key`` ou ``build()``, guardado se couber no orçamento.
+
+        No perfil da execução, acertos e construções aparecem na etapa
+        ``<name>:<primeiro elemento da chave>``.
+        """
+        label = f"{self.name}:{key[0] if isinstance(key, tuple) and key else key}"
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                count_hit(label)
+                return entry[0]
+        with stage(label):
+            value = build()
+        size = sizeof(value)
+        with self._lock:
+            self.misses += 1
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size, self.clock())
+            self.nbytes += size
+            while self.nbytes > self.max_bytes or len(self._entries) > (self.max_entries or len(self._entries)):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def stats(self):
+        """Entradas, bytes ocupados e do orçamento, acertos, faltas, taxa de acerto e descartes."""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._lookup(key) is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
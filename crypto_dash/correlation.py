@@ -0,0 +1,110 @@
+"""Correlação entre moedas sobre uma matriz alinhada (data × moeda) de retornos.
+
+Tudo é calculado em lote com NumPy: a matriz de correlação sai de um único
+produto matricial e a correlação móvel de todos os pares escolhidos sai de
+somas acumuladas, sem chamadas ``.corr`` par a par. A estimativa com
+encolhimento de Ledoit-Wolf usa o scikit-learn, importado só quando pedida.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def return_matrix(table, column="Return"):
+    """``(datas, moedas, matriz)`` com uma coluna por moeda; datas sem valor ficam NaN."""
+    wide = table.pivot(index="Date", columns="Symbol", values=column).sort_index()
+    return wide.index, [str(s) for s in wide.columns], wide.to_numpy(dtype="float64")
+
+
+def _complete_rows(matrix):
+    return matrix[~np.isnan(matrix).any(axis=1)]
+
+
+def _cov_to_corr(cov):
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.outer(std, std)
+    np.fill_diagonal(corr, 1.0)
+    return corr
+
+
+def shrinkage_available():
+    try:
+        import sklearn.covariance  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def correlation_matrix(matrix, window=None, shrinkage=False):
+    """Correlação entre as colunas de ``matrix`` nas datas em que todas têm valor.
+
+    ``window`` limita o cálculo às últimas ``window`` datas completas.
+    Com ``shrinkage=True`` a covariância é estimada por Ledoit-Wolf e
+    devolve também o coeficiente de encolhimento usado.
+    """
+    rows = _complete_rows(np.asarray(matrix, dtype="float64"))
+    if window:
+        rows = rows[-window:]
+    k = rows.shape[1]
+    if len(rows) < 2:
+        return np.full((k, k), np.nan), None
+
+    centered = rows - rows.mean(axis=0)
+    if shrinkage:
+        from sklearn.covariance import LedoitWolf
+
+        # Sobre retornos padronizados: o alvo do encolhimento vira a identidade
+        std = centered.std(axis=0, ddof=1)
+        estimator = LedoitWolf(assume_centered=True).fit(centered / np.where(std > 0, std, 1.0))
+        return _cov_to_corr(estimator.covariance_), float(estimator.shrinkage_)
+
+    cov = centered.T @ centered / (len(rows) - 1)
+    return _cov_to_corr(cov), None
+
+
+def all_pairs(k):
+    """Índices ``(i, j)`` de todos os pares com ``i < j``."""
+    return np.triu_indices(k, 1)
+
+
+def rolling_correlation(matrix, window, pairs=None):
+    """Correlação móvel (``window`` datas) dos pares ``(i, j)``; forma ``(datas, pares)``.
+
+    Janelas com qualquer valor ausente em um dos lados do par ficam NaN.
+    """
+    matrix = np.asarray(matrix, dtype="float64")
+    n, k = matrix.shape
+    i, j = all_pairs(k) if pairs is None else (np.asarray(pairs[0]), np.asarray(pairs[1]))
+    out = np.full((n, len(i)), np.nan)
+    if n < window or window < 2 or not len(i):
+        return out
+
+    missing = np.isnan(matrix)
+    values = np.where(missing, 0.0, matrix)
+    x, y = values[:, i], values[:, j]
+
+    def window_sum(a):
+        c = np.cumsum(a, axis=0)
+        c = np.vstack((np.zeros((1,) + c.shape[1:]), c))
+        return c[window:] - c[:-window]
+
+    gaps = window_sum((missing[:, i] | missing[:, j]).astype("int64"))
+    sx, sy = window_sum(x), window_sum(y)
+    sxx, syy, sxy = window_sum(x * x), window_sum(y * y), window_sum(x * y)
+
+    cov = sxy - sx * sy / window
+    var_x = sxx - sx * sx / window
+    var_y = syy - sy * sy / window
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[gaps > 0] = np.nan
+    out[window - 1:] = np.clip(corr, -1.0, 1.0)
+    return out
+
+
+def rolling_correlation_frame(dates, symbols, matrix, window, pairs=None):
+    """``rolling_correlation`` como DataFrame indexado por data, colunas ``"A/B"``."""
+    i, j = all_pairs(len(symbols)) if pairs is None else pairs
+    values = rolling_correlation(matrix, window, (i, j))
+    return pd.DataFrame(values, index=dates, columns=[f"{symbols[a]}/{symbols[b]}" for a, b in zip(i, j)])
@@ -0,0 +1,112 @@
+"""Redução de pontos no servidor antes de enviar séries longas ao navegador.
+
+- Linhas: Largest-Triangle-Three-Buckets (LTTB), que preserva a forma visual
+- Barras: min/max por balde, que preserva os extremos de cada intervalo
+
+O número de pontos é derivado da largura do gráfico; como só o intervalo de
+datas visível é reduzido, estreitar o intervalo (zoom) devolve mais detalhe.
+"""
+
+import numpy as np
+
+# Largura aproximada (px) de um gráfico de meia tela no layout "wide" do dashboard
+DEFAULT_CHART_WIDTH = 800
+
+
+def points_for_width(width_px=DEFAULT_CHART_WIDTH, points_per_px=1.0):
+    """Quantidade de pontos que ainda faz diferença visual para uma largura em pixels."""
+    return max(3, int(width_px * points_per_px))
+
+
+def visible_slice(dates, start=None, end=None):
+    """Fatia posicional de ``dates`` (ordenado) dentro de [start, end]."""
+    values = np.asarray(dates, dtype="datetime64[ns]")
+    lo = 0 if start is None else np.searchsorted(values, np.datetime64(start, "ns"), side="left")
+    hi = len(values) if end is None else np.searchsorted(values, np.datetime64(end, "ns"), side="right")
+    return slice(int(lo), int(hi))
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[ns]").astype("int64")
+        return (x - x[0]).astype("float64")
+    return x.astype("float64")
+
+
+def lttb_indices(x, y, n_out):
+    """Índices escolhidos pelo LTTB (sempre inclui o primeiro e o último ponto).
+
+    Pontos sem valor (NaN, como o início de uma janela móvel) não entram nos
+    baldes, senão as médias viram NaN e cada balde cai no seu primeiro ponto;
+    o primeiro e o último ponto da série continuam na saída para manter o
+    intervalo do eixo x.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = np.asarray(y, dtype="float64")
+    finite = np.flatnonzero(np.isfinite(y))
+    if len(finite) == n:
+        return _lttb(x, y, n_out)
+    # Dois dos pontos de saída ficam para as pontas da série original
+    picks = finite[_lttb(x[finite], y[finite], max(3, n_out - 2))]
+    return np.unique(np.concatenate(([0], picks, [n - 1])))
+
+
+def _lttb(x, y, n_out):
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+
+    # Pontos internos divididos em n_out - 2 baldes; o primeiro e o último ponto ficam fixos
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Média do balde seguinte (o último balde usa o ponto final), via somas acumuladas
+    next_lo = edges[1:]
+    next_hi = np.append(edges[2:], n)
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    avg_x = (cx[next_hi] - cx[next_lo]) / (next_hi - next_lo)
+    avg_y = (cy[next_hi] - cy[next_lo]) / (next_hi - next_lo)
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Área do triângulo (ponto escolhido anterior, candidato, média do próximo balde)
+        area = np.abs((x[a] - avg_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_buckets):
+    """Índices do mínimo e do máximo de cada balde, em ordem cronológica."""
+    n = len(y)
+    if n_buckets * 2 >= n or n_buckets < 1:
+        return np.arange(n)
+    y = np.nan_to_num(np.asarray(y, dtype="float64"), nan=-np.inf)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(np.linspace(0, n, n_buckets + 1).astype(np.int64)))
+
+    # Ordenando por (balde, valor), o primeiro de cada balde é o mínimo e o último o máximo
+    order = np.lexsort((y, bucket))
+    bounds = np.searchsorted(bucket[order], np.arange(n_buckets + 1))
+    picks = np.concatenate((order[bounds[:-1]], order[bounds[1:] - 1]))
+    return np.unique(picks)
+
+
+def downsample_line(x, y, n_out=None):
+    """(x, y) reduzidos com LTTB para ``n_out`` pontos."""
+    n_out = points_for_width() if n_out is None else n_out
+    idx = lttb_indices(x, y, n_out)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+def downsample_bars(x, y, n_out=None):
+    """(x, y) reduzidos para no máximo ``n_out`` barras preservando mínimos e máximos."""
+    n_out = points_for_width(points_per_px=0.5) if n_out is None else n_out
+    idx = minmax_indices(y, max(1, n_out // 2))
+    return np.asarray(x)[idx], np.asarray(y)[idx]
@@ -0,0 +1,120 @@
+"""Motor de análise sem dependência do Streamlit.
+
+Funções puras sobre a tabela de métricas (``build_metrics_table``): cada uma
+recebe a tabela longa com uma ou várias moedas e devolve um DataFrame
+indexado por ``Symbol``, calculado de uma vez com ``groupby``. O dashboard
+apenas lê as linhas desses resumos; scripts e benchmarks podem chamar as
+mesmas funções fora de uma sessão do Streamlit.
+"""
+
+import numpy as np
+import pandas as pd
+
+from crypto_dash.episodes import DEFAULT_ENTRY, DEFAULT_EXIT, drawdown_episodes
+from crypto_dash.metrics import RETURN_STATUS
+from crypto_dash.outliers import analyze_volume_outliers
+from crypto_dash.profiling import profiled
+
+# Dias por ano usados na anualização (mercado cripto negocia todos os dias)
+PERIODS_PER_YEAR = 365
+
+# Horizonte (dias) em que a eficiência de recuperação chega a zero
+RECOVERY_HORIZON = 365
+
+
+def _by_symbol(table, column):
+    return table[column].groupby(table["Symbol"], observed=True, sort=False)
+
+
+def price_stats(table, column="Close"):
+    """Média, mínimo, máximo, desvio, primeira/última data e dias de cada moeda."""
+    stats = _by_symbol(table, column).agg(["mean", "min", "max", "std"])
+    dates = _by_symbol(table, "Date").agg(["min", "max", "size"])
+    stats["first_date"] = dates["min"]
+    stats["last_date"] = dates["max"]
+    stats["days"] = dates["size"]
+    return stats
+
+
+def risk_return(table, periods=PERIODS_PER_YEAR):
+    """Retorno médio, volatilidade (diários e anualizados, em %) e Sharpe diário sem taxa livre de risco."""
+    stats = _by_symbol(table, "Return").agg(["mean", "std"])
+    out = pd.DataFrame(index=stats.index)
+    out["mean_return"] = stats["mean"]
+    out["volatility"] = stats["std"]
+    out["annual_return"] = stats["mean"] * periods
+    out["annual_volatility"] = stats["std"] * np.sqrt(periods)
+    out["sharpe"] = (stats["mean"] / stats["std"]).where(stats["std"] > 0, 0.0)
+    return out
+
+
+def drawdown_stats(table, threshold=-1.0, significant=-10.0):
+    """Maior drawdown, drawdown médio abaixo de ``threshold`` e dias abaixo de ``significant`` (em %)."""
+    drawdown = table["Drawdown"]
+    symbols = table["Symbol"]
+    out = pd.DataFrame({"max_drawdown": _by_symbol(table, "Drawdown").min().abs()})
+    out["avg_drawdown"] = drawdown.where(drawdown < threshold).groupby(symbols, observed=True, sort=False).mean().abs()
+    out["significant_days"] = (drawdown < significant).groupby(symbols, observed=True, sort=False).sum()
+    return out
+
+
+def trend_stats(table):
+    """Dias positivos/negativos/neutros de cada moeda e o trend score (% de dias positivos)."""
+    counts = pd.crosstab(table["Symbol"], table["Return_Status"])
+    counts = counts.reindex(columns=list(RETURN_STATUS), fill_value=0)
+    counts.columns = ["positive_days", "negative_days", "neutral_days"]
+    pct = counts.div(counts.sum(axis=1), axis=0) * 100
+    counts["positive_pct"] = pct["positive_days"]
+    counts["negative_pct"] = pct["negative_days"]
+    counts["neutral_pct"] = pct["neutral_days"]
+    counts["trend_score"] = counts["positive_pct"]
+    counts.columns.name = None
+    return counts
+
+
+@profiled()
+def recovery_stats(table, entry=DEFAULT_ENTRY, exit=DEFAULT_EXIT, horizon=RECOVERY_HORIZON):
+    """Episódios recuperados, tempo médio/mínimo/máximo (dias corridos) e eficiência de recuperação.
+
+    A eficiência é ``100 - média / horizon * 100`` (mínimo 0); sem nenhuma
+    recuperação completa vale 50 e o tempo médio é 0.
+    """
+    rows = {}
+    for symbol, data in table.groupby("Symbol", observed=True, sort=False):
+        episodes = drawdown_episodes(data["Date"], data["Drawdown"], entry=entry, exit=exit)
+        times = episodes.loc[episodes["recovered"], "duration_days"]
+        if len(times):
+            avg = times.mean()
+            rows[symbol] = (len(times), avg, times.min(), times.max(), max(0.0, 100 - avg / horizon * 100))
+        else:
+            rows[symbol] = (0, 0.0, np.nan, np.nan, 50.0)
+    columns = ["recoveries", "avg_recovery_days", "min_recovery_days", "max_recovery_days", "efficiency_score"]
+    out = pd.DataFrame.from_dict(rows, orient="index", columns=columns)
+    out.index.name = "Symbol"
+    return out
+
+
+def volume_stats(table, column="Volume", method="iqr", window=None):
+    """Média, mediana e desvio do volume mais a contagem de outliers de cada moeda."""
+    stats = _by_symbol(table, column).agg(["mean", "median", "std"])
+    stats.columns = [f"volume_{name}" for name in stats.columns]
+    outliers = analyze_volume_outliers(table, column, method=method, window=window).summary
+    stats["volume_outliers"] = outliers["count"]
+    stats["volume_outlier_pct"] = outliers["percentage"]
+    return stats
+
+
+def summarize(table, entry=DEFAULT_ENTRY, exit=DEFAULT_EXIT):
+    """Todas as estatísticas por moeda em um único DataFrame indexado por ``Symbol``."""
+    parts = [
+        price_stats(table),
+        risk_return(table),
+        drawdown_stats(table),
+        trend_stats(table),
+        recovery_stats(table, entry=entry, exit=exit),
+        volume_stats(table),
+    ]
+    summary = pd.concat(parts, axis=1)
+    summary.index = summary.index.astype(str)
+    summary.index.name = "Symbol"
+    return summary
@@ -0,0 +1,83 @@
+"""Detecção vetorizada de episódios de drawdown e recuperação.
+
+Um episódio começa quando o drawdown cai abaixo do limiar de entrada e termina
+(recuperação) quando volta a ficar acima ou igual ao limiar de saída. Entre os
+dois limiares o estado anterior é mantido (histerese), como no laço original.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ENTRY = -5.0
+DEFAULT_EXIT = -1.0
+
+EPISODE_COLUMNS = ["start", "trough", "recovery", "depth", "duration_days", "recovered"]
+
+
+def episode_bounds(drawdown, entry=DEFAULT_ENTRY, exit=DEFAULT_EXIT, in_drawdown=False):
+    """Posições de início e de recuperação de cada episódio.
+
+    Retorna ``(starts, ends)``. Com ``in_drawdown=True`` a série começa dentro
+    de um episódio aberto: a primeira recuperação aparece em ``ends`` sem
+    início correspondente em ``starts``. Sem essa situação, ``ends`` tem no
+    máximo um elemento a menos que ``starts`` (último episódio ainda aberto).
+    """
+    if entry >= exit:
+        raise ValueError("O limiar de entrada deve ser menor que o de saída")
+    dd = np.asarray(drawdown, dtype="float64")
+
+    # Só as linhas que decidem o estado importam: 1 = entra, 0 = sai (NaN não decide)
+    decisive = np.flatnonzero((dd < entry) | (dd >= exit))
+    state = (dd[decisive] < entry).astype(np.int8)
+    previous = np.concatenate(([int(in_drawdown)], state[:-1]))
+    change = state != previous
+
+    starts = decisive[change & (state == 1)]
+    ends = decisive[change & (state == 0)]
+    return starts, ends
+
+
+def drawdown_episodes(dates, drawdown, entry=DEFAULT_ENTRY, exit=DEFAULT_EXIT):
+    """Todos os episódios de drawdown de uma série em um único passe.
+
+    Colunas: ``start``, ``trough`` e ``recovery`` (datas; ``recovery`` é NaT
+    para o episódio ainda aberto), ``depth`` (drawdown mínimo em %),
+    ``duration_days`` (dias corridos do início à recuperação) e ``recovered``.
+    """
+    dates = pd.DatetimeIndex(dates)
+    dd = np.asarray(drawdown, dtype="float64")
+    starts, ends = episode_bounds(dd, entry, exit)
+    if len(starts) == 0:
+        return pd.DataFrame(columns=EPISODE_COLUMNS)
+
+    n_closed = len(ends)
+    stops = np.append(ends, len(dd))[: len(starts)]
+
+    # Linhas dentro de algum episódio e o episódio a que pertencem
+    boundaries = np.zeros(len(dd) + 1, dtype=np.int64)
+    np.add.at(boundaries, starts, 1)
+    np.add.at(boundaries, stops, -1)
+    rows = np.flatnonzero(np.cumsum(boundaries[:-1]) > 0)
+    episode_id = np.searchsorted(starts, rows, side="right") - 1
+
+    # Vale de cada episódio: ordena por (episódio, drawdown) e pega a primeira linha de cada um
+    order = np.lexsort((np.nan_to_num(dd[rows], nan=np.inf), episode_id))
+    first = np.searchsorted(episode_id[order], np.arange(len(starts)))
+    troughs = rows[order[first]]
+
+    recovered = np.arange(len(starts)) < n_closed
+    recovery_pos = np.zeros(len(starts), dtype=np.int64)
+    recovery_pos[:n_closed] = ends
+    recovery = dates[recovery_pos].where(recovered)
+
+    start_dates = dates[starts]
+    return pd.DataFrame(
+        {
+            "start": start_dates,
+            "trough": dates[troughs],
+            "recovery": recovery,
+            "depth": dd[troughs],
+            "duration_days": (recovery - start_dates) / pd.Timedelta(days=1),
+            "recovered": recovered,
+        }
+    )
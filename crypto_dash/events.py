@@ -0,0 +1,82 @@
+"""Catálogo de eventos históricos com preço resolvido a partir dos dados.
+
+Os eventos ficam em ``data/events.json`` (moeda, data, rótulos, cor, em que
+visualizações aparecem e os tópicos da explicação). O preço de cada evento
+não é digitado: vem do fechamento do dia mais próximo da data do evento,
+encontrado por busca binária nas datas ordenadas de cada moeda. Todos os
+eventos de uma moeda são resolvidos em uma única chamada.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+EVENTS_PATH = "data/events.json"
+
+# Distância máxima (dias) entre a data do evento e o dia com cotação usado
+MAX_GAP_DAYS = 3
+
+VIEWS = ("single", "comparison")
+
+
+def load_catalog(path=EVENTS_PATH):
+    """``(cabeçalhos por moeda, eventos)``; os eventos vêm como DataFrame com ``date`` em datetime."""
+    with open(path, encoding="utf-8") as f:
+        catalog = json.load(f)
+    events = pd.DataFrame(catalog.get("events", []))
+    if events.empty:
+        events = pd.DataFrame(columns=["symbol", "date", "title", "label", "color", "views", "details"])
+    events["date"] = pd.to_datetime(events["date"])
+    if "short_label" not in events:
+        events["short_label"] = None
+    events["short_label"] = events["short_label"].fillna(events["label"])
+    return catalog.get("symbols", {}), events
+
+
+def nearest_positions(sorted_values, targets):
+    """Posição do valor mais próximo em ``sorted_values`` para cada alvo (empate: o anterior)."""
+    sorted_values = np.asarray(sorted_values)
+    targets = np.asarray(targets)
+    right = np.clip(np.searchsorted(sorted_values, targets, side="left"), 0, len(sorted_values) - 1)
+    left = np.clip(right - 1, 0, len(sorted_values) - 1)
+    use_left = np.abs(targets - sorted_values[left]) <= np.abs(sorted_values[right] - targets)
+    return np.where(use_left & (left != right), left, right)
+
+
+def resolve_events(events, store, max_gap_days=MAX_GAP_DAYS):
+    """Eventos com ``price_date`` e ``price`` (fechamento do dia mais próximo) de cada moeda em ``store``.
+
+    Eventos de moedas ausentes ou sem cotação a até ``max_gap_days`` dias
+    da data ficam de fora.
+    """
+    parts = []
+    for symbol, group in events.groupby("symbol", sort=False):
+        if symbol not in store:
+            continue
+        dates = store.column(symbol, "Date")
+        if not len(dates):
+            continue
+        days = dates.astype("datetime64[D]")
+        targets = group["date"].to_numpy().astype("datetime64[D]")
+        positions = nearest_positions(days, targets)
+        gap = np.abs((days[positions] - targets).astype("int64"))
+        keep = gap <= max_gap_days
+        resolved = group[keep].copy()
+        resolved["price_date"] = dates[positions[keep]]
+        resolved["price"] = store.column(symbol, "Close")[positions[keep]].astype("float64")
+        parts.append(resolved)
+    if not parts:
+        return events.iloc[0:0].assign(price_date=pd.Series(dtype="datetime64[ns]"), price=pd.Series(dtype="float64"))
+    return pd.concat(parts).sort_values(["symbol", "date"], kind="stable").reset_index(drop=True)
+
+
+def events_for(resolved, symbol, view="single"):
+    """Eventos já resolvidos de uma moeda que aparecem em ``view``."""
+    mask = (resolved["symbol"] == symbol) & resolved["views"].map(lambda views: view in views)
+    return resolved[mask]
+
+
+def format_price(value):
+    """Preço no padrão dos balões: sem centavos a partir de $100."""
+    return f"${value:,.0f}" if abs(value) >= 100 else f"${value:,.2f}"
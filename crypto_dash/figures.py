@@ -0,0 +1,73 @@
+"""Construção de figuras Plotly e cache de figuras já montadas.
+
+Séries longas usam ``go.Scattergl`` (WebGL) acima de ``WEBGL_THRESHOLD``
+pontos. Figuras prontas ficam em um ``FigureCache`` compartilhado, com chave
+(visualização, moeda, intervalo de datas, versão do dataset), e não são
+reconstruídas enquanto essas entradas não mudam; o cache é um ``ResultCache``
+com limite de figuras e de bytes.
+"""
+
+import plotly.graph_objects as go
+
+from crypto_dash.cache import ResultCache
+
+WEBGL_THRESHOLD = 500
+
+GAUGE_LAYOUT = {
+    "height": 200,
+    "margin": {"t": 25, "b": 25, "l": 25, "r": 25},
+    "paper_bgcolor": "rgba(0,0,0,0)",
+    "plot_bgcolor": "rgba(0,0,0,0)",
+}
+
+
+def line_trace(x, y, **kwargs):
+    """``go.Scatter`` para séries curtas e ``go.Scattergl`` para séries longas."""
+    trace_type = go.Scattergl if len(x) > WEBGL_THRESHOLD else go.Scatter
+    return trace_type(x=x, y=y, **kwargs)
+
+
+def gauge_figure(value, title, subtitle, axis_range, color, steps, threshold_color, prefix="", suffix=""):
+    """Velocímetro no estilo padrão do dashboard.
+
+    ``steps`` é uma lista de ``(início, fim, cor)`` das faixas de fundo.
+    """
+    number = {"font": {"size": 18, "color": color}}
+    if prefix:
+        number["prefix"] = prefix
+    if suffix:
+        number["suffix"] = suffix
+
+    fig = go.Figure(
+        go.Indicator(
+            mode="gauge+number",
+            value=value,
+            domain={"x": [0, 1], "y": [0, 1]},
+            title={
+                "text": f"<b>{title}</b><br><span style='font-size:12px'>{subtitle}</span>",
+                "font": {"size": 14, "color": "#333"},
+            },
+            number=number,
+            gauge={
+                "axis": {"range": list(axis_range), "tickwidth": 1, "tickcolor": "darkblue"},
+                "bar": {"color": color},
+                "bgcolor": "white",
+                "borderwidth": 2,
+                "bordercolor": "gray",
+                "steps": [{"range": [lo, hi], "color": step_color} for lo, hi, step_color in steps],
+                "threshold": {"line": {"color": threshold_color, "width": 4}, "thickness": 0.75, "value": value},
+            },
+        )
+    )
+    fig.update_layout(**GAUGE_LAYOUT)
+    return fig
+
+
+class FigureCache(ResultCache):
+    """Cache LRU de figuras, compartilhado entre sessões (as figuras não devem ser alteradas).
+
+    Limitado por número de figuras e pelos bytes dos arrays dos traços.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=256 * 2**20, ttl=None):
+        super().__init__(max_bytes=max_bytes, ttl=ttl, max_entries=max_entries, name="figure")
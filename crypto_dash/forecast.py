@@ -0,0 +1,257 @@
+"""Previsão de preços por moeda com modelos ajustados em segundo plano e salvos em disco.
+
+Três modelos, todos sobre o logaritmo do fechamento:
+
+- ``"arima"``: ARIMA do statsmodels
+- ``"ets"``: suavização exponencial com tendência amortecida
+- ``"gbr"``: gradient boosting (scikit-learn) sobre retornos defasados, previsto passo a passo
+
+Cada modelo ajustado é gravado em ``data/.cache/models/<versão dos dados>/``
+com nome derivado da moeda, do modelo e dos hiperparâmetros. Os ajustes
+rodam em um pool de processos (``ForecastService``); o dashboard só
+consulta o estado e, com o modelo pronto, faz a inferência.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from crypto_dash.loader import CACHE_DIR
+
+MODEL_DIR = os.path.join(CACHE_DIR, "models")
+
+MODELS = {
+    "arima": "ARIMA",
+    "ets": "Suavização Exponencial (ETS)",
+    "gbr": "Gradient Boosting (retornos defasados)",
+}
+
+DEFAULT_PARAMS = {
+    "arima": {"order": [1, 1, 1], "train_days": 730},
+    "ets": {"damped": True, "train_days": 730},
+    "gbr": {"lags": 14, "n_estimators": 200, "max_depth": 3, "learning_rate": 0.05, "train_days": 730},
+}
+
+# Quantil normal da faixa de previsão (80%)
+BAND_Z = 1.2816
+
+
+@dataclass
+class ForecastModel:
+    """Modelo ajustado de uma moeda, pronto para inferência."""
+
+    symbol: str
+    model: str
+    params: dict
+    version: str
+    last_date: pd.Timestamp
+    history: np.ndarray
+    fitted: Any
+    resid_std: float
+
+    @property
+    def label(self):
+        """Nome do modelo para exibição."""
+        return MODELS[self.model]
+
+
+def model_key(symbol, model, params):
+    """Nome do arquivo do modelo: moeda, tipo e hash dos hiperparâmetros."""
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+    return f"{symbol}-{model}-{digest}"
+
+
+def _version_dir(version, model_dir):
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(version))
+    return os.path.join(model_dir, safe)
+
+
+def model_path(symbol, model, params, version, model_dir=MODEL_DIR):
+    return os.path.join(_version_dir(version, model_dir), f"{model_key(symbol, model, params)}.pkl")
+
+
+def _lagged(log_returns, lags):
+    windows = np.lib.stride_tricks.sliding_window_view(log_returns, lags + 1)
+    return windows[:, :-1], windows[:, -1]
+
+
+def fit(symbol, dates, close, model, params, version):
+    """Ajusta um modelo sobre os últimos ``train_days`` fechamentos de uma moeda."""
+    if model not in MODELS:
+        raise ValueError(f"Modelo desconhecido: {model!r} (use um de {tuple(MODELS)})")
+    train = slice(-int(params.get("train_days", 730)), None)
+    dates = pd.DatetimeIndex(dates)[train]
+    log_close = np.log(np.asarray(close, dtype="float64")[train])
+
+    if model == "arima":
+        from statsmodels.tsa.arima.model import ARIMA
+
+        # Só os coeficientes: o resultado completo do statsmodels ocupa ~1,6 MB por moeda
+        fitted = ARIMA(log_close, order=tuple(params["order"])).fit().params
+        resid_std = float(np.sqrt(fitted[-1]))
+    elif model == "ets":
+        from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+        fitted = ExponentialSmoothing(log_close, trend="add", damped_trend=params["damped"]).fit()
+        resid_std = float(np.std(log_close - fitted.fittedvalues, ddof=1))
+    else:
+        from sklearn.ensemble import GradientBoostingRegressor
+
+        X, y = _lagged(np.diff(log_close), params["lags"])
+        fitted = GradientBoostingRegressor(
+            n_estimators=params["n_estimators"],
+            max_depth=params["max_depth"],
+            learning_rate=params["learning_rate"],
+            random_state=0,
+        ).fit(X, y)
+        resid_std = float(np.std(y - fitted.predict(X), ddof=1))
+
+    return ForecastModel(symbol, model, params, str(version), dates[-1], log_close, fitted, resid_std)
+
+
+def predict(fitted, horizon=30):
+    """Previsão diária de ``horizon`` dias: ``Date``, ``forecast``, ``lower`` e ``upper`` (faixa de 80%)."""
+    steps = np.arange(1, horizon + 1)
+    dates = pd.date_range(fitted.last_date + pd.Timedelta(days=1), periods=horizon, freq="D")
+
+    if fitted.model == "arima":
+        from statsmodels.tsa.arima.model import ARIMA
+
+        # Filtro de Kalman com os coeficientes já estimados (sem nova otimização)
+        result = ARIMA(fitted.history, order=tuple(fitted.params["order"])).filter(fitted.fitted).get_forecast(horizon)
+        mean = result.predicted_mean
+        band = BAND_Z * np.sqrt(result.var_pred_mean)
+    elif fitted.model == "ets":
+        mean = fitted.fitted.forecast(horizon)
+        band = BAND_Z * fitted.resid_std * np.sqrt(steps)
+    else:
+        lags = fitted.params["lags"]
+        window = list(np.diff(fitted.history)[-lags:])
+        predicted = []
+        for _ in range(horizon):
+            step = float(fitted.fitted.predict(np.asarray(window[-lags:])[None, :])[0])
+            predicted.append(step)
+            window.append(step)
+        mean = fitted.history[-1] + np.cumsum(predicted)
+        band = BAND_Z * fitted.resid_std * np.sqrt(steps)
+
+    mean = np.asarray(mean, dtype="float64")
+    return pd.DataFrame(
+        {"Date": dates, "forecast": np.exp(mean), "lower": np.exp(mean - band), "upper": np.exp(mean + band)}
+    )
+
+
+def fit_and_save(symbol, dates, close, model, params, version, model_dir=MODEL_DIR):
+    """Ajusta e grava o modelo (usado pelos processos do pool); retorna o caminho."""
+    fitted = fit(symbol, dates, close, model, params, version)
+    path = model_path(symbol, model, params, version, model_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "wb") as f:
+        pickle.dump(fitted, f)
+    os.replace(tmp, path)
+    return path
+
+
+def load_model(symbol, model, params, version, model_dir=MODEL_DIR):
+    """Modelo gravado ou ``None`` se ainda não foi ajustado."""
+    try:
+        with open(model_path(symbol, model, params, version, model_dir), "rb") as f:
+            return pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+def remove_stale_models(version, model_dir=MODEL_DIR):
+    """Apaga os modelos de outras versões dos dados."""
+    if not os.path.isdir(model_dir):
+        return
+    keep = _version_dir(version, model_dir)
+    for entry in os.listdir(model_dir):
+        full = os.path.join(model_dir, entry)
+        if full != keep and os.path.isdir(full):
+            shutil.rmtree(full, ignore_errors=True)
+
+
+class ForecastService:
+    """Ajustes em um pool de processos, sem bloquear quem pede; modelos prontos são lidos do disco."""
+
+    def __init__(self, model_dir=MODEL_DIR, max_workers=None):
+        self.model_dir = model_dir
+        self.max_workers = max_workers
+        self._executor = None
+        self._futures = {}
+        self._models = {}
+        # Erros dos ajustes que falharam, para não reagendá-los a cada rerun
+        self._failed = {}
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._executor is None:
+            # "spawn": processos limpos, sem herdar as threads do servidor
+            context = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=context)
+        return self._executor
+
+    def submit(self, symbol, dates, close, model, params, version):
+        """Agenda o ajuste se o modelo ainda não existe, não está em andamento nem já falhou nesta versão."""
+        key = (symbol, model, model_key(symbol, model, params), str(version))
+        with self._lock:
+            if key in self._models or key in self._futures or key in self._failed:
+                return
+            fitted = load_model(symbol, model, params, version, self.model_dir)
+            if fitted is not None:
+                self._models[key] = fitted
+                return
+            self._futures[key] = self._pool().submit(
+                fit_and_save, symbol, np.asarray(dates), np.asarray(close), model, params, version, self.model_dir
+            )
+
+    def get(self, symbol, model, params, version):
+        """``(estado, modelo ou erro)``; estado é ``"ready"``, ``"pending"``, ``"failed"`` ou ``"missing"``.
+
+        ``"missing"`` também vale para um ajuste concluído cujo arquivo sumiu
+        ou está corrompido: o próximo ``submit`` o agenda de novo.
+        """
+        key = (symbol, model, model_key(symbol, model, params), str(version))
+        with self._lock:
+            if key in self._models:
+                return "ready", self._models[key]
+            if key in self._failed:
+                return "failed", self._failed[key]
+            future = self._futures.get(key)
+            if future is None:
+                return "missing", None
+            if not future.done():
+                return "pending", None
+            del self._futures[key]
+            error = future.exception()
+            if error is not None:
+                self._failed[key] = error
+                return "failed", error
+            fitted = load_model(symbol, model, params, version, self.model_dir)
+            if fitted is None:
+                return "missing", None
+            self._models[key] = fitted
+            return "ready", fitted
+
+    def forget(self, version):
+        """Descarta da memória os modelos e as falhas de outras versões dos dados."""
+        with self._lock:
+            self._models = {k: v for k, v in self._models.items() if k[3] == str(version)}
+            self._failed = {k: v for k, v in self._failed.items() if k[3] == str(version)}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
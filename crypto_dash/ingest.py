@@ -0,0 +1,248 @@
+"""Ingestão incremental de novas linhas OHLCV sem recalcular o histórico.
+
+O estado de cada moeda (último fechamento, retorno acumulado, pico, drawdown e
+episódio de drawdown em aberto) fica salvo em disco. Novos arquivos CSV
+colocados na pasta de entrada são processados apenas a partir desse estado,
+com custo proporcional às linhas novas, e gravados como lotes Parquet que são
+concatenados à tabela de métricas base.
+
+Uso::
+
+    python -m crypto_dash.ingest            # processa data/incoming/*.csv
+    python -m crypto_dash.ingest novo.csv   # processa arquivos específicos
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from crypto_dash.episodes import DEFAULT_ENTRY, DEFAULT_EXIT, drawdown_episodes, episode_bounds
+from crypto_dash.loader import CACHE_DIR, DATA_PATH, dataset_fingerprint, load_dataset, read_csv_typed
+from crypto_dash.metrics import build_metrics_table, classify_returns, downcast_metrics
+
+DROP_DIR = os.path.join("data", "incoming")
+INGEST_DIR = os.path.join(CACHE_DIR, "ingest")
+STATE_FILE = "state.json"
+
+
+@dataclass
+class SymbolState:
+    """Tudo o que é preciso para continuar as métricas de uma moeda a partir da última linha."""
+
+    last_date: str
+    last_close: float
+    cumulative: float
+    peak: float
+    in_drawdown: bool = False
+    episode_start: Optional[str] = None
+    episode_depth: Optional[float] = None
+
+
+def state_from_metrics(table, entry=DEFAULT_ENTRY, exit=DEFAULT_EXIT):
+    """Estado inicial de cada moeda a partir da tabela de métricas completa (feito uma única vez)."""
+    states = {}
+    for symbol, data in table.groupby("Symbol", observed=True, sort=False):
+        last = data.iloc[-1]
+        episodes = drawdown_episodes(data["Date"], data["Drawdown"], entry, exit)
+        open_episode = episodes[~episodes["recovered"]] if len(episodes) else episodes
+        states[str(symbol)] = SymbolState(
+            last_date=last["Date"].isoformat(),
+            last_close=float(last["Close"]),
+            cumulative=float(last["Cumulative_Return"]),
+            peak=float(last["Peak"]),
+            in_drawdown=bool(len(open_episode)),
+            episode_start=open_episode["start"].iloc[0].isoformat() if len(open_episode) else None,
+            episode_depth=float(open_episode["depth"].iloc[0]) if len(open_episode) else None,
+        )
+    return states
+
+
+def advance(state, rows, entry=DEFAULT_ENTRY, exit=DEFAULT_EXIT):
+    """Métricas das linhas novas de uma moeda (ordenadas por data) e o estado atualizado.
+
+    As mesmas fórmulas de ``compute_metrics``, semeadas com o último
+    fechamento, o retorno acumulado e o pico salvos no estado.
+    """
+    rows = rows.copy()
+    closes = rows["Close"].to_numpy(dtype="float64")
+    previous = np.concatenate(([state.last_close], closes[:-1]))
+
+    returns = (closes / previous - 1) * 100
+    cumulative = state.cumulative * np.cumprod(1 + returns / 100)
+    peak = np.maximum.accumulate(np.concatenate(([state.peak], cumulative)))[1:]
+    drawdown = (cumulative / peak - 1) * 100
+
+    rows["Return"] = returns
+    rows["Return_Status"] = classify_returns(rows["Return"])
+    rows["Cumulative_Return"] = cumulative
+    rows["Peak"] = peak
+    rows["Drawdown"] = drawdown
+    downcast_metrics(rows)
+
+    # Transições alternam entre início e recuperação a partir do estado salvo
+    starts, ends = episode_bounds(drawdown, entry, exit, in_drawdown=state.in_drawdown)
+    dates = pd.DatetimeIndex(rows["Date"])
+    in_drawdown = len(starts) - len(ends) + int(state.in_drawdown) == 1
+    if in_drawdown and len(starts):
+        episode_start = dates[starts[-1]].isoformat()
+        episode_depth = float(np.nanmin(drawdown[starts[-1]:]))
+    elif in_drawdown:
+        episode_start = state.episode_start
+        episode_depth = float(min(state.episode_depth, np.nanmin(drawdown)))
+    else:
+        episode_start, episode_depth = None, None
+
+    new_state = SymbolState(
+        last_date=dates[-1].isoformat(),
+        last_close=float(closes[-1]),
+        cumulative=float(cumulative[-1]),
+        peak=float(peak[-1]),
+        in_drawdown=bool(in_drawdown),
+        episode_start=episode_start,
+        episode_depth=episode_depth,
+    )
+    return rows, new_state
+
+
+def load_state(ingest_dir=INGEST_DIR):
+    """``(fingerprint do CSV base, estados por moeda)`` ou ``(None, {})`` se ainda não houver estado."""
+    path = os.path.join(ingest_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return None, {}
+    with open(path) as f:
+        payload = json.load(f)
+    return payload["base"], {symbol: SymbolState(**s) for symbol, s in payload["symbols"].items()}
+
+
+def save_state(base, states, ingest_dir=INGEST_DIR):
+    os.makedirs(ingest_dir, exist_ok=True)
+    path = os.path.join(ingest_dir, STATE_FILE)
+    payload = {"base": base, "symbols": {symbol: asdict(s) for symbol, s in states.items()}}
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def increment_files(ingest_dir=INGEST_DIR):
+    return sorted(glob.glob(os.path.join(ingest_dir, "batch-*.parquet")))
+
+
+def increments_fingerprint(ingest_dir=INGEST_DIR):
+    """Muda a cada lote gravado; usado como parte da chave de cache da tabela de métricas.
+
+    Resumo de tamanho fixo (nome, tamanho e mtime de cada lote): a versão
+    entra nos nomes das pastas de cache e não pode crescer com os lotes.
+    """
+    files = increment_files(ingest_dir)
+    if not files:
+        return "base"
+    digest = hashlib.sha1()
+    for path in files:
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def load_increments(base, ingest_dir=INGEST_DIR):
+    """Linhas já processadas pelos lotes, se o estado pertencer ao CSV base ``base``."""
+    saved_base, _ = load_state(ingest_dir)
+    files = increment_files(ingest_dir)
+    if saved_base != base or not files:
+        return None
+    increments = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+    # Lotes gravados antes dos códigos int8 guardam a classificação como texto
+    increments["Return_Status"] = classify_returns(increments["Return"])
+    return downcast_metrics(increments)
+
+
+def append_increments(table, base, ingest_dir=INGEST_DIR):
+    """Tabela de métricas base + lotes incrementais, ordenada por (Symbol, Date)."""
+    increments = load_increments(base, ingest_dir)
+    if increments is None:
+        return table
+    combined = pd.concat([table, increments[table.columns.intersection(increments.columns)]], ignore_index=True)
+    for column in ("Symbol", "Name"):
+        combined[column] = combined[column].astype("category")
+    combined = combined.sort_values(["Symbol", "Date"], kind="stable").reset_index(drop=True)
+    combined["SNo"] = np.arange(1, len(combined) + 1, dtype="int32")
+    return combined
+
+
+def ingest(paths, data_path=DATA_PATH, ingest_dir=INGEST_DIR):
+    """Processa os CSVs ``paths`` e grava um novo lote; retorna as linhas adicionadas.
+
+    Linhas com data até a última já processada de cada moeda são ignoradas.
+    Moedas fora do dataset base não têm período comum definido e também são
+    ignoradas (listadas em ``skipped``).
+    """
+    base = dataset_fingerprint(data_path)
+    saved_base, states = load_state(ingest_dir)
+    if saved_base != base:
+        # CSV base mudou (ou primeira execução): lotes antigos não valem mais
+        shutil.rmtree(ingest_dir, ignore_errors=True)
+        states = state_from_metrics(build_metrics_table(load_dataset(data_path, fingerprint=base)))
+
+    new_rows = pd.concat([read_csv_typed(p) for p in paths], ignore_index=True)
+    new_rows = new_rows.sort_values(["Symbol", "Date"], kind="stable").drop_duplicates(["Symbol", "Date"], keep="last")
+
+    batches, skipped = [], []
+    for symbol, rows in new_rows.groupby("Symbol", observed=True, sort=False):
+        symbol = str(symbol)
+        if symbol not in states:
+            skipped.append(symbol)
+            continue
+        rows = rows[rows["Date"] > pd.Timestamp(states[symbol].last_date)]
+        if rows.empty:
+            continue
+        metrics, states[symbol] = advance(states[symbol], rows)
+        batches.append(metrics)
+
+    os.makedirs(ingest_dir, exist_ok=True)
+    added = pd.concat(batches, ignore_index=True) if batches else new_rows.iloc[0:0]
+    if batches:
+        for column in ("Symbol", "Name"):
+            added[column] = added[column].astype(str)
+        added.to_parquet(os.path.join(ingest_dir, f"batch-{time.time_ns()}.parquet"), index=False)
+    save_state(base, states, ingest_dir)
+    added.attrs["skipped"] = skipped
+    return added
+
+
+def ingest_drop_folder(drop_dir=DROP_DIR, data_path=DATA_PATH, ingest_dir=INGEST_DIR):
+    """Processa todos os CSVs da pasta de entrada e os move para ``processed/``."""
+    paths = sorted(glob.glob(os.path.join(drop_dir, "*.csv")))
+    if not paths:
+        return None
+    added = ingest(paths, data_path, ingest_dir)
+    processed = os.path.join(drop_dir, "processed")
+    os.makedirs(processed, exist_ok=True)
+    for path in paths:
+        shutil.move(path, os.path.join(processed, os.path.basename(path)))
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestão incremental de novas linhas OHLCV")
+    parser.add_argument("files", nargs="*", help=f"CSVs a processar (padrão: {DROP_DIR}/*.csv)")
+    args = parser.parse_args()
+
+    added = ingest(args.files) if args.files else ingest_drop_folder()
+    if added is None:
+        print(f"Nenhum arquivo em {DROP_DIR}")
+        return
+    print(f"{len(added)} linhas adicionadas")
+    if added.attrs.get("skipped"):
+        print(f"Moedas ignoradas (fora do dataset base): {', '.join(added.attrs['skipped'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Ingestão em streaming de candles intradiários (horários, de minuto) com memória limitada.
+
+O CSV é lido em blocos (``read_csv_chunks``) e as métricas de cada moeda
+(retorno, retorno acumulado, pico, drawdown e episódio em aberto) são
+continuadas de um bloco para o outro pelo mesmo ``advance`` da ingestão
+incremental: nenhum bloco precisa das linhas anteriores, só do estado.
+Cada bloco processado é gravado em Parquet particionado por moeda e mês::
+
+    data/.cache/intraday/<arquivo>/partitions/Symbol=BTC/month=2021-07/<parte>.parquet
+
+A memória usada depende de ``chunksize``, não do tamanho do histórico, e a
+leitura de uma moeda ou de um intervalo abre só as partições necessárias.
+As linhas de cada moeda devem vir em ordem cronológica (as moedas podem se
+intercalar); linhas com horário até o último já processado são ignoradas,
+o que também permite retomar uma ingestão interrompida.
+
+Uso::
+
+    python -m crypto_dash.intraday candles.csv --chunksize 2000000
+"""
+
+import argparse
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from crypto_dash.episodes import DEFAULT_ENTRY, DEFAULT_EXIT
+from crypto_dash.ingest import SymbolState, advance, load_state, save_state
+from crypto_dash.loader import CACHE_DIR, DATE_FORMAT, dataset_fingerprint, read_csv_chunks
+
+INTRADAY_DIR = os.path.join(CACHE_DIR, "intraday")
+DEFAULT_CHUNKSIZE = 1_000_000
+
+
+def intraday_dir(path, out_dir=INTRADAY_DIR):
+    """Pasta de um CSV intradiário: estado por moeda em ``state.json`` e as partições em ``partitions/``."""
+    return os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0])
+
+
+def partition_dir(path, out_dir=INTRADAY_DIR):
+    return os.path.join(intraday_dir(path, out_dir), "partitions")
+
+
+def _first_state(rows):
+    # Semente neutra: o primeiro retorno sai 0 e é trocado por NaN, como em ``compute_metrics``
+    first = rows.iloc[0]
+    return SymbolState(
+        last_date=(first["Date"] - pd.Timedelta(microseconds=1)).isoformat(),
+        last_close=float(first["Close"]),
+        cumulative=1.0,
+        peak=1.0,
+    )
+
+
+def stream_metrics(chunks, states=None, entry=DEFAULT_ENTRY, exit=DEFAULT_EXIT):
+    """Gera ``(bloco com as métricas, linhas ignoradas)`` para cada bloco, atualizando ``states`` no lugar.
+
+    ``states`` (moeda -> ``SymbolState``) guarda onde cada moeda parou;
+    moedas novas começam do zero.
+    """
+    states = {} if states is None else states
+    for chunk in chunks:
+        chunk = chunk.sort_values(["Symbol", "Date"], kind="stable")
+        parts, dropped = [], 0
+        for symbol, rows in chunk.groupby("Symbol", observed=True, sort=False):
+            symbol = str(symbol)
+            rows = rows.drop_duplicates("Date", keep="last")
+            first = symbol not in states
+            if first:
+                states[symbol] = _first_state(rows)
+            fresh = rows[rows["Date"] > pd.Timestamp(states[symbol].last_date)]
+            dropped += len(rows) - len(fresh)
+            if fresh.empty:
+                continue
+            metrics, states[symbol] = advance(states[symbol], fresh, entry, exit)
+            if first:
+                metrics.iloc[0, metrics.columns.get_loc("Return")] = np.nan
+            parts.append(metrics)
+        if parts:
+            yield pd.concat(parts, ignore_index=True), dropped
+        else:
+            yield chunk.iloc[0:0], dropped
+
+
+def write_partitions(rows, directory):
+    """Acrescenta as linhas às partições ``Symbol=<moeda>/month=<AAAA-MM>`` de ``directory``."""
+    rows = rows.assign(month=rows["Date"].to_numpy().astype("datetime64[M]").astype(str))
+    for column in ("Symbol", "Name"):
+        rows[column] = rows[column].astype(str)
+    rows.to_parquet(
+        directory,
+        index=False,
+        partition_cols=["Symbol", "month"],
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+    )
+
+
+def ingest_intraday(path, out_dir=INTRADAY_DIR, chunksize=DEFAULT_CHUNKSIZE, date_format=DATE_FORMAT):
+    """Processa o CSV ``path`` bloco a bloco e grava as partições; retorna ``(linhas gravadas, ignoradas)``.
+
+    Se o CSV mudou desde a última execução, as partições antigas são
+    apagadas e tudo é reprocessado; senão, só entram as linhas depois do
+    último horário salvo de cada moeda.
+    """
+    directory = intraday_dir(path, out_dir)
+    base = dataset_fingerprint(path)
+    saved_base, states = load_state(directory)
+    if saved_base != base:
+        shutil.rmtree(directory, ignore_errors=True)
+        states = {}
+    os.makedirs(directory, exist_ok=True)
+
+    written = dropped = 0
+    for rows, skipped in stream_metrics(read_csv_chunks(path, chunksize, date_format), states):
+        dropped += skipped
+        if len(rows):
+            write_partitions(rows, partition_dir(path, out_dir))
+            written += len(rows)
+        # Estado salvo a cada bloco: uma execução interrompida continua de onde parou
+        save_state(base, states, directory)
+    return written, dropped
+
+
+def read_partitions(path, symbol, start=None, end=None, out_dir=INTRADAY_DIR, columns=None):
+    """Linhas de uma moeda com ``start <= Date <= end``, lendo só as partições dos meses envolvidos.
+
+    ``columns`` limita as colunas lidas; ``Date`` é lida sempre (recorte e
+    ordenação) e só volta no resultado se estiver em ``columns``.
+    """
+    read_columns = None if columns is None else list(dict.fromkeys([*columns, "Date"]))
+    filters = [("Symbol", "==", symbol)]
+    if start is not None:
+        start = pd.Timestamp(start)
+        filters.append(("month", ">=", start.strftime("%Y-%m")))
+    if end is not None:
+        end = pd.Timestamp(end)
+        filters.append(("month", "<=", end.strftime("%Y-%m")))
+    rows = pd.read_parquet(partition_dir(path, out_dir), columns=read_columns, filters=filters)
+    if start is not None:
+        rows = rows[rows["Date"] >= start]
+    if end is not None:
+        rows = rows[rows["Date"] <= end]
+    rows = rows.drop(columns=["Symbol", "month"], errors="ignore").sort_values("Date").reset_index(drop=True)
+    return rows if columns is None or "Date" in columns else rows.drop(columns="Date")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestão em blocos de candles intradiários")
+    parser.add_argument("file", help="CSV no formato de cryptocurrency.csv, com horário em Date")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="linhas por bloco")
+    parser.add_argument("--date-format", default=DATE_FORMAT, help="formato da coluna Date")
+    parser.add_argument("--out-dir", default=INTRADAY_DIR, help="onde gravar as partições")
+    args = parser.parse_args()
+
+    written, dropped = ingest_intraday(args.file, args.out_dir, args.chunksize, args.date_format)
+    print(f"{written} linhas gravadas em {partition_dir(args.file, args.out_dir)}")
+    if dropped:
+        print(f"{dropped} linhas ignoradas (fora de ordem ou já processadas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Carregamento tipado do dataset de criptomoedas com snapshot colunar em disco.
+
+O CSV é lido uma única vez com tipos explícitos; o resultado é gravado em
+Parquet dentro de ``data/.cache`` com o nome derivado da impressão digital do
+arquivo (mtime + hash do conteúdo). Enquanto o CSV não mudar, as próximas
+cargas leem apenas o snapshot.
+"""
+
+import hashlib
+import os
+
+import pandas as pd
+
+from crypto_dash.profiling import stage
+
+DATA_PATH = "data/cryptocurrency.csv"
+CACHE_DIR = os.path.join("data", ".cache")
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+CSV_DTYPES = {
+    "SNo": "int32",
+    "Name": "category",
+    "Symbol": "category",
+    "High": "float32",
+    "Low": "float32",
+    "Open": "float32",
+    "Close": "float32",
+    "Volume": "float64",
+    "Marketcap": "float64",
+}
+
+# Hash do conteúdo por (caminho, tamanho, mtime) para não reler o arquivo a cada rerun
+_content_hashes = {}
+
+
+def _content_hash(path, size, mtime_ns):
+    key = (os.path.abspath(path), size, mtime_ns)
+    if key not in _content_hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _content_hashes[key] = digest.hexdigest()[:16]
+    return _content_hashes[key]
+
+
+def dataset_fingerprint(path=DATA_PATH):
+    """Identificador da versão do CSV: muda sempre que o arquivo muda."""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{_content_hash(path, stat.st_size, stat.st_mtime_ns)}"
+
+
+def read_csv_typed(path=DATA_PATH, date_format=DATE_FORMAT):
+    """Lê o CSV com dtypes explícitos e a coluna Date já convertida."""
+    with stage("read_csv"):
+        df = pd.read_csv(path, dtype=CSV_DTYPES)
+    with stage("to_datetime"):
+        df["Date"] = pd.to_datetime(df["Date"], format=date_format)
+    return df
+
+
+def read_csv_chunks(path, chunksize=1_000_000, date_format=DATE_FORMAT):
+    """Lê o CSV em blocos de ``chunksize`` linhas, com os mesmos tipos de ``read_csv_typed``.
+
+    Para arquivos intradiários (dezenas de milhões de linhas) que não cabem
+    de uma vez na memória; o formato explícito evita a inferência de datas
+    em cada bloco.
+    """
+    with pd.read_csv(path, dtype=CSV_DTYPES, chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk["Date"] = pd.to_datetime(chunk["Date"], format=date_format)
+            yield chunk
+
+
+def _snapshot_path(path, fingerprint):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{name}-{fingerprint}.parquet")
+
+
+def _select(df, columns=None, period=None):
+    if period is not None:
+        df = df[(df["Date"] >= period[0]) & (df["Date"] <= period[1])].reset_index(drop=True)
+    return df if columns is None else df[list(columns)]
+
+
+def load_dataset(path=DATA_PATH, fingerprint=None, columns=None, period=None):
+    """Carrega o dataset, reaproveitando o snapshot Parquet da mesma versão do CSV.
+
+    ``columns`` e ``period`` (``(inicio, fim)``, inclusivo em ``Date``) são
+    aplicados na leitura do snapshot: colunas e grupos de linhas de fora não
+    chegam a ser convertidos para o pandas. Sem ``pyarrow`` instalado o
+    snapshot é ignorado e o CSV é lido diretamente (e recortado depois).
+    """
+    if fingerprint is None:
+        fingerprint = dataset_fingerprint(path)
+    snapshot = _snapshot_path(path, fingerprint)
+    filters = None if period is None else [("Date", ">=", period[0]), ("Date", "<=", period[1])]
+
+    try:
+        with stage("read_parquet"):
+            return pd.read_parquet(snapshot, columns=None if columns is None else list(columns), filters=filters)
+    except ImportError:
+        return _select(read_csv_typed(path), columns, period)
+    except (FileNotFoundError, OSError, ValueError):
+        pass
+
+    df = read_csv_typed(path)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{snapshot}.tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, snapshot)
+        _remove_stale_snapshots(path, keep=snapshot)
+    except (ImportError, OSError):
+        pass
+    return _select(df, columns, period)
+
+
+def _remove_stale_snapshots(path, keep):
+    name = os.path.splitext(os.path.basename(path))[0]
+    for entry in os.listdir(CACHE_DIR):
+        full = os.path.join(CACHE_DIR, entry)
+        if entry.startswith(f"{name}-") and entry.endswith(".parquet") and full != keep:
+            os.remove(full)
@@ -0,0 +1,75 @@
+"""Tabela de métricas derivadas por moeda, calculada uma vez por versão do dataset.
+
+Todas as colunas usadas pelos velocímetros (retorno diário, classificação,
+retorno acumulado, pico e drawdown) são calculadas de forma vetorizada por
+``groupby`` sobre o período comum entre as moedas. Os componentes da página
+apenas fatiam essa tabela.
+"""
+
+import numpy as np
+
+from crypto_dash.store import is_sorted
+
+
+def common_period(df):
+    """Intervalo em que todas as moedas têm dados: (maior data inicial, menor data final)."""
+    dates = df.groupby("Symbol", observed=True)["Date"]
+    return dates.min().max(), dates.max().min()
+
+
+def filter_common_period(df):
+    start_date, end_date = common_period(df)
+    inside = (df["Date"] >= start_date) & (df["Date"] <= end_date)
+    # Já recortado na leitura: sem a cópia da máscara
+    return df if inside.all() else df[inside]
+
+
+# Códigos de ``Return_Status`` (sinal do retorno) e os nomes exibidos
+RETURN_STATUS = {1: "Positivo", -1: "Negativo", 0: "Neutro"}
+
+# Colunas derivadas guardadas em float32; os compostos são calculados em float64 antes da conversão
+FLOAT32_COLUMNS = ("Return", "Cumulative_Return", "Peak", "Drawdown")
+
+
+def classify_returns(returns):
+    """Classificação vetorizada em ``int8``: 1 (positivo), -1 (negativo) ou 0 (neutro, inclui NaN)."""
+    return np.sign(np.nan_to_num(np.asarray(returns, dtype="float64"))).astype(np.int8)
+
+
+def downcast_metrics(table):
+    """Converte as colunas de ``FLOAT32_COLUMNS`` presentes em ``table`` para float32 (no lugar)."""
+    for column in table.columns.intersection(FLOAT32_COLUMNS):
+        table[column] = table[column].astype("float32")
+    return table
+
+
+def compute_metrics(df):
+    """Retorna uma cópia de ``df`` ordenada por (Symbol, Date) com as colunas derivadas (float32).
+
+    - ``Return``: variação percentual diária do fechamento
+    - ``Return_Status``: sinal do retorno em ``int8`` (nomes em ``RETURN_STATUS``)
+    - ``Cumulative_Return``: crescimento acumulado de 1 unidade investida
+    - ``Peak``: máximo acumulado do retorno acumulado
+    - ``Drawdown``: queda percentual em relação ao pico
+    """
+    # Já ordenada (como o snapshot de dados sintéticos): sem a cópia da ordenação
+    out = df if is_sorted(df) else df.sort_values(["Symbol", "Date"], kind="stable")
+    out = out.reset_index(drop=True)
+    by_symbol = out.groupby("Symbol", observed=True, sort=False)
+
+    # Compostos em float64 para não acumular erro de arredondamento dos preços float32
+    out["Return"] = by_symbol["Close"].pct_change().astype("float64") * 100
+    out["Return_Status"] = classify_returns(out["Return"])
+
+    growth = 1 + out["Return"].fillna(0) / 100
+    out["Cumulative_Return"] = growth.groupby(out["Symbol"], observed=True, sort=False).cumprod()
+    out["Peak"] = out.groupby("Symbol", observed=True, sort=False)["Cumulative_Return"].cummax()
+    out["Drawdown"] = (out["Cumulative_Return"] / out["Peak"] - 1) * 100
+    return downcast_metrics(out)
+
+
+def build_metrics_table(df):
+    """Filtra o período comum e calcula as métricas de todas as moedas de uma vez."""
+    table = compute_metrics(filter_common_period(df))
+    table["SNo"] = np.arange(1, len(table) + 1, dtype="int32")
+    return table
@@ -0,0 +1,125 @@
+"""Análise de outliers por moeda, vetorizada com ``groupby``.
+
+Três modos de limite:
+
+- ``"iqr"``: Q1 - k*IQR / Q3 + k*IQR sobre todo o histórico de cada moeda
+- ``"rolling_iqr"``: o mesmo critério com quartis de uma janela móvel
+- ``"zscore"``: |valor - média| / desvio acima de ``z`` (janela móvel se ``window`` for dado)
+
+Os modos com janela assumem as linhas de cada moeda em ordem cronológica.
+O resultado traz o resumo por moeda pronto e só materializa as linhas
+outliers quando elas são pedidas.
+"""
+
+import numpy as np
+import pandas as pd
+
+from crypto_dash.profiling import profiled
+
+METHODS = ("iqr", "rolling_iqr", "zscore")
+
+
+class OutlierReport:
+    """Resumo por moeda mais a máscara de outliers alinhada ao DataFrame analisado."""
+
+    def __init__(self, df, column, mask, summary):
+        self._df = df
+        self.column = column
+        self.mask = mask
+        self.summary = summary
+        self._index = None
+        self._dates = {}
+
+    @property
+    def index(self):
+        """Índice das linhas outliers (calculado no primeiro acesso)."""
+        if self._index is None:
+            self._index = self._df.index[self.mask.to_numpy()]
+        return self._index
+
+    def dates(self, symbol):
+        """Linhas outliers (``Date`` e coluna analisada) de uma moeda."""
+        if symbol not in self._dates:
+            rows = self._df.loc[self.mask.to_numpy(), ["Symbol", "Date", self.column]]
+            self._dates[symbol] = rows.loc[rows["Symbol"] == symbol, ["Date", self.column]]
+        return self._dates[symbol]
+
+    def __getitem__(self, symbol):
+        row = self.summary.loc[symbol]
+        has_outliers = row["count"] > 0
+        return {
+            "count": int(row["count"]),
+            "percentage": row["percentage"],
+            "extreme_high": row["extreme_high"] if has_outliers else None,
+            "extreme_low": row["extreme_low"] if has_outliers else None,
+            "dates": self.dates(symbol) if has_outliers else pd.DataFrame(),
+        }
+
+    def __contains__(self, symbol):
+        return symbol in self.summary.index
+
+    def __iter__(self):
+        return iter(self.summary.index)
+
+    def __len__(self):
+        return len(self.summary)
+
+
+def _rolling(grouped, window, stat, *args):
+    rolled = getattr(grouped.rolling(window, min_periods=window), stat)(*args)
+    return rolled.reset_index(level=0, drop=True).reindex(grouped.obj.index)
+
+
+def outlier_mask(df, column="Volume", method="iqr", window=None, k=1.5, z=3.0):
+    """Máscara booleana dos outliers de ``column``, calculada por moeda."""
+    if method not in METHODS:
+        raise ValueError(f"Método desconhecido: {method!r} (use um de {METHODS})")
+    if method == "rolling_iqr" and not window:
+        raise ValueError("O modo 'rolling_iqr' exige uma janela (window)")
+
+    values = df[column]
+    grouped = values.groupby(df["Symbol"], observed=True, sort=False)
+
+    if method == "zscore":
+        if window:
+            mean = _rolling(grouped, window, "mean")
+            std = _rolling(grouped, window, "std")
+        else:
+            mean = grouped.transform("mean")
+            std = grouped.transform("std")
+        scores = (values - mean) / std.replace(0, np.nan)
+        return scores.abs() > z
+
+    if method == "rolling_iqr":
+        q1 = _rolling(grouped, window, "quantile", 0.25)
+        q3 = _rolling(grouped, window, "quantile", 0.75)
+    else:
+        quartiles = grouped.quantile([0.25, 0.75]).unstack()
+        q1 = df["Symbol"].map(quartiles[0.25]).astype("float64")
+        q3 = df["Symbol"].map(quartiles[0.75]).astype("float64")
+
+    iqr = q3 - q1
+    return (values < q1 - k * iqr) | (values > q3 + k * iqr)
+
+
+@profiled()
+def analyze_volume_outliers(df, column="Volume", method="iqr", window=None, k=1.5, z=3.0):
+    """Analisa outliers sem removê-los automaticamente"""
+    mask = outlier_mask(df, column, method=method, window=window, k=k, z=z).fillna(False).astype(bool)
+
+    symbols = df["Symbol"]
+    outlier_values = df[column].where(mask)
+    by_symbol = outlier_values.groupby(symbols, observed=True, sort=False)
+    counts = mask.groupby(symbols, observed=True, sort=False).sum()
+    sizes = symbols.groupby(symbols, observed=True, sort=False).size()
+
+    summary = pd.DataFrame(
+        {
+            "count": counts,
+            "percentage": counts / sizes * 100,
+            "extreme_high": by_symbol.max(),
+            "extreme_low": by_symbol.min(),
+        }
+    )
+    summary.index.name = "Symbol"
+    return OutlierReport(df, column, mask, summary)
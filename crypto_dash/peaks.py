@@ -0,0 +1,114 @@
+"""Picos locais, máximas históricas (ATH) e proeminência de cada moeda.
+
+Tudo é calculado uma vez por conjunto de parâmetros para todas as moedas e
+guardado em uma tabela longa só com as linhas marcadas. Cada visualização
+lê o seu conjunto de marcadores já filtrado:
+
+- ``"single"``: picos locais (``find_peaks`` acima da média, ``distance`` dias)
+- ``"comparison"``: dias de nova máxima histórica
+
+O ``scipy.signal`` (mais de 1 s de import) só é carregado no primeiro
+cálculo de picos, não ao importar o módulo.
+"""
+
+import numpy as np
+import pandas as pd
+
+from crypto_dash.profiling import profiled
+
+DEFAULT_DISTANCE = 30
+
+PEAK_COLUMNS = ["Symbol", "Date", "Close", "is_peak", "prominence", "is_ath", "ath_run"]
+
+
+@profiled("find_peaks")
+def local_peaks(close, distance=DEFAULT_DISTANCE, height=None):
+    """Posições dos máximos locais e suas proeminências (altura mínima: a média, por padrão)."""
+    from scipy.signal import find_peaks, peak_prominences
+
+    close = np.asarray(close, dtype="float64")
+    if len(close) < 3:
+        return np.array([], dtype=np.int64), np.array([], dtype="float64")
+    peaks, _ = find_peaks(close, height=close.mean() if height is None else height, distance=distance)
+    return peaks, peak_prominences(close, peaks)[0]
+
+
+def ath_mask(close):
+    """Dias em que o fechamento iguala ou supera o maior fechamento anterior."""
+    close = np.asarray(close, dtype="float64")
+    return close >= np.fmax.accumulate(close)
+
+
+def ath_runs(mask):
+    """Número da sequência de máximas históricas consecutivas de cada dia (0 fora de uma sequência)."""
+    mask = np.asarray(mask, dtype=bool)
+    starts = mask & ~np.r_[False, mask[:-1]]
+    return np.where(mask, np.cumsum(starts), 0)
+
+
+def peak_table(store, distance=DEFAULT_DISTANCE, height=None):
+    """Picos e máximas históricas de todas as moedas de um ``SymbolStore``, só com as linhas marcadas."""
+    frame = store.frame
+    close = frame["Close"].to_numpy(dtype="float64")
+    is_peak = np.zeros(len(close), dtype=bool)
+    prominence = np.full(len(close), np.nan)
+    is_ath = np.zeros(len(close), dtype=bool)
+    runs = np.zeros(len(close), dtype=np.int64)
+
+    for symbol in store:
+        rows = store.positions(symbol)
+        peaks, prominences = local_peaks(close[rows], distance, height)
+        is_peak[rows.start + peaks] = True
+        prominence[rows.start + peaks] = prominences
+        is_ath[rows] = ath_mask(close[rows])
+        runs[rows] = ath_runs(is_ath[rows])
+
+    marked = np.flatnonzero(is_peak | is_ath)
+    return pd.DataFrame(
+        {
+            "Symbol": frame["Symbol"].to_numpy()[marked],
+            "Date": frame["Date"].to_numpy()[marked],
+            "Close": close[marked],
+            "is_peak": is_peak[marked],
+            "prominence": prominence[marked],
+            "is_ath": is_ath[marked],
+            "ath_run": runs[marked],
+        },
+        columns=PEAK_COLUMNS,
+    )
+
+
+def _symbol_slices(symbols):
+    symbols = np.asarray(symbols)
+    if not len(symbols):
+        return {}
+    starts = np.flatnonzero(np.r_[True, symbols[1:] != symbols[:-1]])
+    stops = np.append(starts[1:], len(symbols))
+    return {symbols[a]: slice(a, b) for a, b in zip(starts, stops)}
+
+
+class PeakMarkers:
+    """Marcadores pré-filtrados por visualização sobre uma ``peak_table``; cada moeda é uma fatia contígua."""
+
+    def __init__(self, table):
+        self.table = table
+        self._views = {
+            "single": table.loc[table["is_peak"].to_numpy(), ["Symbol", "Date", "Close", "prominence"]],
+            "comparison": table.loc[table["is_ath"].to_numpy(), ["Symbol", "Date", "Close", "ath_run"]],
+        }
+        self._slices = {view: _symbol_slices(rows["Symbol"].to_numpy()) for view, rows in self._views.items()}
+        self._markers = {}
+
+    @property
+    def nbytes(self):
+        """Memória da ``peak_table`` e das linhas pré-filtradas de cada visualização."""
+        frames = [self.table, *self._views.values()]
+        return int(sum(frame.memory_usage(index=True, deep=True).sum() for frame in frames))
+
+    def __call__(self, symbol, view="single"):
+        """Marcadores (``Date``, ``Close`` e a coluna da visualização) de uma moeda."""
+        key = (symbol, view)
+        if key not in self._markers:
+            rows = self._views[view]
+            self._markers[key] = rows.iloc[self._slices[view].get(symbol, slice(0, 0)), 1:]
+        return self._markers[key]
@@ -0,0 +1,180 @@
+"""Grafo preguiçoso das computações nomeadas do dashboard.
+
+Cada nó tem um nome, as dependências e a função que o calcula a partir
+delas. Nada roda ao montar o grafo: um nó só é calculado quando alguém o
+pede (``pipeline["drawdown_stats"]``), depois das suas dependências, e o
+resultado fica memorizado. Assim cada página paga só pelo caminho que usa::
+
+    snapshot -> base_metrics -> metrics -> symbol_store / rollups
+                                       -> drawdown_stats -> (velocímetros)
+
+O grafo é dividido em dois níveis, como a chave dos caches do dashboard: o
+``base_pipeline`` depende só da versão do CSV; o ``dataset_pipeline``
+acrescenta os lotes da ingestão incremental e herda os nós do nível base,
+que não são recalculados quando só os lotes mudam. Os nós podem ser pedidos
+por várias sessões ao mesmo tempo: cada um tem a sua trava e é calculado
+uma única vez, e o valor é compartilhado (somente leitura) por todas elas.
+"""
+
+import threading
+
+import pandas as pd
+
+from crypto_dash import engine
+from crypto_dash.cache import sizeof
+from crypto_dash.episodes import DEFAULT_ENTRY, DEFAULT_EXIT
+from crypto_dash.ingest import append_increments, load_increments
+from crypto_dash.loader import DATA_PATH, load_dataset
+from crypto_dash.metrics import build_metrics_table, common_period
+from crypto_dash.peaks import PeakMarkers, peak_table
+from crypto_dash.profiling import count_hit, stage
+from crypto_dash.rolling import rolling_metrics
+from crypto_dash.rollups import load_or_build as load_rollups
+from crypto_dash.store import SymbolStore
+from crypto_dash.wide import FIELDS
+from crypto_dash.wide import load_or_build as load_wide
+
+
+class Pipeline:
+    """Nós ``nome -> (dependências, função)`` avaliados sob demanda e memorizados.
+
+    ``inputs`` são valores prontos (versões, caminhos) usados como
+    dependências; nomes que não estão em ``nodes`` nem em ``inputs`` são
+    procurados em ``parent``. Os nós de ``transient`` não são memorizados:
+    são recalculados por quem os pede e liberados depois (para valores
+    baratos de refazer que não precisam ficar na memória).
+    """
+
+    def __init__(self, nodes, parent=None, transient=(), **inputs):
+        self.nodes = dict(nodes)
+        self.parent = parent
+        self.transient = frozenset(transient)
+        self._values = dict(inputs)
+        self._locks = {name: threading.Lock() for name in self.nodes}
+
+    def __contains__(self, name):
+        return name in self.nodes or name in self._values or (self.parent is not None and name in self.parent)
+
+    def __getitem__(self, name):
+        if name in self._values:
+            if name in self.nodes:
+                count_hit(f"node:{name}")
+            return self._values[name]
+        if name not in self.nodes:
+            if self.parent is None:
+                raise KeyError(name)
+            return self.parent[name]
+        deps, fn = self.nodes[name]
+        if name in self.transient:
+            return self._evaluate(name, deps, fn)
+        with self._locks[name]:
+            if name not in self._values:
+                self._values[name] = self._evaluate(name, deps, fn)
+            else:
+                count_hit(f"node:{name}")
+        return self._values[name]
+
+    def _evaluate(self, name, deps, fn):
+        args = [self[dep] for dep in deps]
+        # Etapa só do próprio nó; as dependências aparecem como etapas separadas
+        with stage(f"node:{name}"):
+            return fn(*args)
+
+    def ready(self, name):
+        """Se o nó já foi calculado (aqui ou no nível base)."""
+        if name in self._values:
+            return True
+        return name not in self.nodes and self.parent is not None and self.parent.ready(name)
+
+    def evaluated(self):
+        """Nomes dos nós já calculados, na ordem em que ficaram prontos (inclui o nível base)."""
+        own = [name for name in self._values if name in self.nodes]
+        return (self.parent.evaluated() if self.parent is not None else []) + own
+
+    def memory(self):
+        """Bytes aproximados (``cache.sizeof``) de cada nó já calculado, incluindo o nível base.
+
+        Um nó que só reaproveita a tabela de um nó anterior (``metrics`` sem
+        lotes, ``symbol_store`` sobre ``metrics``) conta 0.
+        """
+        out, seen = {}, set()
+        for name in self.evaluated():
+            value = self[name]
+            shared = getattr(value, "frame", value)
+            out[name] = 0 if id(value) in seen or id(shared) in seen else sizeof(value)
+            seen.update((id(value), id(shared)))
+        return out
+
+
+def _by_name(frame):
+    # Índice por nome da moeda (str), como em ``engine.summarize``
+    frame.index = frame.index.astype(str)
+    frame.index.name = "Symbol"
+    return frame
+
+
+def _common_period_rows(path, fingerprint):
+    # Só Symbol e Date para achar o período; depois só as linhas dele são lidas do snapshot
+    period = common_period(load_dataset(path, fingerprint, columns=("Symbol", "Date")))
+    return load_dataset(path, fingerprint, period=period)
+
+
+def _wide_rows(dataset, increments):
+    if increments is None:
+        return dataset
+    columns = ["Symbol", "Date", *FIELDS]
+    return pd.concat([dataset[columns], increments[columns]], ignore_index=True)
+
+
+def _return_matrix(wide):
+    rows = wide.common_rows()
+    return pd.DatetimeIndex(wide.dates[rows]), wide.symbols, wide.returns(rows)
+
+
+BASE_NODES = {
+    "dataset": (("data_path", "fingerprint"), lambda path, fingerprint: load_dataset(path, fingerprint=fingerprint)),
+    # Período comum e métricas no mesmo nó: o recorte intermediário não fica retido na memória
+    "base_metrics": (
+        ("data_path", "fingerprint"),
+        lambda path, fingerprint: build_metrics_table(_common_period_rows(path, fingerprint)),
+    ),
+}
+
+NODES = {
+    "increments": (("fingerprint",), load_increments),
+    "metrics": (("base_metrics", "fingerprint"), append_increments),
+    "symbol_store": (("metrics",), SymbolStore),
+    "price_stats": (("metrics",), lambda table: _by_name(engine.price_stats(table))),
+    "risk_return": (("metrics",), lambda table: _by_name(engine.risk_return(table))),
+    "drawdown_stats": (("metrics",), lambda table: _by_name(engine.drawdown_stats(table))),
+    "trend_stats": (("metrics",), lambda table: _by_name(engine.trend_stats(table))),
+    "recovery_stats": (
+        ("metrics",),
+        lambda table: _by_name(engine.recovery_stats(table, entry=DEFAULT_ENTRY, exit=DEFAULT_EXIT)),
+    ),
+    "volume_stats": (("metrics",), lambda table: _by_name(engine.volume_stats(table))),
+    "wide": (
+        ("dataset", "increments", "version"),
+        lambda dataset, increments, version: load_wide(_wide_rows(dataset, increments), version),
+    ),
+    "return_matrix": (("wide",), _return_matrix),
+    "rollups": (("metrics", "version"), load_rollups),
+    "rolling": (("symbol_store",), lambda store: SymbolStore(rolling_metrics(store.frame))),
+    "peak_markers": (("symbol_store",), lambda store: PeakMarkers(peak_table(store))),
+}
+
+
+def base_pipeline(fingerprint, data_path=DATA_PATH):
+    """Nós que dependem só da versão do CSV (carga, período comum e métricas base).
+
+    O dataset bruto não fica retido: as métricas leem do snapshot Parquet só
+    as linhas do período comum, e as matrizes largas, que precisam do
+    histórico completo, o releem só quando não estão gravadas.
+    """
+    return Pipeline(BASE_NODES, transient=("dataset",), data_path=data_path, fingerprint=fingerprint)
+
+
+def dataset_pipeline(base, increments_version):
+    """Nós da versão completa dos dados (CSV + lotes incrementais), herdando os de ``base``."""
+    version = f"{base['fingerprint']}-{increments_version}"
+    return Pipeline(NODES, parent=base, increments_version=increments_version, version=version)
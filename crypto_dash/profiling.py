@@ -0,0 +1,197 @@
+"""Perfil leve das etapas de uma execução (rerun) do dashboard.
+
+Trechos nomeados são marcados com o gerenciador de contexto ``stage`` ou o
+decorador ``profiled``; acertos de cache são contados com ``count_hit``.
+Sem um ``Profiler`` ativo na thread, as marcações não fazem nada além de
+uma consulta a uma variável de contexto. Com um ativo, cada etapa acumula
+tempo de parede (inclusivo: etapas aninhadas contam também na de fora),
+número de chamadas, acertos de cache e o maior pico de bytes alocados em
+uma chamada (``tracemalloc``, só quando ``trace_memory=True``).
+
+O ``tracemalloc`` vale para o processo inteiro: enquanto algum perfil com
+memória estiver aberto, todas as sessões ficam mais lentas.
+
+Uso (ou ``profiler.start()`` / ``profiler.stop()`` quando o trecho medido
+não cabe em um bloco ``with``, como o script do Streamlit)::
+
+    with Profiler(trace_memory=True) as profiler:
+        with stage("load"):
+            ...
+    profiler.export("profile.jsonl", page="Dashboard Principal")
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+_active = contextvars.ContextVar("crypto_dash_profiler", default=None)
+
+# Perfis com memória abertos; o tracemalloc é ligado pelo primeiro e desligado pelo último
+# (se já estava ligado por outro motivo, fica como estava)
+_tracing = 0
+_tracing_owned = False
+_tracing_lock = threading.Lock()
+
+
+def _start_tracing():
+    global _tracing, _tracing_owned
+    with _tracing_lock:
+        if _tracing == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing += 1
+
+
+def _stop_tracing():
+    global _tracing, _tracing_owned
+    with _tracing_lock:
+        _tracing -= 1
+        if _tracing == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+class Profiler:
+    """Etapas de uma execução: ``nome -> {seconds, calls, hits, bytes}``, na ordem em que apareceram."""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.started = None
+        self.seconds = 0.0
+        self._stack = []
+        self._running = False
+
+    def start(self):
+        """Passa a medir as etapas desta thread (substitui um perfil que tenha ficado aberto)."""
+        stale = _active.get()
+        if stale is not None and stale is not self:
+            stale.stop()
+        if self.trace_memory:
+            _start_tracing()
+        self.started = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._running = True
+        _active.set(self)
+        return self
+
+    def stop(self):
+        """Encerra a medição; pode ser chamado mais de uma vez."""
+        if not self._running:
+            return self
+        self._running = False
+        self.seconds = time.perf_counter() - self._start
+        if _active.get() is self:
+            _active.set(None)
+        if self.trace_memory:
+            _stop_tracing()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def _entry(self, name):
+        if name not in self.stages:
+            self.stages[name] = {"seconds": 0.0, "calls": 0, "hits": 0, "bytes": 0}
+        return self.stages[name]
+
+    def _enter_stage(self):
+        if not self.trace_memory:
+            return
+        # O pico do tracemalloc é único: a etapa de fora guarda o que viu antes de ele ser zerado
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            self._stack[-1][1] = max(self._stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        self._stack.append([current, current])
+
+    def _exit_stage(self):
+        if not self.trace_memory:
+            return 0
+        _, peak = tracemalloc.get_traced_memory()
+        start, seen = self._stack.pop()
+        seen = max(seen, peak)
+        if self._stack:
+            self._stack[-1][1] = max(self._stack[-1][1], seen)
+        return seen - start
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        entry = self._entry(name)
+        self._enter_stage()
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["seconds"] += time.perf_counter() - start
+            entry["calls"] += 1
+            entry["bytes"] = max(entry["bytes"], self._exit_stage())
+
+    def count_hit(self, name):
+        self._entry(name)["hits"] += 1
+
+    def record(self, **extra):
+        """Registro da execução: início, duração total, campos de ``extra`` e as etapas."""
+        return {
+            "timestamp": self.started.isoformat(timespec="milliseconds") if self.started else None,
+            "seconds": self.seconds,
+            **extra,
+            "stages": [{"name": name, **entry} for name, entry in self.stages.items()],
+        }
+
+    def export(self, path, **extra):
+        """Acrescenta o registro como uma linha JSON em ``path`` (formato JSONL)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps(self.record(**extra), ensure_ascii=False, default=str) + "\n")
+
+
+def active():
+    """``Profiler`` ativo nesta thread, ou ``None``."""
+    return _active.get()
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Mede o bloco como a etapa ``name`` do perfil ativo (sem perfil, não mede nada)."""
+    profiler = _active.get()
+    if profiler is None:
+        yield None
+        return
+    with profiler.stage(name) as entry:
+        yield entry
+
+
+def count_hit(name):
+    """Conta um acerto de cache para a etapa ``name`` do perfil ativo."""
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.count_hit(name)
+
+
+def profiled(name=None):
+    """Decorador: cada chamada da função é medida como a etapa ``name`` (padrão: o nome da função)."""
+
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active.get() is None:
+                return fn(*args, **kwargs)
+            with stage(label):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
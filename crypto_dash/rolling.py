@@ -0,0 +1,128 @@
+"""Métricas de risco em janelas móveis (Sharpe, volatilidade e drawdown máximo).
+
+Cada série é percorrida uma única vez por janela, com custo O(n):
+
+- média e desvio por Welford deslizante (entra um valor, sai outro)
+- drawdown máximo por prefixos e sufixos em blocos de ``window`` dias
+  (van Herk/Gil-Werman)
+
+``MaxDD_<w>`` é a pior queda de pico a vale com os dois dentro dos mesmos
+``window`` dias.
+Valores só aparecem quando a janela está completa.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from crypto_dash.engine import PERIODS_PER_YEAR
+
+ROLLING_WINDOWS = (30, 90, 365)
+
+
+def rolling_mean_std(values, window):
+    """Média e desvio amostral (ddof=1) móveis; NaN até a janela completar.
+
+    NaNs iniciais (o primeiro retorno de cada moeda) são ignorados; a série
+    não deve ter NaN depois do primeiro valor válido.
+    """
+    values = np.asarray(values, dtype="float64")
+    n = len(values)
+    means = np.full(n, np.nan)
+    stds = np.full(n, np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if window < 2 or not len(valid):
+        return means, stds
+
+    first = int(valid[0])
+    xs = values.tolist()
+    mean = m2 = 0.0
+    count = 0
+    for i in range(first, n):
+        x = xs[i]
+        if count < window:
+            count += 1
+            delta = x - mean
+            mean += delta / count
+            m2 += delta * (x - mean)
+        else:
+            old = xs[i - window]
+            previous = mean
+            mean += (x - old) / window
+            m2 += (x - old) * (x - mean + old - previous)
+        if count == window:
+            means[i] = mean
+            stds[i] = math.sqrt(max(m2, 0.0) / (window - 1))
+    return means, stds
+
+
+def _block_scan(values, window):
+    # Máximo, mínimo e pior drawdown (razão) de cada prefixo e de cada sufixo dentro de blocos de ``window`` valores
+    n = len(values)
+    blocks = -(-n // window)
+    padded = np.concatenate((values, np.full(blocks * window - n, values[-1]))).reshape(blocks, window)
+
+    prefix_max = np.maximum.accumulate(padded, axis=1)
+    prefix_min = np.minimum.accumulate(padded, axis=1)
+    prefix_dd = np.minimum.accumulate(padded / prefix_max - 1, axis=1)
+
+    reverse = padded[:, ::-1]
+    suffix_max = np.maximum.accumulate(reverse, axis=1)[:, ::-1]
+    suffix_min = np.minimum.accumulate(reverse, axis=1)[:, ::-1]
+    # Pior queda de um sufixo: para cada ponto como pico, o mínimo que vem depois dele no bloco
+    later_min = np.concatenate((suffix_min[:, 1:], padded[:, -1:]), axis=1)
+    suffix_dd = np.minimum.accumulate(np.minimum(later_min / padded - 1, 0)[:, ::-1], axis=1)[:, ::-1]
+    return [a.ravel()[:n] for a in (prefix_max, prefix_min, prefix_dd, suffix_max, suffix_dd)]
+
+
+def rolling_max_drawdown(cumulative, window):
+    """Pior queda (%) de pico a vale dentro de cada janela de ``window`` dias (pico e vale na mesma janela).
+
+    Método de van Herk/Gil-Werman: a janela que termina em ``i`` é o sufixo de
+    um bloco de ``window`` dias seguido do prefixo do bloco seguinte, e o pior
+    drawdown da junção é o pior de cada parte ou a queda do máximo do sufixo
+    ao mínimo do prefixo. Custo O(n) em operações vetorizadas.
+    """
+    cumulative = np.asarray(cumulative, dtype="float64")
+    n = len(cumulative)
+    worst = np.full(n, np.nan)
+    if window < 1 or n < window:
+        return worst
+    prefix_max, prefix_min, prefix_dd, suffix_max, suffix_dd = _block_scan(cumulative, window)
+
+    end = np.arange(window - 1, n)
+    start = end - window + 1
+    joined = np.minimum(np.minimum(suffix_dd[start], prefix_dd[end]), prefix_min[end] / suffix_max[start] - 1)
+    # Janela alinhada a um bloco: o prefixo já é a janela inteira
+    aligned = start % window == 0
+    worst[end] = np.where(aligned, prefix_dd[end], joined) * 100
+    return worst
+
+
+def symbol_rolling_metrics(returns, cumulative, windows=ROLLING_WINDOWS, periods=PERIODS_PER_YEAR):
+    """Colunas ``Sharpe_<w>``, ``Volatility_<w>`` (anualizados) e ``MaxDD_<w>`` de uma moeda."""
+    columns = {}
+    for window in windows:
+        mean, std = rolling_mean_std(returns, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = np.where(std > 0, mean / std, 0.0) * math.sqrt(periods)
+        columns[f"Sharpe_{window}"] = np.where(np.isnan(std), np.nan, sharpe)
+        columns[f"Volatility_{window}"] = std * math.sqrt(periods)
+        columns[f"MaxDD_{window}"] = rolling_max_drawdown(cumulative, window)
+    return columns
+
+
+def rolling_metrics(table, windows=ROLLING_WINDOWS, periods=PERIODS_PER_YEAR):
+    """Métricas móveis (float32) de todas as moedas, alinhadas às linhas de ``table`` (ordenada por Symbol, Date)."""
+    out = table[["Symbol", "Date"]]
+    parts = []
+    for _, data in table.groupby("Symbol", observed=True, sort=False):
+        columns = symbol_rolling_metrics(
+            data["Return"].to_numpy(), data["Cumulative_Return"].to_numpy(), windows, periods
+        )
+        # Calculadas em float64, guardadas em float32 como as colunas da tabela de métricas
+        parts.append(pd.DataFrame(columns, index=data.index, dtype="float32"))
+    if parts:
+        out = out.join(pd.concat(parts))
+    return out
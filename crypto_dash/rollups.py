@@ -0,0 +1,160 @@
+"""Barras OHLCV agregadas por semana, mês, trimestre e ano para todas as moedas.
+
+As tabelas de agregados são montadas uma vez por versão dos dados a partir
+da tabela de métricas (ordenada por moeda e data): cada período de cada
+moeda é um bloco contíguo de linhas, agregado com ``reduceat`` em um único
+passe. Sazonalidade e gráficos de longo prazo leem essas tabelas pequenas
+em vez de reagrupar as linhas diárias. As tabelas ficam gravadas em Parquet
+em ``data/.cache/rollups-<versão>/``.
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from crypto_dash.loader import CACHE_DIR
+from crypto_dash.store import SymbolStore
+
+# Frequências dos agregados (códigos de período do pandas)
+FREQUENCIES = {"W": "Semanal", "M": "Mensal", "Q": "Trimestral", "Y": "Anual"}
+
+ROLLUP_COLUMNS = [
+    "Symbol",
+    "Date",
+    "End",
+    "Open",
+    "High",
+    "Low",
+    "Close",
+    "Volume",
+    "Marketcap",
+    "days",
+    "Return",
+    "mean_return",
+]
+
+
+def rollup(table, freq):
+    """Barras de ``freq`` de todas as moedas de uma tabela ordenada por (Symbol, Date).
+
+    ``Date`` é o início do período e ``End`` o último dia com cotação;
+    abertura do primeiro dia, máxima e mínima do período, fechamento e
+    market cap do último dia, volume somado, ``days`` com cotação,
+    ``Return`` (% do fechamento contra o do período anterior da moeda) e
+    ``mean_return`` (média dos retornos diários, em %).
+    """
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Frequência desconhecida: {freq!r} (use uma de {tuple(FREQUENCIES)})")
+    if not len(table):
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+
+    # Códigos inteiros da moeda: comparar strings (categorias do Arrow) custa mais que a agregação inteira
+    symbols = pd.factorize(table["Symbol"])[0]
+    periods = pd.DatetimeIndex(table["Date"]).to_period(freq)
+    ordinals = periods.asi8
+    starts = np.flatnonzero(np.r_[True, (symbols[1:] != symbols[:-1]) | (ordinals[1:] != ordinals[:-1])])
+    stops = np.append(starts[1:], len(table))
+
+    def column(name):
+        return table[name].to_numpy(dtype="float64")
+
+    close = column("Close")
+    daily = column("Return")
+    valid = ~np.isnan(daily)
+    counted = np.add.reduceat(valid.astype(np.int64), starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_return = np.add.reduceat(np.where(valid, daily, 0.0), starts) / counted
+
+    out = pd.DataFrame(
+        {
+            "Symbol": table["Symbol"].iloc[starts].reset_index(drop=True),
+            "Date": periods[starts].start_time,
+            "End": table["Date"].to_numpy()[stops - 1],
+            "Open": column("Open")[starts],
+            "High": np.maximum.reduceat(column("High"), starts),
+            "Low": np.minimum.reduceat(column("Low"), starts),
+            "Close": close[stops - 1],
+            "Volume": np.add.reduceat(column("Volume"), starts),
+            "Marketcap": column("Marketcap")[stops - 1],
+            "days": stops - starts,
+            "Return": np.nan,
+            "mean_return": mean_return,
+        },
+        columns=ROLLUP_COLUMNS,
+    )
+    same_symbol = np.r_[False, symbols[starts][1:] == symbols[starts][:-1]]
+    previous = np.r_[np.nan, out["Close"].to_numpy()[:-1]]
+    out["Return"] = np.where(same_symbol, (out["Close"].to_numpy() / previous - 1) * 100, np.nan)
+    return out
+
+
+def build_rollups(table, freqs=tuple(FREQUENCIES)):
+    """Agregados de todas as frequências em ``freqs``, cada um como ``SymbolStore``."""
+    table = table.sort_values(["Symbol", "Date"], kind="stable")
+    return {freq: SymbolStore(rollup(table, freq)) for freq in freqs}
+
+
+def seasonality(monthly, symbol, years=None):
+    """Perfil por mês do ano de uma moeda a partir dos agregados mensais.
+
+    ``years`` limita aos anos informados (ex.: só anos completos). Colunas:
+    ``Month`` (1-12), ``months`` agregados, ``mean_return`` (média dos
+    retornos diários, ponderada pelos dias), ``monthly_return`` (retorno
+    mensal médio, %), ``volume_mean`` (volume diário médio) e ``volume``
+    (volume somado).
+    """
+    rows = monthly[symbol]
+    if years is not None:
+        rows = rows[rows["Date"].dt.year.isin(list(years))]
+    month = rows["Date"].dt.month
+    weighted = (rows["mean_return"] * rows["days"]).groupby(month).sum()
+    grouped = rows.groupby(month)
+    out = pd.DataFrame(
+        {
+            "months": grouped.size(),
+            "mean_return": weighted / grouped["days"].sum(),
+            "monthly_return": grouped["Return"].mean(),
+            "volume_mean": grouped["Volume"].sum() / grouped["days"].sum(),
+            "volume": grouped["Volume"].sum(),
+        }
+    )
+    out.index.name = "Month"
+    return out.reset_index()
+
+
+def _rollup_dir(version, cache_dir):
+    return os.path.join(cache_dir, f"rollups-{version}")
+
+
+def load_or_build(table, version, cache_dir=CACHE_DIR, freqs=tuple(FREQUENCIES)):
+    """Agregados da versão ``version`` gravados em disco, ou montados a partir de ``table`` e gravados.
+
+    Se o disco (ou o Parquet) não puder ser usado, devolve os agregados em memória.
+    """
+    directory = _rollup_dir(version, cache_dir)
+    try:
+        return {freq: SymbolStore(pd.read_parquet(os.path.join(directory, f"{freq}.parquet"))) for freq in freqs}
+    except (FileNotFoundError, OSError, ValueError, ImportError):
+        pass
+
+    rollups = build_rollups(table, freqs)
+    tmp = f"{directory}.tmp-{os.getpid()}"
+    try:
+        os.makedirs(tmp, exist_ok=True)
+        for freq, store in rollups.items():
+            store.frame.to_parquet(os.path.join(tmp, f"{freq}.parquet"), index=False)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp, directory)
+        _remove_stale(cache_dir, keep=directory)
+    except (OSError, ImportError):
+        shutil.rmtree(tmp, ignore_errors=True)
+    return rollups
+
+
+def _remove_stale(cache_dir, keep):
+    for entry in os.listdir(cache_dir):
+        full = os.path.join(cache_dir, entry)
+        if entry.startswith("rollups-") and full != keep and os.path.isdir(full):
+            shutil.rmtree(full, ignore_errors=True)
@@ -0,0 +1,83 @@
+"""Armazenamento particionado por moeda.
+
+As linhas são ordenadas uma única vez por (Symbol, Date); cada moeda passa a
+ocupar um bloco contíguo e o acesso ao seu recorte é uma fatia posicional
+(sem varrer a tabela inteira com máscaras booleanas).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def is_sorted(df):
+    """Se as linhas de ``df`` já estão na ordem que ``sort_values(["Symbol", "Date"])`` deixaria."""
+    symbols = df["Symbol"]
+    categorical = isinstance(symbols.dtype, pd.CategoricalDtype)
+    # Categorias são ordenadas pelos códigos, como em ``sort_values``; moeda ausente (-1) iria para o fim
+    keys = symbols.cat.codes.to_numpy() if categorical else symbols.to_numpy()
+    if categorical and len(keys) and keys.min() < 0:
+        return False
+    dates = df["Date"].to_numpy()
+    same = keys[1:] == keys[:-1]
+    return bool(np.all((keys[1:] > keys[:-1]) | (same & (dates[1:] >= dates[:-1]))))
+
+
+class SymbolStore:
+    """Recortes contíguos por moeda sobre uma tabela longa ordenada por (Symbol, Date)."""
+
+    def __init__(self, df):
+        # A tabela de métricas já vem ordenada e com índice 0..n-1: reaproveitada sem cópia
+        if not (is_sorted(df) and df.index.equals(pd.RangeIndex(len(df)))):
+            df = df.sort_values(["Symbol", "Date"], kind="stable").reset_index(drop=True)
+        self.frame = df
+        symbols = self.frame["Symbol"]
+        # Códigos das categorias: comparar inteiros, sem materializar um array de objetos
+        keys = symbols.cat.codes.to_numpy() if isinstance(symbols.dtype, pd.CategoricalDtype) else symbols.to_numpy()
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], int)
+        stops = np.append(starts[1:], len(keys))
+        names = symbols.iloc[starts].to_numpy() if len(keys) else []
+        self._slices = {name: slice(a, b) for name, a, b in zip(names, starts, stops)}
+        self._frames = {}
+
+    @property
+    def symbols(self):
+        return list(self._slices)
+
+    def __getitem__(self, symbol):
+        if symbol not in self._frames:
+            self._frames[symbol] = self.frame.iloc[self._slices[symbol]]
+        return self._frames[symbol]
+
+    def __contains__(self, symbol):
+        return symbol in self._slices
+
+    def __iter__(self):
+        return iter(self._slices)
+
+    def __len__(self):
+        return len(self._slices)
+
+    @property
+    def nbytes(self):
+        """Memória da tabela (os recortes por moeda são visões sobre ela)."""
+        return int(self.frame.memory_usage(index=True, deep=True).sum())
+
+    def positions(self, symbol):
+        """Fatia posicional das linhas de uma moeda em ``frame``."""
+        return self._slices[symbol]
+
+    def column(self, symbol, column):
+        """Valores de uma coluna de uma moeda como array NumPy."""
+        return self.frame[column].to_numpy()[self._slices[symbol]]
+
+    def range(self, symbol, start=None, end=None):
+        """Linhas de uma moeda com ``start <= Date <= end`` (busca binária nas datas ordenadas)."""
+        dates = self.column(symbol, "Date")
+        lo = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), side="left")
+        hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), side="right")
+        return self[symbol].iloc[lo:hi]
+
+    def date_range(self):
+        """Primeira e última data da tabela inteira."""
+        dates = self.frame["Date"]
+        return dates.min(), dates.max()
@@ -0,0 +1,152 @@
+"""Armazenamento largo (data × moeda) em arrays float32 mapeados do disco.
+
+Cada campo OHLCV vira uma matriz densa com uma linha por data e uma coluna
+por moeda; datas sem cotação ficam NaN e a máscara ``valid`` marca onde há
+dado. As matrizes são gravadas uma vez como ``.npy`` em
+``data/.cache/wide-<versão>/`` e abertas com ``mmap_mode="r"``: o período
+comum, a comparação entre moedas e as correlações passam a ser fatias
+dessas matrizes, sem cópia.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from crypto_dash.loader import CACHE_DIR
+
+FIELDS = ("Open", "High", "Low", "Close", "Volume", "Marketcap")
+
+
+class WideStore:
+    """Matrizes (data × moeda) por campo, mais as datas, as moedas e a máscara de presença."""
+
+    def __init__(self, dates, symbols, arrays, valid):
+        self.dates = dates
+        self.symbols = list(symbols)
+        self.arrays = arrays
+        self.valid = valid
+        self._columns = {symbol: k for k, symbol in enumerate(self.symbols)}
+        self._common = None
+
+    @classmethod
+    def from_long(cls, df, fields=FIELDS):
+        """Monta as matrizes a partir da tabela longa (linhas repetidas de uma moeda/data: vale a última)."""
+        date_codes, dates = pd.factorize(df["Date"], sort=True)
+        symbol_codes, symbols = pd.factorize(df["Symbol"].astype(str), sort=True)
+        shape = (len(dates), len(symbols))
+
+        valid = np.zeros(shape, dtype=bool)
+        valid[date_codes, symbol_codes] = True
+        arrays = {}
+        for field in fields:
+            values = np.full(shape, np.nan, dtype="float32")
+            values[date_codes, symbol_codes] = df[field].to_numpy(dtype="float32")
+            arrays[field] = values
+        return cls(dates.to_numpy(dtype="datetime64[ns]"), symbols.tolist(), arrays, valid)
+
+    def save(self, directory):
+        """Grava em ``directory`` (substituindo de forma atômica uma versão anterior)."""
+        tmp = f"{directory}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, "dates.npy"), self.dates)
+        np.save(os.path.join(tmp, "valid.npy"), self.valid)
+        for field, values in self.arrays.items():
+            np.save(os.path.join(tmp, f"{field}.npy"), values)
+        with open(os.path.join(tmp, "symbols.json"), "w") as f:
+            json.dump({"symbols": self.symbols, "fields": list(self.arrays)}, f)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp, directory)
+
+    @classmethod
+    def load(cls, directory):
+        """Abre as matrizes gravadas como memória mapeada (somente leitura)."""
+        with open(os.path.join(directory, "symbols.json")) as f:
+            meta = json.load(f)
+        arrays = {field: np.load(os.path.join(directory, f"{field}.npy"), mmap_mode="r") for field in meta["fields"]}
+        return cls(
+            np.load(os.path.join(directory, "dates.npy")),
+            meta["symbols"],
+            arrays,
+            np.load(os.path.join(directory, "valid.npy"), mmap_mode="r"),
+        )
+
+    def __contains__(self, symbol):
+        return symbol in self._columns
+
+    @property
+    def nbytes(self):
+        """Bytes das matrizes, da máscara e das datas (mapeados do disco quando vêm de ``load``)."""
+        return int(sum(values.nbytes for values in self.arrays.values()) + self.valid.nbytes + self.dates.nbytes)
+
+    def column(self, symbol, field="Close", rows=slice(None)):
+        """Valores de uma moeda (visão sem cópia da coluna da matriz)."""
+        return self.arrays[field][rows, self._columns[symbol]]
+
+    def rows(self, start=None, end=None):
+        """Fatia de linhas com ``start <= data <= end`` (busca binária)."""
+        lo = 0 if start is None else np.searchsorted(self.dates, np.datetime64(start, "ns"), side="left")
+        hi = len(self.dates) if end is None else np.searchsorted(self.dates, np.datetime64(end, "ns"), side="right")
+        return slice(int(lo), int(hi))
+
+    def symbol_range(self, symbol):
+        """Primeira e última posição com dado de uma moeda."""
+        present = np.flatnonzero(self.valid[:, self._columns[symbol]])
+        return int(present[0]), int(present[-1])
+
+    def common_rows(self, symbols=None):
+        """Fatia das datas em que todas as moedas (ou as de ``symbols``) já têm e ainda têm dados."""
+        if symbols is None and self._common is not None:
+            return self._common
+        bounds = [self.symbol_range(symbol) for symbol in (self.symbols if symbols is None else symbols)]
+        rows = slice(max(lo for lo, _ in bounds), min(hi for _, hi in bounds) + 1)
+        if symbols is None:
+            self._common = rows
+        return rows
+
+    def common_period(self, symbols=None):
+        """(primeira, última) data do período comum, como ``metrics.common_period``."""
+        rows = self.common_rows(symbols)
+        return self.dates[rows.start], self.dates[rows.stop - 1]
+
+    def returns(self, rows=slice(None), field="Close"):
+        """Retornos diários (%) em float64 de todas as moedas nas linhas ``rows``; a primeira linha é NaN."""
+        prices = np.asarray(self.arrays[field][rows], dtype="float64")
+        out = np.full(prices.shape, np.nan)
+        out[1:] = (prices[1:] / prices[:-1] - 1) * 100
+        return out
+
+
+def _wide_dir(version, cache_dir):
+    return os.path.join(cache_dir, f"wide-{version}")
+
+
+def load_or_build(df, version, cache_dir=CACHE_DIR):
+    """Abre a versão ``version`` gravada em disco ou monta a partir de ``df`` e grava.
+
+    Se o disco não puder ser usado, devolve as matrizes em memória.
+    """
+    directory = _wide_dir(version, cache_dir)
+    try:
+        return WideStore.load(directory)
+    except (FileNotFoundError, OSError, ValueError, KeyError):
+        pass
+
+    store = WideStore.from_long(df)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        store.save(directory)
+        _remove_stale(cache_dir, keep=directory)
+        return WideStore.load(directory)
+    except OSError:
+        return store
+
+
+def _remove_stale(cache_dir, keep):
+    for entry in os.listdir(cache_dir):
+        full = os.path.join(cache_dir, entry)
+        if entry.startswith("wide-") and full != keep and os.path.isdir(full):
+            shutil.rmtree(full, ignore_errors=True)
@@ -1,159 +1,642 @@
+import glob
+import json
+import os
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import matplotlib.pyplot as plt
-
-
-st.set_page_config(page_title="Crypto Dash",page_icon="data/image.png",layout="wide")
-
-df = pd.read_csv("data/cryptocurrency.csv")
-
-# Função para limpeza de outliers no volume
-def analyze_volume_outliers(df, column='Volume'):
-    """Analisa outliers sem removê-los automaticamente"""
-    outlier_info = {}
-    
-    for symbol in df['Symbol'].unique():
-        symbol_data = df[df['Symbol'] == symbol]
-        Q1 = symbol_data[column].quantile(0.25)
-        Q3 = symbol_data[column].quantile(0.75)
-        IQR = Q3 - Q1
-        lower = Q1 - 1.5 * IQR
-        upper = Q3 + 1.5 * IQR
-        
-        # Identificar outliers
-        outliers = symbol_data[(symbol_data[column] < lower) | (symbol_data[column] > upper)]
-        
-        outlier_info[symbol] = {
-            'count': len(outliers),
-            'percentage': (len(outliers) / len(symbol_data)) * 100,
-            'extreme_high': outliers[column].max() if len(outliers) > 0 else None,
-            'extreme_low': outliers[column].min() if len(outliers) > 0 else None,
-            'dates': outliers[['Date', column]].copy() if len(outliers) > 0 else pd.DataFrame()
-        }
-    
-    return outlier_info
+from plotly.colors import qualitative
 
-menu = st.sidebar.radio(
-    "📌 Navegação",
-    ["Dashboard Principal", "Análise BTC 2021"]
-)
+from crypto_dash.cache import ResultCache
+from crypto_dash.correlation import all_pairs, correlation_matrix, rolling_correlation_frame, shrinkage_available
+from crypto_dash.downsample import downsample_bars, downsample_line, visible_slice
+from crypto_dash.episodes import DEFAULT_ENTRY, DEFAULT_EXIT
+from crypto_dash.events import EVENTS_PATH, events_for, format_price, load_catalog, resolve_events
+from crypto_dash.figures import FigureCache, gauge_figure, line_trace
+from crypto_dash.forecast import DEFAULT_PARAMS, MODELS, ForecastService, predict, remove_stale_models
+from crypto_dash.ingest import DROP_DIR, increments_fingerprint, ingest_drop_folder
+from crypto_dash.loader import DATA_PATH, dataset_fingerprint
+from crypto_dash.metrics import classify_returns
+from crypto_dash.peaks import ath_mask
+from crypto_dash.pipeline import base_pipeline, dataset_pipeline
+from crypto_dash.profiling import Profiler, stage
+from crypto_dash.rolling import ROLLING_WINDOWS
 
-if menu == "Dashboard Principal":
-    st.title("📊 Dashboard Principal")
 
-    # Converter Date (object) --> Date (datetime)
-    df['Date'] = pd.to_datetime(df['Date'])
+st.set_page_config(page_title="Crypto Dash", page_icon="data/image.png", layout="wide")
 
-    # Encontrar intervalo comum entre moedas
-    start_date = df.groupby("Symbol")["Date"].min().max()  # maior data inicial (quando ETH foi criado)
-    end_date = df.groupby("Symbol")["Date"].max().min()    # menor data final (data comum mais recente)
+# Perfil da execução: ligado pelo painel "Perfil da execução" da barra lateral (com memória alocada) ou, para o
+# monitoramento, por CRYPTO_DASH_PROFILE_LOG (cada execução vira uma linha JSON nesse arquivo)
+PROFILE_LOG = os.environ.get("CRYPTO_DASH_PROFILE_LOG")
+PROFILE_HISTORY = 50
 
-    # Filtrar dataset para período onde ambas as moedas existem
-    df_2015 = df[(df["Date"] >= start_date) & (df["Date"] <= end_date)].copy()
+# Uma execução interrompida (exceção, st.stop, st.rerun) não chega ao fim do script: o perfil que ela deixou aberto
+# fica na sessão e é encerrado aqui, na execução seguinte (que roda em outra thread), para soltar o tracemalloc
+stale_profiler = st.session_state.pop("open_profiler", None)
+if stale_profiler is not None:
+    stale_profiler.stop()
+show_profile = st.session_state.get("show_profile", False)
+profiler = Profiler(trace_memory=show_profile).start() if show_profile or PROFILE_LOG else None
+if profiler is not None:
+    st.session_state["open_profiler"] = profiler
 
-    # APLICAR LIMPEZA DE OUTLIERS APENAS NO VOLUME
-    outlier_info = analyze_volume_outliers(df_2015, 'Volume')
 
-    # Criar colunas temporais
-    df_2015['Year'] = df_2015['Date'].dt.year
-    df_2015['Month'] = df_2015['Date'].dt.month
-    df_2015['Day'] = df_2015['Date'].dt.day
+# Grafo das computações por versão do CSV (carga, período comum, métricas base), compartilhado entre sessões.
+# Só a versão atual fica no cache: trocar o CSV libera o grafo anterior inteiro
+@st.cache_resource(show_spinner=False, max_entries=1)
+def get_base_pipeline(fingerprint):
+    return base_pipeline(fingerprint, DATA_PATH)
 
-    # Criar coluna Retorno Diário - variação percentual do preço de fechamento
-    df_2015['Return'] = df_2015.groupby('Symbol')['Close'].pct_change() * 100
 
-    # Função para classificar retornos
-    def classify_return(return_value):
-        if pd.isna(return_value):
-            return 'Neutro'
-        elif return_value > 0:
-            return 'Positivo'
-        elif return_value < 0:
-            return 'Negativo'
-        else:
-            return 'Neutro'
+# Nós da versão completa (CSV + lotes incrementais); nada é calculado até uma página pedir. A versão anterior
+# fica só enquanto sessões abertas antes de uma importação terminam o rerun; a terceira libera a mais antiga
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_pipeline(fingerprint, increments_version):
+    return dataset_pipeline(get_base_pipeline(fingerprint), increments_version)
+
+
+# Mensagem exibida enquanto os nós mais demorados são calculados pela primeira vez
+NODE_SPINNERS = {
+    "base_metrics": "Carregando dados e calculando métricas...",
+    "rolling": "Calculando métricas móveis...",
+}
+
+
+def compute(version, name):
+    """Valor memorizado de um nó do grafo (calculado só na primeira vez que alguma página pede)."""
+    pipeline = get_pipeline(*version)
+    pending = [message for node, message in NODE_SPINNERS.items() if node in pipeline and not pipeline.ready(node)]
+    if not pending or pipeline.ready(name):
+        return pipeline[name]
+    with st.spinner(pending[0]):
+        return pipeline[name]
+
+
+# Recortes contíguos por moeda sobre a tabela de métricas
+def get_symbol_store(fingerprint, increments_version):
+    return compute((fingerprint, increments_version), "symbol_store")
+
+
+# Matrizes (data × moeda) por campo, com os lotes incrementais, mapeadas do disco
+def get_wide_store(fingerprint, increments_version):
+    return compute((fingerprint, increments_version), "wide")
+
+
+# Barras semanais, mensais, trimestrais e anuais de todas as moedas (sazonalidade e longo prazo)
+def get_rollups(fingerprint, increments_version):
+    return compute((fingerprint, increments_version), "rollups")
+
+
+# Sharpe, volatilidade e drawdown máximo móveis de todas as moedas, junto com a tabela de métricas
+def get_rolling_store(fingerprint, increments_version):
+    return compute((fingerprint, increments_version), "rolling")
+
+
+# Matriz alinhada (data × moeda) de retornos diários no período comum, base de todas as correlações
+def get_return_matrix(fingerprint, increments_version):
+    return compute((fingerprint, increments_version), "return_matrix")
+
+
+# Resultados que dependem dos parâmetros de cada sessão (janela, pares, período), compartilhados entre sessões
+# com orçamento de memória: as sessões não guardam cópias próprias e o total não cresce com os usuários
+@st.cache_resource(show_spinner=False)
+def get_result_cache():
+    return ResultCache(max_bytes=128 * 2**20, ttl=3600)
+
+
+# Uma matriz de correlação por janela (None = período completo) e tipo de estimativa
+def get_correlation(fingerprint, increments_version, window, shrinkage):
+    def build():
+        _, _, matrix = get_return_matrix(fingerprint, increments_version)
+        return correlation_matrix(matrix, window=window, shrinkage=shrinkage)
+
+    return get_result_cache().get_or_build(
+        ('correlation', fingerprint, increments_version, window, shrinkage), build
+    )
+
+
+# Correlação móvel dos pares escolhidos, por tamanho de janela
+def get_rolling_correlation(fingerprint, increments_version, window, pairs):
+    def build():
+        dates, symbols, matrix = get_return_matrix(fingerprint, increments_version)
+        position = {symbol: n for n, symbol in enumerate(symbols)}
+        i = [position[a] for a, _ in pairs]
+        j = [position[b] for _, b in pairs]
+        return rolling_correlation_frame(dates, symbols, matrix, window, (i, j))
+
+    return get_result_cache().get_or_build(
+        ('rolling_correlation', fingerprint, increments_version, window, pairs), build
+    )
+
+
+# Picos locais e máximas históricas de todas as moedas
+def get_peak_markers(fingerprint, increments_version):
+    return compute((fingerprint, increments_version), "peak_markers")
+
+
+# Catálogo de eventos com o preço real de cada evento, resolvido em lote (chave inclui a versão do catálogo)
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_events(fingerprint, increments_version, catalog_version):
+    headings, events = load_catalog(EVENTS_PATH)
+    return headings, resolve_events(events, get_symbol_store(fingerprint, increments_version))
+
+
+# Ajustes de modelos de previsão em segundo plano, compartilhados entre sessões
+@st.cache_resource(show_spinner=False)
+def get_forecast_service():
+    return ForecastService()
+
+
+# Modelos gravados de outras versões dos dados não servem mais (roda uma vez por versão)
+@st.cache_resource(show_spinner=False)
+def prepare_forecast_models(version):
+    get_forecast_service().forget(version)
+    remove_stale_models(version)
+    return version
+
+
+COMPARISON_VIEW = "BTC + ETH (Comparação)"
+SYMBOL_COLORS = {'BTC': '#f7931a', 'ETH': '#627eea'}
+
+
+# Figuras prontas compartilhadas entre reruns e sessões
+@st.cache_resource(show_spinner=False)
+def get_figure_cache():
+    return FigureCache(max_entries=256)
+
+
+def plotly_chart(fig, **kwargs):
+    """``st.plotly_chart`` medido como a etapa ``plotly_chart`` (serialização da figura para o navegador)."""
+    with stage("plotly_chart"):
+        st.plotly_chart(fig, **kwargs)
+
+
+def symbol_color(symbol):
+    """Cor fixa para BTC/ETH; demais moedas usam a paleta padrão do Plotly."""
+    if symbol in SYMBOL_COLORS:
+        return SYMBOL_COLORS[symbol]
+    palette = qualitative.Plotly
+    return palette[sum(map(ord, symbol)) % len(palette)]
+
+
+def visible_arrays(x, y, chart_range, bars=False):
+    """Recorta o período visível de (datas, valores) e reduz os pontos conforme a largura do gráfico."""
+    view = visible_slice(x, *chart_range)
+    if bars:
+        return downsample_bars(x[view], y[view])
+    return downsample_line(x[view], y[view])
+
+
+def comparison_closes(wide):
+    """Datas e fechamentos de BTC e ETH no período comum das duas moedas.
+
+    As linhas, os marcadores de máxima histórica e o balão da comparação
+    saem todos deste recorte; a tabela de métricas é cortada no período
+    comum de todas as moedas, que pode ser outro.
+    """
+    rows = wide.common_rows(['BTC', 'ETH'])
+    return wide.dates[rows], {symbol: wide.column(symbol, 'Close', rows) for symbol in ('BTC', 'ETH')}
+
+
+def visible_series(data, column, chart_range, bars=False):
+    return visible_arrays(data['Date'].to_numpy(), data[column].to_numpy(), chart_range, bars=bars)
+
+
+def event_trace(evento, symbol, label='label', size=12, textposition='top center', textfont=None):
+    """Marcador de um evento do catálogo no fechamento real do dia."""
+    data = evento['price_date'].strftime('%Y-%m-%d')
+    return go.Scatter(
+        x=[evento['price_date']],
+        y=[evento['price']],
+        mode='markers+text',
+        name=evento[label],
+        marker=dict(color=evento['color'], size=size, symbol=symbol),
+        text=evento[label],
+        textposition=textposition,
+        textfont=dict(color=evento['color'], **(textfont or {'size': 9, 'family': 'Arial Black'})),
+        hovertemplate=f"<b>{evento[label]}</b><br>Data: {data}<br>Preço: ${evento['price']:,.0f}<extra></extra>"
+    )
+
+
+def build_price_figure(store, wide, events, markers, price_view, chart_range):
+    """Gráfico de preços com picos e eventos de uma moeda ou da comparação BTC + ETH."""
+    fig_price = go.Figure()
+
+    if price_view != COMPARISON_VIEW:
+        # Apenas uma moeda
+        coin_data = store[price_view]
+        coin_color = symbol_color(price_view)
+
+        # Picos (máximos locais) já calculados para a moeda
+        peaks = markers(price_view, 'single')
+
+        # Linha principal da moeda
+        line_x, line_y = visible_series(coin_data, 'Close', chart_range)
+        fig_price.add_trace(line_trace(
+            x=line_x,
+            y=line_y,
+            mode='lines',
+            name=price_view,
+            line=dict(color=coin_color, width=2),
+            hovertemplate=f'<b>{price_view}</b><br>Data: %{{x}}<br>Preço: $%{{y:,.0f}}<extra></extra>'
+        ))
+
+        # Marcar picos
+        if len(peaks) > 0:
+            fig_price.add_trace(go.Scatter(
+                x=peaks['Date'],
+                y=peaks['Close'],
+                mode='markers',
+                name=f'Picos {price_view}',
+                marker=dict(color='red', size=8, symbol='triangle-up'),
+                hovertemplate=f'<b>Pico {price_view}</b><br>Data: %{{x}}<br>Preço: $%{{y:,.0f}}<extra></extra>'
+            ))
+
+        # EVENTOS MAIS IMPORTANTES (catálogo, com o preço real do dia)
+        for _, evento in events_for(events, price_view, 'single').iterrows():
+            fig_price.add_trace(event_trace(evento, 'star'))
+
+        fig_price.update_yaxes(title_text=f"Preço {price_view} (USD)")
+
+    else:  # BTC + ETH (Preços Reais - Eixo Único)
+        # Dados do BTC e ETH: fatias das matrizes no período comum das duas moedas
+        dates, closes = comparison_closes(wide)
+        btc_close, eth_close = closes['BTC'], closes['ETH']
+
+        # Picos históricos (dias de nova máxima) de ambos, no mesmo período das linhas
+        btc_ath, eth_ath = ath_mask(btc_close), ath_mask(eth_close)
+
+        # Linha BTC
+        line_x, line_y = visible_arrays(dates, btc_close, chart_range)
+        fig_price.add_trace(line_trace(
+            x=line_x,
+            y=line_y,
+            mode='lines',
+            name='BTC',
+            line=dict(color='#f7931a', width=3),
+            hovertemplate='<b>BTC</b><br>Data: %{x}<br>Preço: $%{y:,.0f}<extra></extra>'
+        ))
+
+        # Picos BTC
+        fig_price.add_trace(go.Scatter(
+            x=dates[btc_ath],
+            y=btc_close[btc_ath],
+            mode='markers',
+            name='Picos BTC',
+            marker=dict(color='#ff6b35', size=8, symbol='triangle-up'),
+            hovertemplate='<b>Pico BTC</b><br>Data: %{x}<br>Preço: $%{y:,.0f}<extra></extra>'
+        ))
+
+        # Linha ETH
+        line_x, line_y = visible_arrays(dates, eth_close, chart_range)
+        fig_price.add_trace(line_trace(
+            x=line_x,
+            y=line_y,
+            mode='lines',
+            name='ETH',
+            line=dict(color='#627eea', width=3),
+            hovertemplate='<b>ETH</b><br>Data: %{x}<br>Preço: $%{y:,.0f}<extra></extra>'
+        ))
+
+        # Picos ETH
+        fig_price.add_trace(go.Scatter(
+            x=dates[eth_ath],
+            y=eth_close[eth_ath],
+            mode='markers',
+            name='Picos ETH',
+            marker=dict(color='#4a90e2', size=8, symbol='triangle-up'),
+            hovertemplate='<b>Pico ETH</b><br>Data: %{x}<br>Preço: $%{y:,.0f}<extra></extra>'
+        ))
+
+        # TOP 3 EVENTOS DE CADA MOEDA
+        for _, evento in events_for(events, 'BTC', 'comparison').iterrows():
+            fig_price.add_trace(event_trace(evento, 'star', 'short_label', 10, textfont={'size': 8}))
+
+        for _, evento in events_for(events, 'ETH', 'comparison').iterrows():
+            fig_price.add_trace(event_trace(evento, 'diamond', 'short_label', 10, 'bottom center', {'size': 8}))
+
+        fig_price.update_yaxes(title_text="Preço (USD)")
+
+    # Layout comum
+    fig_price.update_layout(
+        height=450,
+        margin={'t': 20, 'b': 50, 'l': 60, 'r': 20},
+        xaxis_title="Data",
+        hovermode='x unified',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5
+        ),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font={'size': 12}
+    )
+
+    fig_price.update_xaxes(gridcolor='rgba(128,128,128,0.2)', gridwidth=1, range=list(chart_range))
+    fig_price.update_yaxes(gridcolor='rgba(128,128,128,0.2)', gridwidth=1)
+    return fig_price
+
+
+def build_volume_figure(volume_data, symbol, chart_range):
+    """Barras de volume diário do período visível."""
+    bar_x, bar_y = visible_series(volume_data, 'Volume', chart_range, bars=True)
+
+    fig_right = go.Figure()
+
+    fig_right.add_trace(
+        go.Bar(
+            x=bar_x,
+            y=bar_y,
+            name='Volume',
+            marker_color=symbol_color(symbol),
+            opacity=0.7,
+            hovertemplate=(
+                f'<b>{symbol} Volume</b><br>'
+                'Data: %{x}<br>'
+                'Volume: %{y:,.0f}<br>'
+                '<extra></extra>'
+            )
+        )
+    )
+
+    fig_right.update_layout(
+        height=450,
+        margin={'t': 20, 'b': 50, 'l': 60, 'r': 20},
+        xaxis_title="Data",
+        yaxis_title="Volume de Transações",
+        hovermode='x unified',
+        showlegend=False,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font={'size': 12}
+    )
+
+    fig_right.update_xaxes(gridcolor='rgba(128,128,128,0.2)', gridwidth=1, range=list(chart_range))
+    fig_right.update_yaxes(gridcolor='rgba(128,128,128,0.2)', gridwidth=1)
+    return fig_right
+
+
+ROLLING_PANELS = [
+    ('Sharpe', "Sharpe (anualizado)", ".2f"),
+    ('Volatility', "Volatilidade anual (%)", ".1f"),
+    ('MaxDD', "Drawdown máximo (%)", ".1f"),
+]
+
+
+def build_rolling_figure(rolling_store, symbols, metric, window, chart_range):
+    """Série temporal de uma métrica móvel para as moedas escolhidas."""
+    column = f"{metric}_{window}"
+    fig = go.Figure()
+    for symbol in symbols:
+        line_x, line_y = visible_series(rolling_store[symbol], column, chart_range)
+        fig.add_trace(line_trace(
+            x=line_x,
+            y=line_y,
+            mode='lines',
+            name=symbol,
+            line=dict(color=symbol_color(symbol), width=2),
+            hovertemplate=f'<b>{symbol}</b><br>Data: %{{x}}<br>{column}: %{{y:,.2f}}<extra></extra>'
+        ))
+    if metric == 'Sharpe':
+        fig.add_hline(y=0, line_dash='dot', line_color='gray')
+    fig.update_layout(
+        height=300,
+        margin={'t': 20, 'b': 40, 'l': 50, 'r': 20},
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font={'size': 12}
+    )
+    fig.update_xaxes(gridcolor='rgba(128,128,128,0.2)', gridwidth=1, range=list(chart_range))
+    fig.update_yaxes(gridcolor='rgba(128,128,128,0.2)', gridwidth=1)
+    return fig
+
+
+def build_correlation_heatmap(symbols, corr):
+    """Mapa de calor da matriz de correlação."""
+    fig = go.Figure(go.Heatmap(
+        z=corr,
+        x=symbols,
+        y=symbols,
+        zmin=-1,
+        zmax=1,
+        colorscale='RdBu',
+        text=np.round(corr, 2),
+        texttemplate='%{text}',
+        hovertemplate='%{y} × %{x}: %{z:.3f}<extra></extra>'
+    ))
+    fig.update_layout(
+        height=max(300, 60 * len(symbols)),
+        margin={'t': 20, 'b': 40, 'l': 60, 'r': 20},
+        yaxis=dict(autorange='reversed'),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font={'size': 12}
+    )
+    return fig
+
+
+def build_rolling_correlation_figure(rolling_corr, pairs):
+    """Correlação móvel dos pares escolhidos."""
+    fig = go.Figure()
+    for pair in pairs:
+        series = rolling_corr[pair]
+        line_x, line_y = downsample_line(series.index.to_numpy(), series.to_numpy())
+        fig.add_trace(line_trace(
+            x=line_x,
+            y=line_y,
+            mode='lines',
+            name=pair,
+            hovertemplate=f'<b>{pair}</b><br>Data: %{{x}}<br>Correlação: %{{y:.2f}}<extra></extra>'
+        ))
+    fig.add_hline(y=0, line_dash='dot', line_color='gray')
+    fig.update_layout(
+        height=400,
+        margin={'t': 20, 'b': 50, 'l': 60, 'r': 20},
+        xaxis_title="Data",
+        yaxis=dict(title="Correlação", range=[-1, 1]),
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font={'size': 12}
+    )
+    fig.update_xaxes(gridcolor='rgba(128,128,128,0.2)', gridwidth=1)
+    fig.update_yaxes(gridcolor='rgba(128,128,128,0.2)', gridwidth=1)
+    return fig
+
+
+def build_forecast_figure(history, forecast, symbol, model_label):
+    """Últimos fechamentos, previsão e faixa de 80%."""
+    color = symbol_color(symbol)
+    fig = go.Figure()
+    fig.add_trace(line_trace(
+        x=history['Date'],
+        y=history['Close'],
+        mode='lines',
+        name=f'{symbol} (histórico)',
+        line=dict(color=color, width=2),
+        hovertemplate=f'<b>{symbol}</b><br>Data: %{{x}}<br>Preço: $%{{y:,.2f}}<extra></extra>'
+    ))
+    if forecast is not None:
+        fig.add_trace(go.Scatter(
+            x=np.concatenate((forecast['Date'], forecast['Date'][::-1])),
+            y=np.concatenate((forecast['upper'], forecast['lower'][::-1])),
+            fill='toself',
+            fillcolor='rgba(128,128,128,0.2)',
+            line=dict(width=0),
+            name='Faixa de 80%',
+            hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=forecast['Date'],
+            y=forecast['forecast'],
+            mode='lines',
+            name=f'Previsão ({model_label})',
+            line=dict(color=color, width=2, dash='dash'),
+            hovertemplate='<b>Previsão</b><br>Data: %{x}<br>Preço: $%{y:,.2f}<extra></extra>'
+        ))
+    fig.update_layout(
+        height=450,
+        margin={'t': 20, 'b': 50, 'l': 60, 'r': 20},
+        xaxis_title="Data",
+        yaxis_title=f"Preço {symbol} (USD)",
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font={'size': 12}
+    )
+    fig.update_xaxes(gridcolor='rgba(128,128,128,0.2)', gridwidth=1)
+    fig.update_yaxes(gridcolor='rgba(128,128,128,0.2)', gridwidth=1)
+    return fig
+
+
+MESES = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
+MESES_COMPLETOS = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+                   "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+
+
+# Classificação dos dias pelo código de ``classify_returns`` + 1 (-1, 0, 1 -> 0, 1, 2)
+DAY_TYPES = ["negative", "neutral", "positive"]
+
+
+# Recorte diário de uma moeda entre dois meses de um ano, com retornos e classificação dos dias
+def get_period_analysis(version, symbol, year, first_month, last_month):
+    def build():
+        start = pd.Timestamp(year, first_month, 1)
+        end = pd.Timestamp(year, last_month, 1) + pd.offsets.MonthBegin(1) - pd.Timedelta(microseconds=1)
+        rows = get_symbol_store(*version).range(symbol, start, end)
 
-    # Aplicar classificação de retorno
-    df_2015['Return_Status'] = df_2015['Return'].apply(classify_return)
+        # Tabela nova só com as colunas usadas; a classificação é categórica a partir do sinal do retorno
+        period = pd.DataFrame({
+            "Date": rows["Date"].to_numpy(),
+            "Close": rows["Close"].to_numpy(),
+            "Volume": rows["Volume"].to_numpy(),
+            "Return": rows["Return"].to_numpy() / 100,
+        })
+        period["CumReturn"] = (1 + period["Return"]).cumprod() - 1
+        period["DayType"] = pd.Categorical.from_codes(classify_returns(period["Return"]) + 1, DAY_TYPES)
+        return period
 
-    # Correção do index
-    df_2015 = df_2015.reset_index(drop=True)
-    df_2015["SNo"] = df_2015.index + 1
+    return get_result_cache().get_or_build(('period_analysis', version, symbol, year, first_month, last_month), build)
 
-    # Pegar séries separadas (AMBAS do período filtrado)
-    btc = df_2015[df_2015['Symbol'] == 'BTC'].copy()
-    eth = df_2015[df_2015['Symbol'] == 'ETH'].copy()
+
+with stage("fingerprint"):
+    csv_version = dataset_fingerprint(DATA_PATH)
+    dataset_version = (csv_version, increments_fingerprint())
+figure_cache = get_figure_cache()
+
+menu = st.sidebar.radio(
+    "📌 Navegação",
+    ["Dashboard Principal", "Correlação entre Moedas", "Previsão de Preços", "Análise BTC 2021"],
+    key="menu"
+)
+
+# Novos arquivos na pasta de entrada: processa só as linhas novas a partir do estado salvo
+if glob.glob(os.path.join(DROP_DIR, "*.csv")):
+    if st.sidebar.button("📥 Importar novos dados"):
+        ingest_drop_folder()
+        st.rerun()
+
+# Memória das tabelas compartilhadas (calculadas uma vez por versão dos dados) e uso dos caches de resultados
+if st.sidebar.checkbox("💾 Memória e caches", value=False, key="show_cache_stats"):
+    shared = get_pipeline(*dataset_version).memory()
+    st.sidebar.caption(f"Tabelas compartilhadas: {len(shared)} nós, {sum(shared.values()) / 2**20:.1f} MB")
+    for cache_name, cache in (("Resultados", get_result_cache()), ("Figuras", figure_cache)):
+        cache_stats = cache.stats()
+        st.sidebar.caption(
+            f"{cache_name}: {cache_stats['entries']} itens, {cache_stats['bytes'] / 2**20:.1f} de "
+            f"{cache_stats['max_bytes'] / 2**20:.0f} MB · acertos {cache_stats['hits']} / "
+            f"faltas {cache_stats['misses']} ({cache_stats['hit_rate']:.0%}) · "
+            f"descartes {cache_stats['evictions'] + cache_stats['expirations']}"
+        )
+
+if menu == "Dashboard Principal":
+    st.title("📊 Dashboard Principal")
+
+    # Recortes por moeda (AMBAS do período filtrado) com acesso direto por símbolo
+    store = get_symbol_store(*dataset_version)
+    # Cada coluna pede só o seu nó de estatísticas (calculado uma vez para todas as moedas)
+    crypto_options = store.symbols
+    # Período comum de todas as moedas direto da máscara de presença das matrizes
+    wide = get_wide_store(*dataset_version)
+    period_start, period_end = map(pd.Timestamp, wide.common_period())
+    event_headings, events = get_events(*dataset_version, dataset_fingerprint(EVENTS_PATH))
 
     st.title("Crypto Dash EDA")
-    st.subheader("Análise de Criptomoedas - BTC / ETH (2015 - 2021)")
+    st.subheader(f"Análise de Criptomoedas - {' / '.join(crypto_options)} ({period_start.year} - {period_end.year})")
 
     col1, col2, col3, col4, col5 = st.columns(5)
 
     # Coluna 1: Valor Médio com Tooltips Detalhados
     with col1:
-        crypto_options = df_2015['Symbol'].unique()
-        
         selected_crypto = st.selectbox(
             "Valor Médio",
             options=crypto_options,
             index=0
         )
-        
-        selected_data = df_2015[df_2015['Symbol'] == selected_crypto]
-        valor_medio = selected_data['Close'].mean()
-        valor_min = selected_data['Close'].min()
-        valor_max = selected_data['Close'].max()
-        
+
+        stats = compute(dataset_version, 'price_stats').loc[selected_crypto]
+        valor_medio = stats['mean']
+        valor_min = stats['min']
+        valor_max = stats['max']
+
         if selected_crypto == 'BTC':
             max_range = 20000
         elif selected_crypto == 'ETH':
             max_range = 500
         else:
-            max_range = selected_data['Close'].max()
-        
-        # Velocímetro com tooltip detalhado
-        fig1 = go.Figure(go.Indicator(
-            mode = "gauge+number",
-            value = valor_medio,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {
-                'text': f"<b>{selected_crypto}</b><br><span style='font-size:12px'>Mín: ${valor_min:,.0f} | Máx: ${valor_max:,.0f}</span>", 
-                'font': {'size': 14, 'color': '#333'}
-            },
-            number = {'prefix': "$", 'font': {'size': 18, 'color': '#1f77b4'}},
-            gauge = {
-                'axis': {'range': [0, max_range], 'tickwidth': 1, 'tickcolor': "darkblue"},
-                'bar': {'color': "#1f77b4"},
-                'bgcolor': "white",
-                'borderwidth': 2,
-                'bordercolor': "gray",
-                'steps': [
-                    {'range': [0, max_range * 0.3], 'color': "#e6f3ff"},
-                    {'range': [max_range * 0.3, max_range * 0.7], 'color': "#b3d9ff"},
-                    {'range': [max_range * 0.7, max_range], 'color': "#80c0ff"}],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': valor_medio}}))
-        
-        fig1.update_layout(
-            height=200,
-            margin={'t': 25, 'b': 25, 'l': 25, 'r': 25},
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
+            max_range = valor_max
+
+        # Velocímetro com tooltip detalhado (reaproveitado enquanto moeda e dataset não mudam)
+        fig1 = figure_cache.get_or_build(
+            ('valor_medio', selected_crypto, dataset_version),
+            lambda: gauge_figure(
+                valor_medio,
+                selected_crypto,
+                f"Mín: ${valor_min:,.0f} | Máx: ${valor_max:,.0f}",
+                axis_range=(0, max_range),
+                color="#1f77b4",
+                steps=[(0, max_range * 0.3, "#e6f3ff"), (max_range * 0.3, max_range * 0.7, "#b3d9ff"),
+                       (max_range * 0.7, max_range, "#80c0ff")],
+                threshold_color="red",
+                prefix="$",
+            ),
         )
-        
-        st.plotly_chart(fig1, use_container_width=True, config={'displayModeBar': False})
-        
+
+        plotly_chart(fig1, use_container_width=True, config={'displayModeBar': False})
+
         # Tooltip adicional abaixo do gráfico
         with st.expander("Detalhes"):
-            st.write(f"**Período:** {selected_data['Date'].min().strftime('%Y-%m-%d')} a {selected_data['Date'].max().strftime('%Y-%m-%d')}")
-            st.write(f"**Dias analisados:** {len(selected_data):,}")
-            st.write(f"**Desvio padrão:** ${selected_data['Close'].std():,.2f}")
+            st.write(f"**Período:** {stats['first_date'].strftime('%Y-%m-%d')} a {stats['last_date'].strftime('%Y-%m-%d')}")
+            st.write(f"**Dias analisados:** {stats['days']:,}")
+            st.write(f"**Desvio padrão:** ${stats['std']:,.2f}")
 
     with col2:
         selected_dd_crypto = st.selectbox(
@@ -162,51 +645,30 @@ if menu == "Dashboard Principal":
             index=0,
             key="dd_crypto"
         )
-        
-        dd_data = df_2015[df_2015['Symbol'] == selected_dd_crypto].copy()
-        
-        dd_data['Cumulative_Return'] = (1 + dd_data['Return'].fillna(0) / 100).cumprod()
-        dd_data['Peak'] = dd_data['Cumulative_Return'].expanding().max()
-        dd_data['Drawdown'] = ((dd_data['Cumulative_Return'] / dd_data['Peak']) - 1) * 100
-        
-        max_drawdown = abs(dd_data['Drawdown'].min())
-        avg_drawdown = abs(dd_data[dd_data['Drawdown'] < -1]['Drawdown'].mean())
-        
-        fig2 = go.Figure(go.Indicator(
-            mode = "gauge+number",
-            value = max_drawdown,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {
-                'text': f"<b>{selected_dd_crypto} DD</b><br><span style='font-size:12px'>Média: {avg_drawdown:.1f}%</span>", 
-                'font': {'size': 14, 'color': '#333'}
-            },
-            number = {'suffix': "%", 'font': {'size': 18, 'color': '#e74c3c'}},
-            gauge = {
-                'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': "darkblue"},
-                'bar': {'color': "#e74c3c"},
-                'bgcolor': "white",
-                'borderwidth': 2,
-                'bordercolor': "gray",
-                'steps': [
-                    {'range': [0, 30], 'color': "#fff2f0"},
-                    {'range': [30, 60], 'color': "#ffccc7"},
-                    {'range': [60, 100], 'color': "#ffa39e"}],
-                'threshold': {
-                    'line': {'color': "darkred", 'width': 4},
-                    'thickness': 0.75,
-                    'value': max_drawdown}}))
-        
-        fig2.update_layout(
-            height=200,
-            margin={'t': 25, 'b': 25, 'l': 25, 'r': 25},
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
+
+        dd_stats = compute(dataset_version, 'drawdown_stats').loc[selected_dd_crypto]
+
+        max_drawdown = dd_stats['max_drawdown']
+        avg_drawdown = dd_stats['avg_drawdown']
+
+        fig2 = figure_cache.get_or_build(
+            ('drawdown', selected_dd_crypto, dataset_version),
+            lambda: gauge_figure(
+                max_drawdown,
+                f"{selected_dd_crypto} DD",
+                f"Média: {avg_drawdown:.1f}%",
+                axis_range=(0, 100),
+                color="#e74c3c",
+                steps=[(0, 30, "#fff2f0"), (30, 60, "#ffccc7"), (60, 100, "#ffa39e")],
+                threshold_color="darkred",
+                suffix="%",
+            ),
         )
-        
-        st.plotly_chart(fig2, use_container_width=True, config={'displayModeBar': False})
-        
+
+        plotly_chart(fig2, use_container_width=True, config={'displayModeBar': False})
+
         with st.expander("Detalhes"):
-            drawdowns_significativos = len(dd_data[dd_data['Drawdown'] < -10])
+            drawdowns_significativos = dd_stats['significant_days']
             st.write(f"**DD > 10%:** {drawdowns_significativos} ocorrências")
             st.write(f"**Média de DDs:** {avg_drawdown:.1f}%")
             st.write(f"**Interpretação:** {'Alto risco' if max_drawdown > 50 else 'Risco moderado' if max_drawdown > 30 else 'Baixo risco'}")
@@ -218,53 +680,28 @@ if menu == "Dashboard Principal":
             index=0,
             key="risk_crypto"
         )
-        
-        risk_data = df_2015[df_2015['Symbol'] == selected_risk_crypto].copy()
-        
-        retorno_medio = risk_data['Return'].mean()
-        risco = risk_data['Return'].std()
-        retorno_anual = retorno_medio * 365
-        risco_anual = risco * np.sqrt(365)
-        
-        if risco > 0:
-            sharpe_ratio = retorno_medio / risco
-        else:
-            sharpe_ratio = 0
-        
-        fig3 = go.Figure(go.Indicator(
-            mode = "gauge+number",
-            value = sharpe_ratio,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {
-                'text': f"<b>{selected_risk_crypto} Sharpe</b><br><span style='font-size:12px'>Ret: {retorno_anual:.1f}% | Vol: {risco_anual:.1f}%</span>", 
-                'font': {'size': 14, 'color': '#333'}
-            },
-            number = {'font': {'size': 18, 'color': '#28a745'}},
-            gauge = {
-                'axis': {'range': [-3, 3], 'tickwidth': 1, 'tickcolor': "darkblue"},
-                'bar': {'color': "#28a745"},
-                'bgcolor': "white",
-                'borderwidth': 2,
-                'bordercolor': "gray",
-                'steps': [
-                    {'range': [-3, 0], 'color': "#ffebee"},
-                    {'range': [0, 1], 'color': "#fff3e0"},
-                    {'range': [1, 2], 'color': "#e8f5e8"},
-                    {'range': [2, 3], 'color': "#c3e6cb"}],
-                'threshold': {
-                    'line': {'color': "green", 'width': 4},
-                    'thickness': 0.75,
-                    'value': sharpe_ratio}}))
-        
-        fig3.update_layout(
-            height=200,
-            margin={'t': 25, 'b': 25, 'l': 25, 'r': 25},
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
+
+        risk_stats = compute(dataset_version, 'risk_return').loc[selected_risk_crypto]
+
+        retorno_anual = risk_stats['annual_return']
+        risco_anual = risk_stats['annual_volatility']
+        sharpe_ratio = risk_stats['sharpe']
+
+        fig3 = figure_cache.get_or_build(
+            ('sharpe', selected_risk_crypto, dataset_version),
+            lambda: gauge_figure(
+                sharpe_ratio,
+                f"{selected_risk_crypto} Sharpe",
+                f"Ret: {retorno_anual:.1f}% | Vol: {risco_anual:.1f}%",
+                axis_range=(-3, 3),
+                color="#28a745",
+                steps=[(-3, 0, "#ffebee"), (0, 1, "#fff3e0"), (1, 2, "#e8f5e8"), (2, 3, "#c3e6cb")],
+                threshold_color="green",
+            ),
         )
-        
-        st.plotly_chart(fig3, use_container_width=True, config={'displayModeBar': False})
-        
+
+        plotly_chart(fig3, use_container_width=True, config={'displayModeBar': False})
+
         with st.expander("Detalhes"):
             st.write(f"**Retorno anualizado:** {retorno_anual:.1f}%")
             st.write(f"**Volatilidade anual:** {risco_anual:.1f}%")
@@ -278,56 +715,35 @@ if menu == "Dashboard Principal":
             index=0,
             key="trend_crypto"
         )
-        
-        trend_data = df_2015[df_2015['Symbol'] == selected_trend_crypto].copy()
-        
-        status_counts = trend_data['Return_Status'].value_counts()
-        
-        total_days = len(trend_data)
-        positive_pct = (status_counts.get('Positivo', 0) / total_days) * 100
-        negative_pct = (status_counts.get('Negativo', 0) / total_days) * 100
-        neutral_pct = (status_counts.get('Neutro', 0) / total_days) * 100
-        
-        trend_score = positive_pct
-        
-        fig4 = go.Figure(go.Indicator(
-            mode = "gauge+number",
-            value = trend_score,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {
-                'text': f"<b>{selected_trend_crypto} Trend</b><br><span style='font-size:12px'>Neg: {negative_pct:.1f}% | Neu: {neutral_pct:.1f}%</span>", 
-                'font': {'size': 14, 'color': '#333'}
-            },
-            number = {'suffix': "%", 'font': {'size': 18, 'color': '#17a2b8'}},
-            gauge = {
-                'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': "darkblue"},
-                'bar': {'color': "#17a2b8"},
-                'bgcolor': "white",
-                'borderwidth': 2,
-                'bordercolor': "gray",
-                'steps': [
-                    {'range': [0, 30], 'color': "#f8d7da"},
-                    {'range': [30, 50], 'color': "#fff3cd"},
-                    {'range': [50, 70], 'color': "#d1ecf1"},
-                    {'range': [70, 100], 'color': "#c3e6cb"}],
-                'threshold': {
-                    'line': {'color': "blue", 'width': 4},
-                    'thickness': 0.75,
-                    'value': trend_score}}))
-        
-        fig4.update_layout(
-            height=200,
-            margin={'t': 25, 'b': 25, 'l': 25, 'r': 25},
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
+
+        trend_stats = compute(dataset_version, 'trend_stats').loc[selected_trend_crypto]
+
+        positive_pct = trend_stats['positive_pct']
+        negative_pct = trend_stats['negative_pct']
+        neutral_pct = trend_stats['neutral_pct']
+
+        trend_score = trend_stats['trend_score']
+
+        fig4 = figure_cache.get_or_build(
+            ('trend', selected_trend_crypto, dataset_version),
+            lambda: gauge_figure(
+                trend_score,
+                f"{selected_trend_crypto} Trend",
+                f"Neg: {negative_pct:.1f}% | Neu: {neutral_pct:.1f}%",
+                axis_range=(0, 100),
+                color="#17a2b8",
+                steps=[(0, 30, "#f8d7da"), (30, 50, "#fff3cd"), (50, 70, "#d1ecf1"), (70, 100, "#c3e6cb")],
+                threshold_color="blue",
+                suffix="%",
+            ),
         )
-        
-        st.plotly_chart(fig4, use_container_width=True, config={'displayModeBar': False})
-        
+
+        plotly_chart(fig4, use_container_width=True, config={'displayModeBar': False})
+
         with st.expander("Detalhes"):
-            st.write(f"**Dias positivos:** {status_counts.get('Positivo', 0)} ({positive_pct:.1f}%)")
-            st.write(f"**Dias negativos:** {status_counts.get('Negativo', 0)} ({negative_pct:.1f}%)")
-            st.write(f"**Dias neutros:** {status_counts.get('Neutro', 0)} ({neutral_pct:.1f}%)")
+            st.write(f"**Dias positivos:** {trend_stats['positive_days']} ({positive_pct:.1f}%)")
+            st.write(f"**Dias negativos:** {trend_stats['negative_days']} ({negative_pct:.1f}%)")
+            st.write(f"**Dias neutros:** {trend_stats['neutral_days']} ({neutral_pct:.1f}%)")
 
     with col5:
         selected_recovery_crypto = st.selectbox(
@@ -336,479 +752,329 @@ if menu == "Dashboard Principal":
             index=0,
             key="recovery_crypto"
         )
-        
-        recovery_data = df_2015[df_2015['Symbol'] == selected_recovery_crypto].copy()
-        
-        recovery_data['Cumulative_Return'] = (1 + recovery_data['Return'].fillna(0) / 100).cumprod()
-        recovery_data['Peak'] = recovery_data['Cumulative_Return'].expanding().max()
-        recovery_data['Drawdown'] = ((recovery_data['Cumulative_Return'] / recovery_data['Peak']) - 1) * 100
-        
-        recovery_times = []
-        in_drawdown = False
-        drawdown_start = 0
-        
-        for i, row in recovery_data.iterrows():
-            if row['Drawdown'] < -5 and not in_drawdown:
-                in_drawdown = True
-                drawdown_start = i
-            elif row['Drawdown'] >= -1 and in_drawdown:
-                recovery_time = i - drawdown_start
-                if recovery_time > 0:
-                    recovery_times.append(recovery_time)
-                in_drawdown = False
-        
-        if recovery_times:
-            avg_recovery_days = np.mean(recovery_times)
-            max_days = 365
-            efficiency_score = max(0, 100 - (avg_recovery_days / max_days * 100))
-        else:
-            efficiency_score = 50
-            avg_recovery_days = 0
-        
-        fig5 = go.Figure(go.Indicator(
-            mode = "gauge+number",
-            value = efficiency_score,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {
-                'text': f"<b>{selected_recovery_crypto} Recov</b><br><span style='font-size:12px'>Média: {avg_recovery_days:.0f} dias</span>", 
-                'font': {'size': 14, 'color': '#333'}
-            },
-            number = {'suffix': "%", 'font': {'size': 18, 'color': '#9c27b0'}},
-            gauge = {
-                'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': "darkblue"},
-                'bar': {'color': "#9c27b0"},
-                'bgcolor': "white",
-                'borderwidth': 2,
-                'bordercolor': "gray",
-                'steps': [
-                    {'range': [0, 25], 'color': "#fce4ec"},
-                    {'range': [25, 50], 'color': "#f8bbd9"},
-                    {'range': [50, 75], 'color': "#e1bee7"},
-                    {'range': [75, 100], 'color': "#ce93d8"}],
-                'threshold': {
-                    'line': {'color': "purple", 'width': 4},
-                    'thickness': 0.75,
-                    'value': efficiency_score}}))
-        
-        fig5.update_layout(
-            height=200,
-            margin={'t': 25, 'b': 25, 'l': 25, 'r': 25},
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
+
+        # Episódios de drawdown (entrada abaixo de -5%, recuperação acima de -1%) em dias corridos
+        recovery_stats = compute(dataset_version, 'recovery_stats').loc[selected_recovery_crypto]
+
+        efficiency_score = recovery_stats['efficiency_score']
+        avg_recovery_days = recovery_stats['avg_recovery_days']
+
+        fig5 = figure_cache.get_or_build(
+            ('recovery', selected_recovery_crypto, DEFAULT_ENTRY, DEFAULT_EXIT, dataset_version),
+            lambda: gauge_figure(
+                efficiency_score,
+                f"{selected_recovery_crypto} Recov",
+                f"Média: {avg_recovery_days:.0f} dias",
+                axis_range=(0, 100),
+                color="#9c27b0",
+                steps=[(0, 25, "#fce4ec"), (25, 50, "#f8bbd9"), (50, 75, "#e1bee7"), (75, 100, "#ce93d8")],
+                threshold_color="purple",
+                suffix="%",
+            ),
         )
-        
-        st.plotly_chart(fig5, use_container_width=True, config={'displayModeBar': False})
-        
+
+        plotly_chart(fig5, use_container_width=True, config={'displayModeBar': False})
+
         with st.expander("Detalhes"):
-            st.write(f"**Recuperações analisadas:** {len(recovery_times)}")
-            if recovery_times:
+            st.write(f"**Recuperações analisadas:** {recovery_stats['recoveries']}")
+            if recovery_stats['recoveries'] > 0:
                 st.write(f"**Tempo médio:** {avg_recovery_days:.0f} dias")
-                st.write(f"**Mais rápida:** {min(recovery_times)} dias")
-                st.write(f"**Mais lenta:** {max(recovery_times)} dias")
+                st.write(f"**Mais rápida:** {recovery_stats['min_recovery_days']:.0f} dias")
+                st.write(f"**Mais lenta:** {recovery_stats['max_recovery_days']:.0f} dias")
             else:
                 st.write("**Dados insuficientes** para análise")
 
     # Linha divisória
     st.divider()
 
+    # Intervalo visível dos gráficos: estreitar o período devolve mais detalhe após a redução de pontos
+    chart_range = st.slider(
+        "Período dos gráficos",
+        min_value=period_start.to_pydatetime(),
+        max_value=period_end.to_pydatetime(),
+        value=(period_start.to_pydatetime(), period_end.to_pydatetime()),
+        format="DD/MM/YYYY",
+        key="chart_range"
+    )
+
     col_left, col_right = st.columns(2)
 
     with col_left:
         st.subheader("Picos Históricos")
-        
+
         price_view = st.selectbox(
             "Selecione a visualização:",
-            options=["BTC", "ETH", "BTC + ETH (Comparação)"],
+            options=crypto_options + ([COMPARISON_VIEW] if {'BTC', 'ETH'} <= set(crypto_options) else []),
             index=0,
             key="price_view"
         )
-        
-        # ADICIONAR BALÃO AZUL
-        if price_view == "BTC":
-            st.markdown('<div style="padding: 0.75rem; background-color: #172c43; border-radius: 0.25rem; color: #ffffff;">Preço máximo: $63503 | Mínimo: $210 | Média: $9149</div>', unsafe_allow_html=True)
-            
-        elif price_view == "ETH":
-            st.markdown('<div style="padding: 0.75rem; background-color: #172c43; border-radius: 0.25rem; color: #ffffff;">Preço máximo: $4169 | Mínimo: $0.43 | Média: $384</div>', unsafe_allow_html=True)
-            
+
+        # ADICIONAR BALÃO AZUL (estatísticas do resumo cacheado)
+        if price_view == COMPARISON_VIEW:
+            # Mesmo recorte das linhas do gráfico (período comum de BTC e ETH)
+            comparison_dates, comparison = comparison_closes(wide)
+            btc_max, eth_max = np.nanmax(comparison['BTC']), np.nanmax(comparison['ETH'])
+            comparison_start, comparison_end = map(pd.Timestamp, comparison_dates[[0, -1]])
+            st.markdown(f'<div style="padding: 0.75rem; background-color: #172c43; border-radius: 0.25rem; color: #ffffff;">BTC máximo: {format_price(btc_max)} | ETH máximo: {format_price(eth_max)} | Período: {comparison_start.year}-{comparison_end.year}</div>', unsafe_allow_html=True)
+
         else:
-            st.markdown('<div style="padding: 0.75rem; background-color: #172c43; border-radius: 0.25rem; color: #ffffff;">BTC máximo: $63503 | ETH máximo: $4169 | Período: 2015-2020</div>', unsafe_allow_html=True)
-
-        fig_price = go.Figure()
-        
-        if price_view == "BTC":
-            # Apenas BTC
-            btc_data = df_2015[df_2015['Symbol'] == 'BTC'].copy()
-            
-            # Encontrar picos (máximos locais)
-            from scipy.signal import find_peaks
-            prices = btc_data['Close'].values
-            peaks, _ = find_peaks(prices, height=prices.mean(), distance=30)
-            
-            # Linha principal do BTC
-            fig_price.add_trace(go.Scatter(
-                x=btc_data['Date'],
-                y=btc_data['Close'],
-                mode='lines',
-                name='BTC',
-                line=dict(color='#f7931a', width=2),
-                hovertemplate='<b>BTC</b><br>Data: %{x}<br>Preço: $%{y:,.0f}<extra></extra>'
-            ))
-            
-            # Marcar picos
-            if len(peaks) > 0:
-                fig_price.add_trace(go.Scatter(
-                    x=btc_data.iloc[peaks]['Date'],
-                    y=btc_data.iloc[peaks]['Close'],
-                    mode='markers',
-                    name='Picos BTC',
-                    marker=dict(color='red', size=8, symbol='triangle-up'),
-                    hovertemplate='<b>Pico BTC</b><br>Data: %{x}<br>Preço: $%{y:,.0f}<extra></extra>'
-                ))
-            
-            # EVENTOS MAIS IMPORTANTES BTC (5 eventos)
-            eventos_btc = [
-                {'date': '2016-07-09', 'price': 662, 'event': 'Halving: Redução Emissão 50%', 'color': '#3498db'},
-                {'date': '2017-12-17', 'price': 19497, 'event': 'Bull Run 2017 - Euforia Global', 'color': '#ff6b6b'},
-                {'date': '2020-03-13', 'price': 4970, 'event': 'Crash Pandemia COVID-19', 'color': '#ee5a6f'},
-                {'date': '2021-02-08', 'price': 46433, 'event': 'Tesla Compra $1.5 Bilhões', 'color': '#f39c12'},
-                {'date': '2021-04-14', 'price': 63503, 'event': 'Bull Run 2021 - Boom Institucional', 'color': '#95e1d3'},
-            ]
-            
-            for evento in eventos_btc:
-                fig_price.add_trace(go.Scatter(
-                    x=[evento['date']],
-                    y=[evento['price']],
-                    mode='markers+text',
-                    name=evento['event'],
-                    marker=dict(color=evento['color'], size=12, symbol='star'),
-                    text=evento['event'],
-                    textposition='top center',
-                    textfont=dict(size=9, color=evento['color'], family='Arial Black'),
-                    hovertemplate=f"<b>{evento['event']}</b><br>Data: {evento['date']}<br>Preço: ${evento['price']:,.0f}<extra></extra>"
-                ))
-            
-            fig_price.update_yaxes(title_text="Preço BTC (USD)")
-            
-        elif price_view == "ETH":
-            # Apenas ETH
-            eth_data = df_2015[df_2015['Symbol'] == 'ETH'].copy()
-            
-            # Encontrar picos
-            from scipy.signal import find_peaks
-            prices = eth_data['Close'].values
-            peaks, _ = find_peaks(prices, height=prices.mean(), distance=30)
-            
-            # Linha principal do ETH
-            fig_price.add_trace(go.Scatter(
-                x=eth_data['Date'],
-                y=eth_data['Close'],
-                mode='lines',
-                name='ETH',
-                line=dict(color='#627eea', width=2),
-                hovertemplate='<b>ETH</b><br>Data: %{x}<br>Preço: $%{y:,.0f}<extra></extra>'
-            ))
-            
-            # Marcar picos
-            if len(peaks) > 0:
-                fig_price.add_trace(go.Scatter(
-                    x=eth_data.iloc[peaks]['Date'],
-                    y=eth_data.iloc[peaks]['Close'],
-                    mode='markers',
-                    name='Picos ETH',
-                    marker=dict(color='red', size=8, symbol='triangle-up'),
-                    hovertemplate='<b>Pico ETH</b><br>Data: %{x}<br>Preço: $%{y:,.0f}<extra></extra>'
-                ))
-            
-            # EVENTOS MAIS IMPORTANTES ETH (5 eventos)
-            eventos_eth = [
-                {'date': '2016-06-17', 'price': 20, 'event': 'Hack: $50M Roubados (DAO)', 'color': '#c0392b'},
-                {'date': '2017-06-12', 'price': 395, 'event': 'Boom de ICOs', 'color': '#3498db'},
-                {'date': '2018-01-13', 'price': 1417, 'event': 'Bull Run 2018 - Mania ICOs', 'color': '#a29bfe'},
-                {'date': '2020-12-01', 'price': 594, 'event': 'ETH 2.0: Nova Versão', 'color': '#16a085'},
-                {'date': '2021-05-12', 'price': 4169, 'event': 'Bull Run 2021 - Era DeFi/NFT', 'color': '#fdcb6e'},
-            ]
-            
-            for evento in eventos_eth:
-                fig_price.add_trace(go.Scatter(
-                    x=[evento['date']],
-                    y=[evento['price']],
-                    mode='markers+text',
-                    name=evento['event'],
-                    marker=dict(color=evento['color'], size=12, symbol='star'),
-                    text=evento['event'],
-                    textposition='top center',
-                    textfont=dict(size=9, color=evento['color'], family='Arial Black'),
-                    hovertemplate=f"<b>{evento['event']}</b><br>Data: {evento['date']}<br>Preço: ${evento['price']:,.0f}<extra></extra>"
-                ))
-            
-            fig_price.update_yaxes(title_text="Preço ETH (USD)")
-            
-        else:  # BTC + ETH (Preços Reais - Eixo Único)
-            # Dados do BTC e ETH
-            btc_data = df_2015[df_2015['Symbol'] == 'BTC'].copy()
-            eth_data = df_2015[df_2015['Symbol'] == 'ETH'].copy()
-            
-            # Calcular picos históricos para ambos
-            btc_data['Peak'] = btc_data['Close'].expanding().max()
-            btc_picos = btc_data[btc_data['Close'] == btc_data['Peak']]
-            
-            eth_data['Peak'] = eth_data['Close'].expanding().max()
-            eth_picos = eth_data[eth_data['Close'] == eth_data['Peak']]
-            
-            # Linha BTC
-            fig_price.add_trace(go.Scatter(
-                x=btc_data['Date'],
-                y=btc_data['Close'],
-                mode='lines',
-                name='BTC',
-                line=dict(color='#f7931a', width=3),
-                hovertemplate='<b>BTC</b><br>Data: %{x}<br>Preço: $%{y:,.0f}<extra></extra>'
-            ))
-            
-            # Picos BTC
-            fig_price.add_trace(go.Scatter(
-                x=btc_picos['Date'],
-                y=btc_picos['Close'],
-                mode='markers',
-                name='Picos BTC',
-                marker=dict(color='#ff6b35', size=8, symbol='triangle-up'),
-                hovertemplate='<b>Pico BTC</b><br>Data: %{x}<br>Preço: $%{y:,.0f}<extra></extra>'
-            ))
-            
-            # Linha ETH
-            fig_price.add_trace(go.Scatter(
-                x=eth_data['Date'],
-                y=eth_data['Close'],
-                mode='lines',
-                name='ETH',
-                line=dict(color='#627eea', width=3),
-                hovertemplate='<b>ETH</b><br>Data: %{x}<br>Preço: $%{y:,.0f}<extra></extra>'
-            ))
-            
-            # Picos ETH
-            fig_price.add_trace(go.Scatter(
-                x=eth_picos['Date'],
-                y=eth_picos['Close'],
-                mode='markers',
-                name='Picos ETH',
-                marker=dict(color='#4a90e2', size=8, symbol='triangle-up'),
-                hovertemplate='<b>Pico ETH</b><br>Data: %{x}<br>Preço: $%{y:,.0f}<extra></extra>'
-            ))
-            
-            # TOP 3 EVENTOS BTC
-            top_eventos_btc = [
-                {'date': '2017-12-17', 'price': 19497, 'event': 'BTC Bull Run 2017', 'color': '#ff6b6b'},
-                {'date': '2020-03-13', 'price': 4970, 'event': 'BTC Crash COVID', 'color': '#ee5a6f'},
-                {'date': '2021-04-14', 'price': 63503, 'event': 'BTC Bull Run 2021', 'color': '#95e1d3'},
-            ]
-            
-            # TOP 3 EVENTOS ETH
-            top_eventos_eth = [
-                {'date': '2018-01-13', 'price': 1417, 'event': 'ETH Bull Run 2018', 'color': '#a29bfe'},
-                {'date': '2020-03-13', 'price': 109, 'event': 'ETH Crash COVID', 'color': '#fd79a8'},
-                {'date': '2021-05-12', 'price': 4169, 'event': 'ETH Bull Run 2021', 'color': '#fdcb6e'},
-            ]
-            
-            # Adicionar eventos BTC
-            for evento in top_eventos_btc:
-                fig_price.add_trace(go.Scatter(
-                    x=[evento['date']],
-                    y=[evento['price']],
-                    mode='markers+text',
-                    name=evento['event'],
-                    marker=dict(color=evento['color'], size=10, symbol='star'),
-                    text=evento['event'],
-                    textposition='top center',
-                    textfont=dict(size=8, color=evento['color']),
-                    hovertemplate=f"<b>{evento['event']}</b><br>Data: {evento['date']}<br>Preço: ${evento['price']:,.0f}<extra></extra>"
-                ))
-            
-            # Adicionar eventos ETH
-            for evento in top_eventos_eth:
-                fig_price.add_trace(go.Scatter(
-                    x=[evento['date']],
-                    y=[evento['price']],
-                    mode='markers+text',
-                    name=evento['event'],
-                    marker=dict(color=evento['color'], size=10, symbol='diamond'),
-                    text=evento['event'],
-                    textposition='bottom center',
-                    textfont=dict(size=8, color=evento['color']),
-                    hovertemplate=f"<b>{evento['event']}</b><br>Data: {evento['date']}<br>Preço: ${evento['price']:,.0f}<extra></extra>"
-                ))
-            
-            fig_price.update_yaxes(title_text="Preço (USD)")
-        
-        # Layout comum
-        fig_price.update_layout(
-            height=450,
-            margin={'t': 20, 'b': 50, 'l': 60, 'r': 20},
-            xaxis_title="Data",
-            hovermode='x unified',
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="center",
-                x=0.5
-            ),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font={'size': 12}
+            view_stats = compute(dataset_version, 'price_stats').loc[price_view]
+            st.markdown(f'<div style="padding: 0.75rem; background-color: #172c43; border-radius: 0.25rem; color: #ffffff;">Preço máximo: {format_price(view_stats["max"])} | Mínimo: {format_price(view_stats["min"])} | Média: {format_price(view_stats["mean"])}</div>', unsafe_allow_html=True)
+
+        fig_price = figure_cache.get_or_build(
+            ('price', price_view, chart_range, dataset_version, dataset_fingerprint(EVENTS_PATH)),
+            lambda: build_price_figure(store, wide, events, get_peak_markers(*dataset_version), price_view, chart_range),
         )
-        
-        fig_price.update_xaxes(gridcolor='rgba(128,128,128,0.2)', gridwidth=1)
-        fig_price.update_yaxes(gridcolor='rgba(128,128,128,0.2)', gridwidth=1)
-        
-        st.plotly_chart(fig_price, use_container_width=True, config={'displayModeBar': False})
-        
+
+        plotly_chart(fig_price, use_container_width=True, config={'displayModeBar': False})
+
         # EXPLICAÇÃO DOS EVENTOS OCUPANDO 2 COLUNAS
-    
+
     # Mover o expander para FORA do with col_left
     with st.expander("📖 Explicação dos Eventos Históricos"):
-        if price_view == "BTC":
-            st.markdown("""
-            ### 🔸 Bitcoin - Eventos Mais Importantes
-            
-            **1. Halving (09/07/2016) - $662**
-            - Redução automática de 50% na emissão de novos Bitcoins
-            - Acontece a cada 4 anos para controlar a inflação
-            - Torna o Bitcoin mais escasso, tendendo a aumentar o preço
-            
-            **2. Bull Run 2017 (17/12/2017) - $19,497**
-            - Primeira grande explosão de preço do Bitcoin
-            - Euforia global e entrada massiva de investidores
-            - Mercado em alta extrema com valorização de +2000%
-            
-            **3. Crash COVID-19 (13/03/2020) - $4,970**
-            - Pandemia causou pânico nos mercados globais
-            - Bitcoin caiu mais de 50% em poucos dias
-            - Maior queda desde 2018
-            
-            **4. Tesla Investe (08/02/2021) - $46,433**
-            - Tesla de Elon Musk comprou $1.5 bilhões em Bitcoin
-            - Primeira grande empresa a adotar BTC no balanço
-            - Validação institucional histórica
-            
-            **5. Bull Run 2021 (14/04/2021) - $63,503**
-            - Segunda grande explosão de preço
-            - Adoção institucional massiva (bancos, fundos, empresas)
-            - Bitcoin consolida-se como "ouro digital"
-            """)
-            
-        elif price_view == "ETH":
-            st.markdown("""
-            ### 🔹 Ethereum - Eventos Mais Importantes
-            
-            **1. Hack DAO (17/06/2016) - $20**
-            - Hackers roubaram $50 milhões em Ethereum
-            - Maior roubo cripto da história na época
-            - Levou à divisão da rede (Hard Fork)
-            
-            **2. Boom de ICOs (12/06/2017) - $395**
-            - Explosão de lançamentos de novos projetos
-            - Ethereum virou plataforma #1 para fundraising
-            - Centenas de startups arrecadaram bilhões
-            
-            **3. Bull Run 2018 (13/01/2018) - $1,417**
-            - Auge da mania de ICOs e especulação
-            - Ethereum chegou a $1,400 pela primeira vez
-            - Mercado superaquecido antes da grande queda
-            
-            **4. ETH 2.0 Lançado (01/12/2020) - $594**
-            - Atualização mais importante da história do Ethereum
-            - Mudança para sistema mais ecológico (Proof-of-Stake)
-            - Promessa de rede 100x mais rápida
-            
-            **5. Bull Run 2021 (12/05/2021) - $4,169**
-            - Segunda grande explosão de preço
-            - Boom de DeFi (finanças descentralizadas) e NFTs
-            - Ethereum consolida-se como plataforma líder
-            """)
-            
+        catalog_events = events_for(events, price_view, 'single')
+        if len(catalog_events):
+            linhas = [f"### {event_headings.get(price_view, {}).get('heading', price_view)}", ""]
+            for n, (_, evento) in enumerate(catalog_events.iterrows(), start=1):
+                linhas.append(f"**{n}. {evento['title']} ({evento['date'].strftime('%d/%m/%Y')}) - {format_price(evento['price'])}**")
+                linhas.extend(f"- {detalhe}" for detalhe in evento['details'])
+                linhas.append("")
+            st.markdown("\n".join(linhas))
+
+        elif price_view == COMPARISON_VIEW:
+            # Os mesmos eventos marcados no gráfico de comparação, com a variação desde o evento anterior da moeda
+            linhas = ["### 🔥 Comparação: Eventos de Cada Moeda", ""]
+            for symbol in ('BTC', 'ETH'):
+                comparison_events = events_for(events, symbol, 'comparison')
+                if not len(comparison_events):
+                    continue
+                linhas.extend([f"**{event_headings.get(symbol, {}).get('heading', symbol)}**", ""])
+                previous = None
+                for n, (_, evento) in enumerate(comparison_events.iterrows(), start=1):
+                    change = '' if previous is None else f" ({(evento['price'] / previous - 1) * 100:+.0f}% desde o anterior)"
+                    linhas.append(
+                        f"{n}. **{evento['short_label']}** ({evento['date'].strftime('%d/%m/%Y')})"
+                        f" - {format_price(evento['price'])}{change}"
+                    )
+                    previous = evento['price']
+                linhas.append("")
+            st.markdown("\n".join(linhas))
+
         else:
-            st.markdown("""
-            ### 🔥 Comparação: Top 3 Eventos de Cada Moeda
-            
-            **Bitcoin (BTC):**
-            1. **Bull Run 2017** - Primeira grande explosão (+2000%)
-            2. **Crash COVID** - Maior queda da década (-74%)
-            3. **Bull Run 2021** - Adoção institucional (+225%)
-            
-            **Ethereum (ETH):**
-            1. **Bull Run 2018** - Mania de ICOs (+13000%)
-            2. **Crash COVID** - Queda sincronizada com BTC (-92%)
-            3. **Bull Run 2021** - Era DeFi e NFTs (+340%)
-            
-            **Insight:** Ambas as moedas seguem ciclos parecidos, mas Ethereum teve ganhos percentuais maiores no último bull run (ETH: +340% vs BTC: +225% de 2020-2021).
-            """)
+            st.write(f"Nenhum evento histórico catalogado para {price_view}.")
 
     with col_right:
         st.subheader("Volume de Transações")
-        
+
         selected_volume_crypto = st.selectbox(
             "Escolha a criptomoeda:",
-            options=["BTC", "ETH"],
+            options=crypto_options,
             index=0,
             key="volume_crypto"
         )
-        
-        volume_data = df_2015[df_2015['Symbol'] == selected_volume_crypto].copy()
-        
+
+        volume_data = store[selected_volume_crypto]
+
         # PADRONIZAR FORMATAÇÃO DO VOLUME (sem símbolo $)
-        vol_mean = volume_data['Volume'].mean() / 1e9
-        vol_median = volume_data['Volume'].median() / 1e9
-        vol_std = volume_data['Volume'].std() / 1e9
-        
+        volume_stats = compute(dataset_version, 'volume_stats').loc[selected_volume_crypto]
+        vol_mean = volume_stats['volume_mean'] / 1e9
+        vol_median = volume_stats['volume_median'] / 1e9
+        vol_std = volume_stats['volume_std'] / 1e9
+
         st.markdown(f'<div style="padding: 0.75rem; background-color: #172c43; border-radius: 0.25rem; color: #ffffff;">Volume médio: {vol_mean:.2f}B | Mediana: {vol_median:.2f}B | Desvio: {vol_std:.2f}B</div>', unsafe_allow_html=True)
-        
-        fig_right = go.Figure()
-        
-        fig_right.add_trace(
-            go.Bar(
-                x=volume_data['Date'],
-                y=volume_data['Volume'],
-                name='Volume',
-                marker_color='#f7931a' if selected_volume_crypto == 'BTC' else '#627eea',
-                opacity=0.7,
-                hovertemplate=f'<b>{selected_volume_crypto} Volume</b><br>' +
-                            'Data: %{x}<br>' +
-                            'Volume: %{y:,.0f}<br>' +
-                            '<extra></extra>'
+
+        fig_right = figure_cache.get_or_build(
+            ('volume', selected_volume_crypto, chart_range, dataset_version),
+            lambda: build_volume_figure(volume_data, selected_volume_crypto, chart_range),
+        )
+
+        plotly_chart(fig_right, use_container_width=True, config={'displayModeBar': False})
+
+    st.divider()
+    st.subheader("Métricas Móveis de Risco")
+
+    rolling_store = get_rolling_store(*dataset_version)
+    col_symbols, col_window = st.columns([3, 1])
+    with col_symbols:
+        rolling_symbols = st.multiselect(
+            "Moedas",
+            options=crypto_options,
+            default=crypto_options[:2],
+            key="rolling_symbols"
+        )
+    with col_window:
+        rolling_window = st.radio(
+            "Janela (dias)",
+            options=list(ROLLING_WINDOWS),
+            index=1,
+            horizontal=True,
+            key="rolling_window"
+        )
+
+    rolling_cols = st.columns(len(ROLLING_PANELS))
+    for rolling_col, (metric, label, fmt) in zip(rolling_cols, ROLLING_PANELS):
+        with rolling_col:
+            st.markdown(f"**{label} — {rolling_window} dias**")
+            fig_rolling = figure_cache.get_or_build(
+                ('rolling', metric, tuple(rolling_symbols), rolling_window, chart_range, dataset_version),
+                lambda: build_rolling_figure(rolling_store, rolling_symbols, metric, rolling_window, chart_range),
             )
+            plotly_chart(fig_rolling, use_container_width=True, config={'displayModeBar': False}, key=f"rolling_{metric}")
+            # Valor mais recente de cada moeda selecionada
+            latest = [f"{symbol}: {format(rolling_store.column(symbol, f'{metric}_{rolling_window}')[-1], fmt)}"
+                      for symbol in rolling_symbols]
+            if latest:
+                st.caption("Atual — " + " | ".join(latest))
+
+elif menu == "Correlação entre Moedas":
+    st.title("🔗 Correlação entre Moedas")
+
+    corr_dates, corr_symbols, _ = get_return_matrix(*dataset_version)
+    st.subheader(f"Retornos diários de {len(corr_symbols)} moedas ({corr_dates.min().year} - {corr_dates.max().year})")
+
+    col_matrix, col_rolling = st.columns(2)
+
+    with col_matrix:
+        st.markdown("**Matriz de correlação**")
+        corr_window = st.radio(
+            "Período",
+            options=[None] + list(ROLLING_WINDOWS),
+            format_func=lambda w: "Completo" if w is None else f"Últimos {w} dias",
+            horizontal=True,
+            key="corr_window"
+        )
+        use_shrinkage = st.checkbox(
+            "Encolhimento Ledoit-Wolf",
+            value=False,
+            disabled=not shrinkage_available(),
+            help="Estimativa mais estável quando há muitas moedas e poucas datas (requer scikit-learn)",
+            key="corr_shrinkage"
+        )
+        corr, shrinkage = get_correlation(*dataset_version, corr_window, use_shrinkage)
+
+        fig_corr = figure_cache.get_or_build(
+            ('correlation', corr_window, use_shrinkage, dataset_version),
+            lambda: build_correlation_heatmap(corr_symbols, corr),
+        )
+        plotly_chart(fig_corr, use_container_width=True, config={'displayModeBar': False})
+        if shrinkage is not None:
+            st.caption(f"Coeficiente de encolhimento: {shrinkage:.3f}")
+
+    with col_rolling:
+        st.markdown("**Correlação móvel**")
+        rolling_corr_window = st.radio(
+            "Janela (dias)",
+            options=list(ROLLING_WINDOWS),
+            index=1,
+            horizontal=True,
+            key="rolling_corr_window"
+        )
+        pair_options = [f"{corr_symbols[a]}/{corr_symbols[b]}" for a, b in zip(*all_pairs(len(corr_symbols)))]
+        selected_pairs = st.multiselect(
+            "Pares",
+            options=pair_options,
+            default=pair_options[:3],
+            key="corr_pairs"
+        )
+        rolling_corr = get_rolling_correlation(
+            *dataset_version, rolling_corr_window, tuple(tuple(pair.split("/")) for pair in selected_pairs)
         )
-        
-        fig_right.update_layout(
-            height=450,
-            margin={'t': 20, 'b': 50, 'l': 60, 'r': 20},
-            xaxis_title="Data",
-            yaxis_title="Volume de Transações",
-            hovermode='x unified',
-            showlegend=False,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font={'size': 12}
+
+        fig_rolling_corr = figure_cache.get_or_build(
+            ('rolling_correlation', tuple(selected_pairs), rolling_corr_window, dataset_version),
+            lambda: build_rolling_correlation_figure(rolling_corr, selected_pairs),
+        )
+        plotly_chart(fig_rolling_corr, use_container_width=True, config={'displayModeBar': False})
+
+elif menu == "Previsão de Preços":
+    st.title("🔮 Previsão de Preços")
+
+    forecast_store = get_symbol_store(*dataset_version)
+    model_version = prepare_forecast_models("-".join(dataset_version))
+    service = get_forecast_service()
+
+    col_coin, col_model, col_horizon = st.columns([1, 2, 2])
+    with col_coin:
+        forecast_symbol = st.selectbox("Criptomoeda", options=forecast_store.symbols, key="forecast_symbol")
+    with col_model:
+        forecast_model = st.selectbox(
+            "Modelo",
+            options=list(MODELS),
+            format_func=MODELS.get,
+            key="forecast_model"
+        )
+    with col_horizon:
+        horizon = st.slider("Horizonte (dias)", min_value=7, max_value=90, value=30, step=1, key="forecast_horizon")
+
+    # Agenda (sem esperar) o ajuste do modelo escolhido para todas as moedas; o que já existe é lido do disco
+    params = DEFAULT_PARAMS[forecast_model]
+    for symbol in forecast_store:
+        service.submit(
+            symbol,
+            forecast_store.column(symbol, 'Date'),
+            forecast_store.column(symbol, 'Close'),
+            forecast_model,
+            params,
+            model_version
         )
-        
-        fig_right.update_xaxes(gridcolor='rgba(128,128,128,0.2)', gridwidth=1)
-        fig_right.update_yaxes(gridcolor='rgba(128,128,128,0.2)', gridwidth=1)
-        
-        st.plotly_chart(fig_right, use_container_width=True, config={'displayModeBar': False})
+    status, fitted = service.get(forecast_symbol, forecast_model, params, model_version)
+
+    history = forecast_store[forecast_symbol][['Date', 'Close']].iloc[-180:]
+    forecast = None
+    if status == "ready":
+        forecast = predict(fitted, horizon)
+        last_close = float(history['Close'].iloc[-1])
+        final = float(forecast['forecast'].iloc[-1])
+        col_a, col_b, col_c = st.columns(3)
+        col_a.metric("Último fechamento", format_price(last_close), help=history['Date'].iloc[-1].strftime('%d/%m/%Y'))
+        col_b.metric(f"Previsão em {horizon} dias", format_price(final), f"{(final / last_close - 1) * 100:+.1f}%")
+        col_c.metric(
+            "Faixa de 80%",
+            f"{format_price(forecast['lower'].iloc[-1])} - {format_price(forecast['upper'].iloc[-1])}"
+        )
+    elif status == "failed":
+        st.error(f"Não foi possível ajustar o modelo: {fitted}")
+    else:
+        st.info("⏳ Modelo em treinamento em segundo plano. O gráfico mostra o histórico enquanto isso.")
+        st.button("🔄 Atualizar", key="forecast_refresh")
+
+    fig_forecast = figure_cache.get_or_build(
+        ('forecast', forecast_symbol, forecast_model, horizon, status, dataset_version),
+        lambda: build_forecast_figure(history, forecast, forecast_symbol, MODELS[forecast_model]),
+    )
+    plotly_chart(fig_forecast, use_container_width=True, config={'displayModeBar': False})
+    st.caption(f"Modelos ajustados com os últimos {params['train_days']} dias e reaproveitados até os dados mudarem.")
 
 elif menu == "Análise BTC 2021":
-    st.title("📈 Análise BTC 2021 (Jan - Jul)")
+    # plotly.express só é usado nesta página: importado aqui para não pesar na partida das demais
+    import plotly.express as px
+
+    # Anos e meses disponíveis direto dos agregados mensais (uma linha por mês)
+    btc_monthly = get_rollups(*dataset_version)['M']['BTC']
+    btc_months = btc_monthly['Date'].dt
+    anos = sorted(set(btc_months.year))
+
+    col_ano, col_meses = st.columns([1, 3])
+    with col_ano:
+        ano = st.selectbox("Ano", options=anos, index=anos.index(2021) if 2021 in anos else len(anos) - 1, key="btc_year")
+    meses_disponiveis = sorted(set(btc_months.month[btc_months.year == ano]))
+    with col_meses:
+        mes_inicio, mes_fim = st.select_slider(
+            "Meses",
+            options=meses_disponiveis,
+            value=(meses_disponiveis[0], meses_disponiveis[-1]),
+            format_func=lambda m: MESES[m - 1],
+            key="btc_months"
+        )
+    periodo = f"{ano} {MESES[mes_inicio - 1]}-{MESES[mes_fim - 1]}"
 
-    st.header("2021 - Janeiro até Julho")
-    st.subheader("7 Meses de 2021 - Crescimento Diário BTC")
+    st.title(f"📈 Análise BTC {ano} ({MESES[mes_inicio - 1]} - {MESES[mes_fim - 1]})")
 
-    dates = pd.date_range("2021-01-01", "2021-07-31")
-    close = np.cumprod(1 + np.random.normal(0, 0.02, len(dates))) * 30000
-    volume = np.random.randint(1e9, 5e9, len(dates),dtype=np.int64)
-    df = pd.DataFrame({"Date": dates, "Close": close, "Volume": volume})
+    st.header(f"{ano} - {MESES_COMPLETOS[mes_inicio - 1]} até {MESES_COMPLETOS[mes_fim - 1]}")
+    st.subheader(f"{mes_fim - mes_inicio + 1} Meses de {ano} - Crescimento Diário BTC")
 
-    df["Return"] = df["Close"].pct_change()
-    df["CumReturn"] = (1 + df["Return"]).cumprod() - 1
-    df["DayType"] = df["Return"].apply(lambda x: "positive" if x > 0 else ("negative" if x < 0 else "neutral"))
+    # Dados reais do BTC no período escolhido (determinístico e memoizado por versão/período)
+    df = get_period_analysis(dataset_version, 'BTC', ano, mes_inicio, mes_fim)
 
     opcao = st.selectbox(
         "Escolha a análise:",
@@ -824,13 +1090,13 @@ elif menu == "Análise BTC 2021":
 
     if opcao == "Retornos Diários":
         fig = px.bar(df, x="Date", y="Return", color=df["Return"] > 0,
-                    color_discrete_map={True: "green", False: "red"},
-                    title="Retorno Diário BTC (2021 Jan-Jul)")
-        st.plotly_chart(fig, use_container_width=True)
+                     color_discrete_map={True: "green", False: "red"},
+                     title=f"Retorno Diário BTC ({periodo})")
+        plotly_chart(fig, use_container_width=True)
 
     elif opcao == "Retorno Acumulado":
-        fig = px.line(df, x="Date", y="CumReturn", title="Retorno Acumulado BTC (2021 Jan-Jul)")
-        st.plotly_chart(fig, use_container_width=True)
+        fig = px.line(df, x="Date", y="CumReturn", title=f"Retorno Acumulado BTC ({periodo})")
+        plotly_chart(fig, use_container_width=True)
 
     elif opcao == "Correlação Volume":
         corr1 = df["Volume"].corr(df["Return"].abs())
@@ -859,21 +1125,21 @@ elif menu == "Análise BTC 2021":
             height=400
         )
 
-        st.plotly_chart(fig, use_container_width=True)
-
+        plotly_chart(fig, use_container_width=True)
 
     elif opcao == "Contagem de Dias":
         counts = df["DayType"].value_counts()
         fig = px.bar(counts, x=counts.index, y=counts.values,
-                    title="Contagem de Dias (Positivos / Negativos / Neutros)",
-                    color=counts.index,
-                    color_discrete_map={"positive": "green", "negative": "red", "neutral": "gray"})
-        st.plotly_chart(fig, use_container_width=True)
+                     title="Contagem de Dias (Positivos / Negativos / Neutros)",
+                     color=counts.index,
+                     color_discrete_map={"positive": "green", "negative": "red", "neutral": "gray"})
+        plotly_chart(fig, use_container_width=True)
         st.dataframe(counts.rename("Quantidade"))
 
     elif opcao == "Outliers":
-        df["zscore"] = (df["Return"] - df["Return"].mean())/df["Return"].std()
-        outliers = df[np.abs(df["zscore"]) > 2]
+        # O recorte é compartilhado entre sessões: o z-score fica fora dele
+        zscore = (df["Return"] - df["Return"].mean())/df["Return"].std()
+        outliers = df[np.abs(zscore) > 2]
         pct_outliers = len(outliers) / len(df) * 100
 
         fig = go.Figure(go.Indicator(
@@ -882,27 +1148,55 @@ elif menu == "Análise BTC 2021":
             title={"text": "Outliers em Retornos (%)"},
             gauge={'axis': {'range': [0, 100]}}
         ))
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
     elif opcao == "Sazonalidade Mensal":
-        # Criar coluna de mês se ainda não existir
-        if "Month" not in df.columns:
-            df["Month"] = df["Date"].dt.month_name()
-
-            # Garantir a ordem cronológica (Jan → Jul)
-            ordem_meses = ["January", "February", "March", "April", "May", "June", "July"]
-            df["Month"] = pd.Categorical(df["Month"], categories=ordem_meses, ordered=True)
-
-        # Agrupar volume por mês
-        sazonalidade = df.groupby("Month")["Volume"].sum().reset_index()
+        # Volume de cada mês lido dos agregados mensais (sem reagrupar as linhas diárias)
+        sazonalidade = btc_monthly.loc[
+            (btc_months.year == ano) & btc_months.month.between(mes_inicio, mes_fim), ['Date', 'Volume']
+        ]
+        sazonalidade = pd.DataFrame({
+            "Month": [MESES[month - 1] for month in sazonalidade['Date'].dt.month],
+            "Volume": sazonalidade['Volume'].to_numpy()
+        })
 
         # Gráfico de barras
         fig = px.bar(
             sazonalidade,
             x="Month",
             y="Volume",
-            title="📊 Sazonalidade Mensal de Volume BTC (2021 Jan-Jul)",
+            title=f"📊 Sazonalidade Mensal de Volume BTC ({periodo})",
             color="Volume",
             color_continuous_scale="Blues"
         )
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
+
+# Fim da execução: registro do perfil, exportação para o monitoramento e painel de depuração
+if profiler is not None:
+    profiler.stop()
+    st.session_state.pop("open_profiler", None)
+    profile_record = profiler.record(page=menu)
+    if PROFILE_LOG:
+        profiler.export(PROFILE_LOG, page=menu)
+    profile_history = st.session_state.setdefault("profile_history", [])
+    profile_history.append(profile_record)
+    del profile_history[:-PROFILE_HISTORY]
+
+if st.sidebar.checkbox("🐞 Perfil da execução", value=False, key="show_profile") and profiler is not None:
+    st.sidebar.caption(f"Execução: {profiler.seconds * 1000:.0f} ms (etapas aninhadas contam também nas de fora)")
+    profile_table = pd.DataFrame(profile_record["stages"])
+    if len(profile_table):
+        profile_table = pd.DataFrame({
+            "etapa": profile_table["name"],
+            "ms": (profile_table["seconds"] * 1000).round(1),
+            "chamadas": profile_table["calls"],
+            "acertos": profile_table["hits"],
+            "KB": (profile_table["bytes"] / 1024).round(0).astype(int),
+        }).sort_values("ms", ascending=False)
+        st.sidebar.dataframe(profile_table, hide_index=True, use_container_width=True)
+    st.sidebar.download_button(
+        "Exportar JSONL",
+        data="".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in profile_history),
+        file_name="profile.jsonl",
+        mime="application/json",
+    )